@@ -0,0 +1,86 @@
+"""Micro-benchmark: serializing a 50-application list response.
+
+Compares the old path (recursive ObjectId/datetime copy, then FastAPI's
+jsonable_encoder and the stdlib JSONResponse) with DocumentResponse.
+
+    python bench_json_response.py [--rounds 200]
+"""
+import argparse
+import timeit
+import uuid
+from datetime import datetime, timedelta
+from typing import Any
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from json_response import DocumentResponse, ORJSON_AVAILABLE
+
+def convert_objectid(doc: Any) -> Any:
+    """The recursive converter routes used before DocumentResponse"""
+    if isinstance(doc, list):
+        return [convert_objectid(item) for item in doc]
+    if isinstance(doc, dict):
+        return {key: convert_objectid(value) for key, value in doc.items()}
+    if isinstance(doc, ObjectId):
+        return str(doc)
+    if isinstance(doc, datetime):
+        return doc.isoformat()
+    return doc
+
+def sample_applications(count: int = 50) -> list:
+    now = datetime.now()
+    body = "Experienced engineer with a track record of shipping Python services. " * 70
+    return [
+        {
+            '_id': ObjectId(),
+            'application_id': str(uuid.uuid4()),
+            'user_id': str(uuid.uuid4()),
+            'job_id': f"job_{index}",
+            'status': 'applied',
+            'applied_at': now - timedelta(hours=index),
+            'updated_at': now,
+            'cover_letter': body,
+            'job_data': {
+                '_id': ObjectId(),
+                'title': 'Senior Python Developer',
+                'company': 'Tech Company',
+                'location': 'Krakow, Poland',
+                'skills': ['python', 'fastapi', 'mongodb', 'docker'],
+                'salary_min': 90000.0,
+                'salary_max': 120000.0,
+                'posted_date': now - timedelta(days=3),
+                'description': body
+            },
+            'history': [{'status': 'applied', 'at': now, 'note': None}]
+        }
+        for index in range(count)
+    ]
+
+def legacy(payload: dict) -> bytes:
+    converted = {key: convert_objectid(value) for key, value in payload.items()}
+    return JSONResponse(jsonable_encoder(converted)).body
+
+def document(payload: dict) -> bytes:
+    return DocumentResponse(payload).body
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rounds', type=int, default=200)
+    args = parser.parse_args()
+
+    applications = sample_applications()
+    payload = {"applications": applications, "count": len(applications), "next_cursor": None}
+    size = len(document(payload))
+    print(f"payload: {len(applications)} applications, {size / 1024:.0f} KB, orjson={ORJSON_AVAILABLE}")
+
+    results = {}
+    for name, serialize in (('legacy', legacy), ('document', document)):
+        best = min(timeit.repeat(lambda: serialize(payload), number=args.rounds, repeat=5)) / args.rounds
+        results[name] = best
+        print(f"{name:>9}: {best * 1000:.3f} ms per response")
+    print(f"  speedup: {results['legacy'] / results['document']:.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+import asyncio
+import hashlib
+import logging
+import os
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from pymongo import ASCENDING
+
+logger = logging.getLogger(__name__)
+
+def job_fingerprint(job: dict) -> str:
+    """Identifies the job content a draft was written for"""
+    text = "|".join([job.get('title') or '', job.get('company') or '', job.get('description') or ''])
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+class DraftPregenerator:
+    """Writes application drafts ahead of time for a user's best-ranked jobs.
+
+    Drafts are ``{user_id, job_id, resume_hash, job_fingerprint, customized_resume,
+    cover_letter, used_at, created_at}`` rows in the application_drafts collection. Work
+    runs as one cancellable task per user, only starts a generation while
+    ``is_idle()`` reports spare model capacity, and stops once the user has
+    used their daily budget of drafts. Rescheduling a user cancels their
+    running task and drops drafts written against an older resume, so the
+    budget is counted in ``{user_id, day, drafts}`` rows of draft_budgets
+    rather than from the drafts that survive.
+    """
+
+    def __init__(
+        self,
+        db,
+        generate: Callable[[str, dict], Awaitable[Optional[dict]]],
+        is_idle: Callable[[], bool],
+        top_n: int = None,
+        daily_budget: int = None,
+        idle_poll_seconds: float = 0.5
+    ):
+        self.collection = db.application_drafts
+        self.budgets = db.draft_budgets
+        self.jobs = db.jobs
+        self.generate = generate
+        self.is_idle = is_idle
+        self.top_n = top_n or int(os.environ.get('PREGENERATE_TOP_N', '5'))
+        self.daily_budget = daily_budget or int(os.environ.get('PREGENERATE_DAILY_BUDGET', '20'))
+        self.idle_poll_seconds = idle_poll_seconds
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self.drafts_generated = 0
+
+    def ensure_indexes(self):
+        self.collection.create_index([("user_id", ASCENDING), ("job_id", ASCENDING)], unique=True)
+        self.budgets.create_index([("user_id", ASCENDING), ("day", ASCENDING)], unique=True)
+        # Only today's row is ever read
+        self.budgets.create_index("day", expireAfterSeconds=2 * 24 * 3600)
+
+    def schedule(self, user_id: str, resume_hash: str, job_ids: List[str]):
+        """(Re)start drafting for a user's top jobs; must be called on the event loop"""
+        self.cancel(user_id)
+        self.collection.delete_many({"user_id": user_id, "resume_hash": {"$ne": resume_hash}})
+        task = asyncio.ensure_future(self._run(user_id, resume_hash, job_ids[:self.top_n]))
+        self._tasks[user_id] = task
+        task.add_done_callback(lambda done: self._finished(user_id, done))
+
+    def cancel(self, user_id: str):
+        task = self._tasks.pop(user_id, None)
+        if task and not task.done():
+            task.cancel()
+
+    def _finished(self, user_id: str, task: asyncio.Task):
+        if self._tasks.get(user_id) is task:
+            del self._tasks[user_id]
+        if not task.cancelled() and task.exception():
+            logger.error(f"Draft pre-generation for {user_id} failed: {task.exception()}")
+
+    @staticmethod
+    def _today() -> datetime:
+        return datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+
+    def _remaining_budget(self, user_id: str) -> int:
+        row = self.budgets.find_one({"user_id": user_id, "day": self._today()}, {"drafts": 1})
+        return self.daily_budget - (row['drafts'] if row else 0)
+
+    def _spend_budget(self, user_id: str):
+        self.budgets.update_one({"user_id": user_id, "day": self._today()}, {"$inc": {"drafts": 1}}, upsert=True)
+
+    async def _wait_for_idle(self):
+        while not self.is_idle():
+            await asyncio.sleep(self.idle_poll_seconds)
+
+    async def _run(self, user_id: str, resume_hash: str, job_ids: List[str]):
+        for job_id in job_ids:
+            if self._remaining_budget(user_id) <= 0:
+                logger.info(f"Draft budget used up for {user_id}")
+                return
+            job = self.jobs.find_one({"job_id": job_id}, {"_id": 0})
+            if not job:
+                continue
+            fingerprint = job_fingerprint(job)
+            if self.collection.find_one({
+                "user_id": user_id, "job_id": job_id,
+                "resume_hash": resume_hash, "job_fingerprint": fingerprint
+            }, {"_id": 1}):
+                continue
+            await self._wait_for_idle()
+            draft = await self.generate(user_id, job)
+            # Cancelled or replaced while generating: a newer run owns this user's drafts
+            if self._tasks.get(user_id) is not asyncio.current_task():
+                return
+            if not draft:
+                continue
+            self._spend_budget(user_id)
+            self.collection.update_one(
+                {"user_id": user_id, "job_id": job_id},
+                {"$set": {
+                    'user_id': user_id,
+                    'job_id': job_id,
+                    'resume_hash': resume_hash,
+                    'job_fingerprint': fingerprint,
+                    'customized_resume': draft['customized_resume'],
+                    'cover_letter': draft['cover_letter'],
+                    'used_at': None,
+                    'created_at': datetime.now()
+                }},
+                upsert=True
+            )
+            self.drafts_generated += 1
+
+    def take(self, user_id: str, job: dict, resume_hash: str) -> Optional[dict]:
+        """Claim the unused draft for this job and resume, if it is still valid"""
+        if not job.get('job_id'):
+            return None
+        # Used drafts stay behind so they aren't redrafted
+        return self.collection.find_one_and_update(
+            {
+                "user_id": user_id,
+                "job_id": job['job_id'],
+                "resume_hash": resume_hash,
+                "job_fingerprint": job_fingerprint(job),
+                "used_at": None
+            },
+            {"$set": {"used_at": datetime.now()}}
+        )
+
+    def stats(self) -> dict:
+        return {'active_users': len(self._tasks), 'drafts_generated': self.drafts_generated}
@@ -0,0 +1,261 @@
+import hashlib
+import logging
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from pymongo import UpdateOne
+
+try:
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+    EMBEDDINGS_AVAILABLE = True
+except ImportError as e:
+    print(f"Warning: Local embeddings not available: {e}")
+    EMBEDDINGS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_MODEL = os.environ.get('EMBEDDING_MODEL', 'sentence-transformers/all-MiniLM-L6-v2')
+
+def content_hash(text: str) -> str:
+    """Stable cache key for a piece of text"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def job_embedding_text(job: dict) -> str:
+    """Text used to embed a job: title and requirements first, then the description"""
+    requirements = job.get('requirements') or []
+    if isinstance(requirements, str):
+        requirements = [requirements]
+    return "\n".join([
+        job.get('title') or '',
+        "; ".join(requirements),
+        (job.get('description') or '')[:2000]
+    ])
+
+def quantize(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Symmetric per-row int8 quantization, returning (int8 rows, float32 scales)"""
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    return np.round(vectors / scales[:, None]).astype(np.int8), scales.astype(np.float32)
+
+class SentenceEmbedder:
+    """Mean-pooled sentence embeddings from a small transformer, kept loaded on CPU"""
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL, batch_size: int = 32, max_length: int = 256):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self._tokenizer = None
+        self._model = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._model is None:
+            if not EMBEDDINGS_AVAILABLE:
+                raise RuntimeError("transformers/torch are not installed")
+            logger.info(f"Loading embedding model {self.model_name} on CPU")
+            self._tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+            self._model = AutoModel.from_pretrained(self.model_name).eval()
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """L2-normalised float32 embeddings, computed in batches"""
+        with self._lock:
+            self._load()
+            batches = []
+            for start in range(0, len(texts), self.batch_size):
+                encoded = self._tokenizer(
+                    texts[start:start + self.batch_size],
+                    padding=True,
+                    truncation=True,
+                    max_length=self.max_length,
+                    return_tensors='pt'
+                )
+                with torch.inference_mode():
+                    hidden = self._model(**encoded).last_hidden_state
+                mask = encoded['attention_mask'].unsqueeze(-1).to(hidden.dtype)
+                pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+                pooled = torch.nn.functional.normalize(pooled, p=2, dim=1)
+                batches.append(pooled.numpy().astype(np.float32))
+            return np.vstack(batches) if batches else np.zeros((0, 0), dtype=np.float32)
+
+class EmbeddingIndex:
+    """Approximate nearest-neighbour index over int8-quantized job embeddings.
+
+    Vectors live in one contiguous int8 matrix with a float32 scale per row.
+    Once the catalog is large enough, rows are bucketed by a k-means coarse
+    quantizer (IVF) and a query only scans the ``nprobe`` closest buckets;
+    small catalogs are scanned exhaustively.
+    """
+
+    def __init__(self, nprobe: int = 8, min_ivf_size: int = 2000):
+        self.nprobe = nprobe
+        self.min_ivf_size = min_ivf_size
+        self._lock = threading.RLock()
+        self._vectors = np.zeros((0, 0), dtype=np.int8)
+        self._scales = np.zeros(0, dtype=np.float32)
+        self._alive = np.zeros(0, dtype=bool)
+        self._job_ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._hashes: Dict[str, str] = {}
+        self._centroids: Optional[np.ndarray] = None
+        self._assignments = np.zeros(0, dtype=np.int32)
+        self._trained_size = 0
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def content_hash_for(self, job_id: str) -> Optional[str]:
+        return self._hashes.get(job_id)
+
+    def add(self, job_ids: List[str], hashes: List[str], vectors: np.ndarray, scales: np.ndarray):
+        """Add or replace int8 vectors for jobs"""
+        if not job_ids:
+            return
+        with self._lock:
+            for job_id in job_ids:
+                row = self._rows.pop(job_id, None)
+                if row is not None:
+                    self._alive[row] = False
+            start = len(self._job_ids)
+            if self._vectors.size == 0:
+                self._vectors = np.ascontiguousarray(vectors, dtype=np.int8)
+            else:
+                self._vectors = np.vstack([self._vectors, vectors.astype(np.int8)])
+            self._scales = np.concatenate([self._scales, scales.astype(np.float32)])
+            self._alive = np.concatenate([self._alive, np.ones(len(job_ids), dtype=bool)])
+            for offset, (job_id, digest) in enumerate(zip(job_ids, hashes)):
+                self._job_ids.append(job_id)
+                self._rows[job_id] = start + offset
+                self._hashes[job_id] = digest
+
+            if self._centroids is not None:
+                self._assignments = np.concatenate([self._assignments, self._assign(self._dequantize(start))])
+            # Retrain the coarse quantizer as the catalog outgrows it
+            if len(self._rows) >= self.min_ivf_size and len(self._rows) >= 2 * self._trained_size:
+                self._train()
+
+    def _dequantize(self, start: int = 0) -> np.ndarray:
+        return self._vectors[start:].astype(np.float32) * self._scales[start:, None]
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        return np.argmax(vectors @ self._centroids.T, axis=1).astype(np.int32)
+
+    def _train(self, iterations: int = 10):
+        """Spherical k-means over live vectors with about sqrt(N) lists"""
+        live = np.flatnonzero(self._alive)
+        vectors = self._dequantize()
+        n_lists = max(1, int(np.sqrt(len(live))))
+        rng = np.random.default_rng(0)
+        centroids = vectors[rng.choice(live, n_lists, replace=False)]
+        for _ in range(iterations):
+            assignments = np.argmax(vectors[live] @ centroids.T, axis=1)
+            for cluster in range(n_lists):
+                members = vectors[live[assignments == cluster]]
+                if len(members):
+                    centroid = members.mean(axis=0)
+                    centroids[cluster] = centroid / (np.linalg.norm(centroid) or 1.0)
+        self._centroids = centroids.astype(np.float32)
+        self._assignments = self._assign(vectors)
+        self._trained_size = len(live)
+
+    def search(self, query: np.ndarray, limit: int = 20) -> List[Tuple[str, float]]:
+        """Top (job_id, cosine similarity) pairs for a normalised float32 query"""
+        with self._lock:
+            if not self._rows:
+                return []
+            if self._centroids is not None:
+                probe = np.argsort(-(self._centroids @ query))[:self.nprobe]
+                rows = np.flatnonzero(np.isin(self._assignments, probe) & self._alive)
+            else:
+                rows = np.flatnonzero(self._alive)
+            if len(rows) == 0:
+                return []
+            scores = (self._vectors[rows].astype(np.float32) @ query) * self._scales[rows]
+            k = min(limit, len(rows))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [(self._job_ids[rows[i]], round(float(scores[i]), 4)) for i in top]
+
+class EmbeddingStore:
+    """Embeds jobs and resumes once, caching int8 vectors in Mongo by content hash"""
+
+    def __init__(self, db, embedder: Optional[SentenceEmbedder] = None, index: Optional[EmbeddingIndex] = None):
+        self.cache = db.embedding_cache
+        self.resume_embeddings = db.resume_embeddings
+        self.embedder = embedder or SentenceEmbedder()
+        self.index = index or EmbeddingIndex()
+
+    @property
+    def available(self) -> bool:
+        return EMBEDDINGS_AVAILABLE
+
+    def ensure_indexes(self):
+        self.cache.create_index([("content_hash", 1), ("model", 1)], unique=True)
+        self.resume_embeddings.create_index("user_id", unique=True)
+
+    def _embed_cached(self, texts: List[str]) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """int8 vectors and scales for texts, embedding only hashes not seen before"""
+        hashes = [content_hash(text) for text in texts]
+        model = self.embedder.model_name
+        cached = {
+            row['content_hash']: row
+            for row in self.cache.find({"content_hash": {"$in": list(set(hashes))}, "model": model})
+        }
+        missing = list(dict.fromkeys(h for h in hashes if h not in cached))
+        if missing:
+            text_by_hash = dict(zip(hashes, texts))
+            vectors, scales = quantize(self.embedder.embed([text_by_hash[h] for h in missing]))
+            operations = []
+            for digest, vector, scale in zip(missing, vectors, scales):
+                row = {'content_hash': digest, 'model': model, 'vector': vector.tobytes(), 'scale': float(scale)}
+                operations.append(UpdateOne({"content_hash": digest, "model": model}, {"$set": row}, upsert=True))
+                cached[digest] = row
+            self.cache.bulk_write(operations, ordered=False)
+        vectors = np.vstack([np.frombuffer(cached[h]['vector'], dtype=np.int8) for h in hashes])
+        scales = np.asarray([cached[h]['scale'] for h in hashes], dtype=np.float32)
+        return hashes, vectors, scales
+
+    def index_jobs(self, jobs: Iterable[dict]) -> int:
+        """Embed (or load cached embeddings for) jobs and add them to the ANN index"""
+        if not self.available:
+            return 0
+        pending = []
+        for job in jobs:
+            if not job.get('job_id'):
+                continue
+            text = job_embedding_text(job)
+            if self.index.content_hash_for(job['job_id']) != content_hash(text):
+                pending.append((job['job_id'], text))
+        if not pending:
+            return 0
+        job_ids, texts = [job_id for job_id, _ in pending], [text for _, text in pending]
+        hashes, vectors, scales = self._embed_cached(texts)
+        self.index.add(job_ids, hashes, vectors, scales)
+        return len(job_ids)
+
+    def embed_resume(self, user_id: str, resume_text: str) -> np.ndarray:
+        """Embed a resume once per content version and return its float32 vector"""
+        digest = content_hash(resume_text)
+        stored = self.resume_embeddings.find_one({"user_id": user_id})
+        if stored and stored.get('content_hash') == digest and stored.get('model') == self.embedder.model_name:
+            return np.frombuffer(stored['vector'], dtype=np.float16).astype(np.float32)
+        vector = self.embedder.embed([resume_text])[0]
+        self.resume_embeddings.update_one(
+            {"user_id": user_id},
+            {"$set": {
+                'user_id': user_id,
+                'content_hash': digest,
+                'model': self.embedder.model_name,
+                'vector': vector.astype(np.float16).tobytes()
+            }},
+            upsert=True
+        )
+        return vector
+
+    def similar_jobs(self, user_id: str, resume_text: str, limit: int = 20) -> List[Tuple[str, float]]:
+        """Jobs closest to the user's resume in embedding space"""
+        if not self.available:
+            return []
+        return self.index.search(self.embed_resume(user_id, resume_text), limit=limit)
@@ -0,0 +1,139 @@
+import logging
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional
+
+from location_resolver import default_resolver
+from salary_parser import salary_fields
+from skill_extractor import default_extractor
+
+logger = logging.getLogger(__name__)
+
+# Stored on each job; bump the number when extract_job_fields output changes so the catalog is
+# re-extracted. Skills depend on the taxonomy too, so a new skills.json version also re-extracts.
+JOB_FIELDS_VERSION = f"6+skills-{default_extractor().version}"
+
+# Job keys the extraction reads, so only these are shipped to worker processes
+SOURCE_KEYS = (
+    'title', 'description', 'requirements', 'skills', 'listed_skills', 'location', 'job_type', 'salary_range',
+    'fields_version'
+)
+
+REMOTE_PATTERN = re.compile(r'\b(?:remote|work from home|wfh|anywhere)\b', re.IGNORECASE)
+HYBRID_PATTERN = re.compile(r'\bhybrid\b', re.IGNORECASE)
+OFFICE_PATTERN = re.compile(r'\b(?:office|on-?site|in-person)\b', re.IGNORECASE)
+
+def _requirements(job: dict) -> List[str]:
+    requirements = job.get('requirements') or []
+    return [requirements] if isinstance(requirements, str) else list(requirements)
+
+def listed_skills(job: dict) -> List[str]:
+    """Skills the job's source listed, as opposed to ones extraction derived.
+
+    Extraction overwrites 'skills' with derived skills and keeps the source's
+    list in 'listed_skills', so re-extracting never mistakes its own output for
+    the source's. Jobs extracted before that have no source list to recover.
+    """
+    if job.get('listed_skills') is not None:
+        listed = job['listed_skills']
+    elif job.get('fields_version') is not None:
+        listed = []
+    else:
+        listed = job.get('skills')
+    if isinstance(listed, str):
+        listed = [listed]
+    return [name for name in listed or [] if isinstance(name, str) and name.strip()]
+
+def job_skills(job: dict) -> List[str]:
+    """Canonical skills for a job: its listed skills normalized, otherwise found in its text"""
+    extractor = default_extractor()
+    listed = listed_skills(job)
+    if listed:
+        # Keep listed skills the taxonomy doesn't know rather than dropping them
+        return list(dict.fromkeys(
+            skill for name in listed for skill in (extractor.extract(name) or [name.strip().lower()]) if skill
+        ))
+    return extractor.extract("\n".join([job.get('title') or '', *_requirements(job), job.get('description') or '']))
+
+def work_mode(job: dict) -> str:
+    """'remote', 'hybrid' or 'onsite', trusting location and job type over the description"""
+    headline = " ".join([job.get('location') or '', job.get('job_type') or '', job.get('title') or ''])
+    if HYBRID_PATTERN.search(headline):
+        return 'hybrid'
+    if REMOTE_PATTERN.search(headline):
+        # "Remote / Office" style locations offer both
+        return 'hybrid' if OFFICE_PATTERN.search(job.get('location') or '') else 'remote'
+    description = job.get('description') or ''
+    if HYBRID_PATTERN.search(description):
+        return 'hybrid'
+    if REMOTE_PATTERN.search(description):
+        return 'remote'
+    return 'onsite'
+
+def extract_job_fields(job: dict) -> dict:
+    """Structured fields derived from a job's free text, ready to $set on the job document"""
+    return {
+        'listed_skills': listed_skills(job),
+        'skills': job_skills(job),
+        'work_mode': work_mode(job),
+        **salary_fields(job.get('salary_range')),
+        **default_resolver().location_fields(job.get('location')),
+        'fields_version': JOB_FIELDS_VERSION
+    }
+
+def _extract_chunk(jobs: List[dict]) -> List[dict]:
+    return [extract_job_fields(job) for job in jobs]
+
+class JobFieldExtractor:
+    """Runs extract_job_fields over batches of jobs in a pool of worker processes.
+
+    Batches are split into ``chunk_size`` jobs per task so each worker pays the
+    IPC cost once per chunk rather than once per job. Batches smaller than
+    ``inline_below`` are extracted in the calling process, where pickling would
+    cost more than the work. If the pool breaks, the batch falls back to
+    inline extraction and the pool is recreated on the next call. Blocking;
+    callers on the event loop run it in an executor.
+    """
+
+    def __init__(self, workers: int = None, chunk_size: int = None, inline_below: int = None):
+        self.workers = workers or int(os.environ.get('JOB_FIELD_WORKERS', str(min(2, os.cpu_count() or 1))))
+        self.chunk_size = chunk_size or int(os.environ.get('JOB_FIELD_CHUNK_SIZE', '200'))
+        self.inline_below = inline_below or int(os.environ.get('JOB_FIELD_INLINE_BELOW', '50'))
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # Ingests run from several worker threads; only one of them may start the pool
+        self._pool_lock = threading.Lock()
+        self.jobs_extracted = 0
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                # spawn rather than fork: the server process holds Mongo clients and threads
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+            return self._pool
+
+    def shutdown(self):
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def extract_many(self, jobs: List[dict]) -> List[dict]:
+        """Fields for each job, in the same order"""
+        sources = [{key: job.get(key) for key in SOURCE_KEYS} for job in jobs]
+        self.jobs_extracted += len(sources)
+        if len(sources) < self.inline_below or self.workers <= 1:
+            return _extract_chunk(sources)
+        chunks = [sources[start:start + self.chunk_size] for start in range(0, len(sources), self.chunk_size)]
+        try:
+            return [fields for chunk in self._executor().map(_extract_chunk, chunks) for fields in chunk]
+        except BrokenProcessPool:
+            logger.warning("Job field workers crashed, extracting inline")
+            self.shutdown()
+            return _extract_chunk(sources)
+
+    def stats(self) -> dict:
+        return {'workers': self.workers, 'jobs_extracted': self.jobs_extracted}
@@ -0,0 +1,281 @@
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from search_index import tokenize
+
+# Feature namespaces: title tokens, skills and location tokens share one vocabulary
+TITLE_PREFIX = 't:'
+SKILL_PREFIX = 's:'
+LOCATION_PREFIX = 'l:'
+
+def job_features(job: dict) -> Dict[str, float]:
+    """Sparse feature weights for a job: title tokens, skills and location"""
+    features: Dict[str, float] = {}
+    for token in tokenize(job.get('title') or ''):
+        features[TITLE_PREFIX + token] = features.get(TITLE_PREFIX + token, 0.0) + 1.0
+
+    skills = job.get('skills') or job.get('requirements') or []
+    if isinstance(skills, str):
+        skills = [skills]
+    for token in tokenize(" ".join(skills)):
+        features[SKILL_PREFIX + token] = features.get(SKILL_PREFIX + token, 0.0) + 1.0
+
+    for token in tokenize(job.get('location') or ''):
+        features[LOCATION_PREFIX + token] = 1.0
+    if (job.get('job_type') or '').lower() == 'remote':
+        features[LOCATION_PREFIX + 'remote'] = 1.0
+
+    # Sublinear term frequency so long requirement lists don't dominate
+    return {feature: 1.0 + np.log(count) for feature, count in features.items()}
+
+def user_features(preferences: Optional[dict], resume_skills: Optional[List[str]] = None) -> Dict[str, float]:
+    """Query weights built from job preferences and resume skills"""
+    preferences = preferences or {}
+    features: Dict[str, float] = {}
+    for title in preferences.get('job_titles') or []:
+        for token in tokenize(title):
+            features[TITLE_PREFIX + token] = 1.0
+    for keyword in (preferences.get('keywords') or []) + (resume_skills or []):
+        for token in tokenize(keyword):
+            features[SKILL_PREFIX + token] = 1.0
+    for location in preferences.get('locations') or []:
+        for token in tokenize(location):
+            features[LOCATION_PREFIX + token] = 1.0
+    if (preferences.get('job_type') or '').lower() == 'remote':
+        features[LOCATION_PREFIX + 'remote'] = 1.0
+    return features
+
+class JobRanker:
+    """Vectorized job-to-user relevance ranking.
+
+    Jobs are rows of an L2-normalised float32 CSR matrix over title, skill and
+    location features. A request builds one IDF-weighted user vector and scores
+    the whole catalog with a single sparse mat-vec, adds a vectorized salary-fit
+    term and selects the top-k with argpartition.
+    """
+
+    DEFAULT_WEIGHTS = {'text': 1.0, 'salary': 0.15}
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None):
+        self.weights = dict(self.DEFAULT_WEIGHTS, **(weights or {}))
+        self._lock = threading.RLock()
+        self.clear()
+
+    def clear(self):
+        """Drop every ranked job"""
+        with self._lock:
+            self._vocabulary: Dict[str, int] = {}
+            self._doc_freq = np.zeros(0, dtype=np.float32)
+            self._matrix = sparse.csr_matrix((0, 0), dtype=np.float32)
+            self._salary_min = np.zeros(0, dtype=np.float32)
+            self._salary_max = np.zeros(0, dtype=np.float32)
+            self._alive = np.zeros(0, dtype=bool)
+            self._company_codes = np.zeros(0, dtype=np.int32)
+            self._company_ids: Dict[str, int] = {}
+            self._job_ids: List[str] = []
+            self._rows: Dict[str, int] = {}
+            self._pending: List[dict] = []
+            # Changes awaiting the first build, by job_id; None marks a removal
+            self._changes: Optional[Dict[str, Optional[dict]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._rows) + len(self._pending)
+
+    def build(self, jobs: Iterable[dict]) -> int:
+        """Rebuild the feature matrix from a catalog snapshot.
+
+        Jobs added or removed since the ranker was created or cleared are
+        replayed on top of the snapshot: ingestion writes the catalog before
+        calling add_jobs, so those versions are never older than the
+        snapshot's and may be missing from it when it was read earlier.
+        """
+        with self._lock:
+            changes = self._changes
+            self.clear()
+            self._pending = [job for job in jobs if job.get('job_id')]
+            self._flush()
+            for job_id, job in (changes or {}).items():
+                if job is None:
+                    self._tombstone(job_id)
+                else:
+                    self._pending.append(job)
+            self._flush()
+            self._changes = None
+            return len(self._rows)
+
+    def add_jobs(self, jobs: Iterable[dict]):
+        """Queue new or updated jobs; they are appended to the matrix on next rank"""
+        with self._lock:
+            for job in jobs:
+                if job.get('job_id'):
+                    self._pending.append(job)
+                    if self._changes is not None:
+                        self._changes[job['job_id']] = job
+
+    def remove_job(self, job_id: str):
+        """Exclude a job from ranking"""
+        with self._lock:
+            self._tombstone(job_id)
+            self._pending = [job for job in self._pending if job.get('job_id') != job_id]
+            if self._changes is not None:
+                self._changes[job_id] = None
+
+    def _tombstone(self, job_id: str):
+        row = self._rows.pop(job_id, None)
+        if row is not None:
+            self._alive[row] = False
+            start, end = self._matrix.indptr[row], self._matrix.indptr[row + 1]
+            np.subtract.at(self._doc_freq, self._matrix.indices[start:end], 1.0)
+
+    def _compact(self):
+        """Drop tombstoned rows once they make up a quarter of the matrix"""
+        dead = len(self._job_ids) - len(self._rows)
+        if dead <= 0.25 * max(len(self._rows), 1):
+            return
+        live = np.flatnonzero(self._alive)
+        self._matrix = self._matrix[live]
+        self._salary_min = self._salary_min[live]
+        self._salary_max = self._salary_max[live]
+        self._company_codes = self._company_codes[live]
+        self._alive = np.ones(len(live), dtype=bool)
+        self._job_ids = [self._job_ids[row] for row in live]
+        self._rows = {job_id: row for row, job_id in enumerate(self._job_ids)}
+
+    def _flush(self):
+        """Append queued jobs to the matrix as one CSR block"""
+        if not self._pending:
+            return
+        jobs, self._pending = self._pending, []
+
+        # Later duplicates in the same batch win
+        latest = {job['job_id']: job for job in jobs}
+        for job_id in latest:
+            self._tombstone(job_id)
+
+        indptr, indices, data = [0], [], []
+        salary_min, salary_max = [], []
+        for job in latest.values():
+            features = job_features(job)
+            for feature, weight in features.items():
+                column = self._vocabulary.setdefault(feature, len(self._vocabulary))
+                indices.append(column)
+                data.append(weight)
+            indptr.append(len(indices))
+            # Annual base-currency bounds extracted at ingestion; NaN when the job states none
+            salary_min.append(job.get('salary_min') if job.get('salary_min') is not None else np.nan)
+            salary_max.append(job.get('salary_max') if job.get('salary_max') is not None else np.nan)
+
+        n_columns = len(self._vocabulary)
+        block = sparse.csr_matrix(
+            (np.asarray(data, dtype=np.float32), np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int64)),
+            shape=(len(latest), n_columns)
+        )
+        block.sum_duplicates()
+        norms = np.sqrt(np.asarray(block.multiply(block).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        block = sparse.diags((1.0 / norms).astype(np.float32)) @ block
+
+        doc_freq = np.zeros(n_columns, dtype=np.float32)
+        doc_freq[:len(self._doc_freq)] = self._doc_freq
+        np.add.at(doc_freq, block.indices, 1.0)
+        self._doc_freq = doc_freq
+
+        existing = self._matrix
+        if existing.shape[1] != n_columns:
+            existing = sparse.csr_matrix(
+                (existing.data, existing.indices, existing.indptr),
+                shape=(existing.shape[0], n_columns)
+            )
+        self._matrix = sparse.vstack([existing, block], format='csr', dtype=np.float32)
+
+        start = len(self._job_ids)
+        company_codes = []
+        for offset, job in enumerate(latest.values()):
+            self._job_ids.append(job['job_id'])
+            self._rows[job['job_id']] = start + offset
+            company = (job.get('company') or '').lower()
+            company_codes.append(self._company_ids.setdefault(company, len(self._company_ids)))
+        self._company_codes = np.concatenate([self._company_codes, np.asarray(company_codes, dtype=np.int32)])
+        self._salary_min = np.concatenate([self._salary_min, np.asarray(salary_min, dtype=np.float32)])
+        self._salary_max = np.concatenate([self._salary_max, np.asarray(salary_max, dtype=np.float32)])
+        self._alive = np.concatenate([self._alive, np.ones(len(latest), dtype=bool)])
+        self._compact()
+
+    def _idf(self) -> np.ndarray:
+        n_docs = max(len(self._rows), 1)
+        return np.log1p(n_docs / (1.0 + self._doc_freq)).astype(np.float32)
+
+    def _salary_fit(self, min_salary: Optional[int], max_salary: Optional[int], rows: np.ndarray) -> np.ndarray:
+        """1.0 when the job's range overlaps the wanted range, decaying with the gap, 0.5 if unknown"""
+        fit = np.full(len(rows), 0.5, dtype=np.float32)
+        if not min_salary and not max_salary:
+            return fit
+        job_low, job_high = self._salary_min[rows], self._salary_max[rows]
+        known = ~np.isnan(job_high)
+        fit[known] = 1.0
+        if min_salary:
+            short = known & (job_high < min_salary)
+            fit[short] = np.clip(job_high[short] / min_salary, 0.0, 1.0)
+        if max_salary:
+            over = known & (job_low > max_salary)
+            fit[over] = np.minimum(fit[over], np.clip(max_salary / job_low[over], 0.0, 1.0))
+        return fit
+
+    def rank(
+        self,
+        preferences: Optional[dict],
+        resume_skills: Optional[List[str]] = None,
+        candidate_ids: Optional[Sequence[str]] = None,
+        limit: int = 50
+    ) -> List[Tuple[str, float]]:
+        """Score the catalog, or just candidate_ids, for a user and return the top (job_id, score) pairs"""
+        preferences = preferences or {}
+        with self._lock:
+            self._flush()
+            n_rows = len(self._job_ids)
+            if n_rows == 0 or limit <= 0:
+                return []
+
+            query = np.zeros(len(self._vocabulary), dtype=np.float32)
+            for feature, weight in user_features(preferences, resume_skills).items():
+                column = self._vocabulary.get(feature)
+                if column is not None:
+                    query[column] = weight
+            query *= self._idf()
+            query_norm = np.linalg.norm(query)
+            if query_norm > 0:
+                query /= query_norm
+
+            if candidate_ids is None:
+                rows = np.flatnonzero(self._alive)
+            else:
+                # Only the candidate rows are multiplied, so scoring a few new jobs stays cheap
+                rows = np.unique(np.fromiter(
+                    (self._rows[job_id] for job_id in candidate_ids if job_id in self._rows), dtype=np.int64
+                ))
+            excluded = [
+                self._company_ids[name.lower()]
+                for name in preferences.get('excluded_companies') or []
+                if name.lower() in self._company_ids
+            ]
+            if excluded:
+                rows = rows[~np.isin(self._company_codes[rows], excluded)]
+            k = min(limit, len(rows))
+            if k == 0:
+                return []
+
+            if candidate_ids is None:
+                text = (self._matrix @ query)[rows]
+            else:
+                text = self._matrix[rows] @ query
+            scores = self.weights['text'] * text
+            scores += self.weights['salary'] * self._salary_fit(
+                preferences.get('min_salary'), preferences.get('max_salary'), rows
+            )
+
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind='stable')]
+            return [(self._job_ids[rows[i]], round(float(scores[i]), 4)) for i in top]
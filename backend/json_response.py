@@ -0,0 +1,43 @@
+import json
+from datetime import date, datetime
+from typing import Any
+
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    print("Warning: orjson not available, responses use the standard json encoder")
+
+def _encode_bson(value: Any) -> Any:
+    """Fallback for types the encoder doesn't know natively"""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Type {type(value).__name__} is not JSON serializable")
+
+class DocumentResponse(JSONResponse):
+    """JSON response that serializes Mongo documents as they come out of pymongo.
+
+    ObjectIds become strings and datetimes ISO 8601 strings in the encoder's
+    single pass, so routes can return raw documents without copying them
+    first. Routes should return an instance directly, since FastAPI only skips
+    its own jsonable_encoder pass for Response objects.
+    """
+
+    if ORJSON_AVAILABLE:
+        def render(self, content: Any) -> bytes:
+            return orjson.dumps(
+                content,
+                default=_encode_bson,
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+            )
+    else:
+        def render(self, content: Any) -> bytes:
+            return json.dumps(
+                content, default=_encode_bson, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+            ).encode("utf-8")
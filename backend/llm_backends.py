@@ -0,0 +1,305 @@
+import asyncio
+import inspect
+import json
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import Future
+from typing import List, Optional
+
+from structured_output import JsonObjectScanner
+
+try:
+    import torch
+    from transformers import AutoModelForCausalLM, AutoTokenizer, StoppingCriteria, StoppingCriteriaList
+    TRANSFORMERS_AVAILABLE = True
+except ImportError as e:
+    print(f"Warning: Local transformers inference not available: {e}")
+    TRANSFORMERS_AVAILABLE = False
+
+try:
+    from llama_cpp import Llama, LlamaGrammar
+    LLAMA_CPP_AVAILABLE = True
+except ImportError:
+    LLAMA_CPP_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+class LLMBackend:
+    """Interface shared by every text generation backend.
+
+    With ``json_schema`` the caller wants one JSON object: backends constrain
+    decoding to the schema where they can and stop as soon as the object closes.
+    """
+
+    name = "base"
+    # Whether generate_batch runs prompts together rather than one by one
+    supports_batching = False
+
+    async def generate(self, prompt: str, max_tokens: int, temperature: float, json_schema: Optional[dict] = None) -> str:
+        raise NotImplementedError
+
+    async def generate_batch(
+        self, prompts: List[str], max_tokens: int, temperature: float, json_schema: Optional[dict] = None
+    ) -> List[str]:
+        """Generate for several prompts; backends without batching run them concurrently"""
+        return list(await asyncio.gather(*(self.generate(p, max_tokens, temperature, json_schema) for p in prompts)))
+
+class HostedGemmaBackend(LLMBackend):
+    """Hugging Face hosted inference through InferenceClient"""
+
+    name = "huggingface"
+
+    def __init__(self, client):
+        self.client = client
+        # Grammar-guided decoding needs a recent huggingface_hub and a TGI endpoint that accepts it
+        self.use_grammar = 'grammar' in inspect.signature(client.text_generation).parameters
+
+    def _complete_json(self, prompt: str, max_tokens: int, temperature: float, json_schema: dict) -> str:
+        """Stream tokens and hang up as soon as the JSON object closes"""
+        kwargs = {'grammar': {'type': 'json', 'value': json_schema}} if self.use_grammar else {}
+        try:
+            stream = self.client.text_generation(
+                prompt=prompt,
+                max_new_tokens=max_tokens,
+                temperature=temperature,
+                do_sample=True,
+                stream=True,
+                **kwargs
+            )
+            parts = []
+            scanner = JsonObjectScanner()
+            for token in stream:
+                parts.append(token)
+                if scanner.feed(token):
+                    break
+            return "".join(parts)
+        except Exception as e:
+            if not kwargs:
+                raise
+            logger.warning(f"Endpoint rejected grammar-guided generation, continuing without it: {e}")
+            self.use_grammar = False
+            return self._complete_json(prompt, max_tokens, temperature, json_schema)
+
+    async def generate(self, prompt: str, max_tokens: int, temperature: float, json_schema: Optional[dict] = None) -> str:
+        # InferenceClient is synchronous; keep it off the event loop
+        if json_schema is not None:
+            return await asyncio.get_running_loop().run_in_executor(
+                None, self._complete_json, prompt, max_tokens, temperature, json_schema
+            )
+        return await asyncio.get_running_loop().run_in_executor(
+            None,
+            lambda: self.client.text_generation(
+                prompt=prompt,
+                max_new_tokens=max_tokens,
+                temperature=temperature,
+                do_sample=True,
+                return_full_text=False
+            )
+        )
+
+class _GenerationRequest:
+    def __init__(self, prompts: List[str], max_tokens: int, temperature: float, json_schema: Optional[dict] = None):
+        self.prompts = prompts
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self.json_schema = json_schema
+        self.future: Future = Future()
+
+    @property
+    def settings(self) -> tuple:
+        return (self.max_tokens, self.temperature, self.json_schema is not None)
+
+if TRANSFORMERS_AVAILABLE:
+    class _JsonObjectsClosed(StoppingCriteria):
+        """Stops a batch once every sequence has closed its first JSON object"""
+
+        def __init__(self, tokenizer, batch_size: int):
+            self.tokenizer = tokenizer
+            self.scanners = [JsonObjectScanner() for _ in range(batch_size)]
+
+        def __call__(self, input_ids, scores, **kwargs) -> bool:
+            for scanner, token in zip(self.scanners, input_ids[:, -1].tolist()):
+                scanner.feed(self.tokenizer.decode([token], skip_special_tokens=True))
+            return all(scanner.complete for scanner in self.scanners)
+
+class LocalTransformersBackend(LLMBackend):
+    """Gemma (or any causal LM) loaded once on CPU, served from a batching worker thread.
+
+    Requests wait in a queue; the worker drains every queued request with the
+    same sampling settings into one ``generate`` call, as long as the batch's
+    worst-case KV cache (prompt + new tokens per sequence) fits ``kv_token_budget``.
+    Linear layers are dynamically quantized to int8 unless disabled. JSON
+    requests stop once every sequence in the batch has closed its object.
+    """
+
+    name = "local"
+    supports_batching = True
+
+    def __init__(
+        self,
+        model_name: str = None,
+        kv_token_budget: int = None,
+        max_batch_size: int = None,
+        quantize: bool = None,
+        threads: int = None
+    ):
+        self.model_name = model_name or os.environ.get('LOCAL_LLM_MODEL', 'google/gemma-2-2b-it')
+        self.kv_token_budget = kv_token_budget or int(os.environ.get('LOCAL_LLM_KV_TOKENS', '16384'))
+        self.max_batch_size = max_batch_size or int(os.environ.get('LOCAL_LLM_MAX_BATCH', '8'))
+        self.quantize = quantize if quantize is not None else os.environ.get('LOCAL_LLM_QUANTIZE', '1') == '1'
+        self.threads = threads or int(os.environ.get('LOCAL_LLM_THREADS', str(os.cpu_count() or 4)))
+        self._queue: "queue.Queue[_GenerationRequest]" = queue.Queue()
+        self._tokenizer = None
+        self._model = None
+        self._worker = threading.Thread(target=self._run, name="local-llm", daemon=True)
+        self._worker.start()
+
+    def _load(self):
+        if self._model is not None:
+            return
+        if not TRANSFORMERS_AVAILABLE:
+            raise RuntimeError("transformers/torch are not installed")
+        logger.info(f"Loading local model {self.model_name} on CPU")
+        torch.set_num_threads(self.threads)
+        self._tokenizer = AutoTokenizer.from_pretrained(self.model_name, padding_side='left')
+        if self._tokenizer.pad_token is None:
+            self._tokenizer.pad_token = self._tokenizer.eos_token
+        model = AutoModelForCausalLM.from_pretrained(self.model_name, torch_dtype=torch.float32).eval()
+        if self.quantize:
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        self._model = model
+
+    def _prompt_tokens(self, prompt: str) -> int:
+        return len(self._tokenizer(prompt)['input_ids'])
+
+    def _next_batch(self, first: _GenerationRequest) -> List[_GenerationRequest]:
+        """Pull compatible queued requests while the batch fits the KV budget"""
+        batch = [first]
+        kv_tokens = sum(self._prompt_tokens(p) + first.max_tokens for p in first.prompts)
+        size = len(first.prompts)
+        deferred = []
+        while size < self.max_batch_size:
+            try:
+                request = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            cost = sum(self._prompt_tokens(p) + request.max_tokens for p in request.prompts)
+            compatible = request.settings == first.settings
+            fits = kv_tokens + cost <= self.kv_token_budget and size + len(request.prompts) <= self.max_batch_size
+            if compatible and fits:
+                batch.append(request)
+                kv_tokens += cost
+                size += len(request.prompts)
+            else:
+                deferred.append(request)
+        for request in deferred:
+            self._queue.put(request)
+        return batch
+
+    def _generate(self, prompts: List[str], max_tokens: int, temperature: float, json_output: bool = False) -> List[str]:
+        encoded = self._tokenizer(prompts, return_tensors='pt', padding=True)
+        stopping = StoppingCriteriaList([_JsonObjectsClosed(self._tokenizer, len(prompts))]) if json_output else None
+        with torch.inference_mode():
+            output = self._model.generate(
+                **encoded,
+                max_new_tokens=max_tokens,
+                do_sample=temperature > 0,
+                temperature=temperature if temperature > 0 else None,
+                use_cache=True,
+                pad_token_id=self._tokenizer.pad_token_id,
+                stopping_criteria=stopping
+            )
+        new_tokens = output[:, encoded['input_ids'].shape[1]:]
+        return self._tokenizer.batch_decode(new_tokens, skip_special_tokens=True)
+
+    def _run(self):
+        # Load eagerly so the first request doesn't pay for it; failures surface per request
+        try:
+            self._load()
+        except Exception as e:
+            logger.error(f"Failed to load local model {self.model_name}: {e}")
+        while True:
+            first = self._queue.get()
+            try:
+                self._load()
+                batch = self._next_batch(first)
+            except Exception as e:
+                first.future.set_exception(e)
+                continue
+            prompts = [prompt for request in batch for prompt in request.prompts]
+            try:
+                outputs = self._generate(prompts, first.max_tokens, first.temperature, first.json_schema is not None)
+            except Exception as e:
+                for request in batch:
+                    request.future.set_exception(e)
+                continue
+            offset = 0
+            for request in batch:
+                request.future.set_result(outputs[offset:offset + len(request.prompts)])
+                offset += len(request.prompts)
+
+    async def generate_batch(
+        self, prompts: List[str], max_tokens: int, temperature: float, json_schema: Optional[dict] = None
+    ) -> List[str]:
+        request = _GenerationRequest(prompts, max_tokens, temperature, json_schema)
+        self._queue.put(request)
+        return await asyncio.wrap_future(request.future)
+
+    async def generate(self, prompt: str, max_tokens: int, temperature: float, json_schema: Optional[dict] = None) -> str:
+        return (await self.generate_batch([prompt], max_tokens, temperature, json_schema))[0]
+
+class LlamaCppBackend(LLMBackend):
+    """Quantized GGUF model served by llama.cpp on CPU, one sequence at a time.
+
+    JSON requests are decoded under a grammar compiled from the schema, so the
+    completion is a valid object and ends when it closes.
+    """
+
+    name = "gguf"
+
+    def __init__(self, model_path: str = None, context_tokens: int = None, threads: int = None):
+        if not LLAMA_CPP_AVAILABLE:
+            raise RuntimeError("llama-cpp-python is not installed")
+        self.model_path = model_path or os.environ['LOCAL_LLM_GGUF_PATH']
+        self._llama = Llama(
+            model_path=self.model_path,
+            n_ctx=context_tokens or int(os.environ.get('LOCAL_LLM_CONTEXT', '4096')),
+            n_threads=threads or int(os.environ.get('LOCAL_LLM_THREADS', str(os.cpu_count() or 4))),
+            verbose=False
+        )
+        # llama.cpp contexts are not thread-safe; the lock doubles as the request queue
+        self._lock = threading.Lock()
+        self._grammars = {}
+
+    def _grammar(self, json_schema: dict):
+        key = json.dumps(json_schema, sort_keys=True)
+        if key not in self._grammars:
+            self._grammars[key] = LlamaGrammar.from_json_schema(key)
+        return self._grammars[key]
+
+    def _complete(self, prompt: str, max_tokens: int, temperature: float, json_schema: Optional[dict] = None) -> str:
+        grammar = self._grammar(json_schema) if json_schema is not None else None
+        with self._lock:
+            result = self._llama(prompt, max_tokens=max_tokens, temperature=temperature, grammar=grammar)
+        return result['choices'][0]['text']
+
+    async def generate(self, prompt: str, max_tokens: int, temperature: float, json_schema: Optional[dict] = None) -> str:
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self._complete, prompt, max_tokens, temperature, json_schema
+        )
+
+def create_llm_backend(hf_client=None) -> Optional[LLMBackend]:
+    """Backend selected by LLM_BACKEND (huggingface, local or gguf); None if unusable"""
+    backend = os.environ.get('LLM_BACKEND', 'huggingface').lower()
+    try:
+        if backend == 'local':
+            if not TRANSFORMERS_AVAILABLE:
+                raise RuntimeError("transformers/torch are not installed")
+            return LocalTransformersBackend()
+        if backend == 'gguf':
+            return LlamaCppBackend()
+    except Exception as e:
+        logger.error(f"Could not start {backend} LLM backend, falling back to hosted inference: {e}")
+    return HostedGemmaBackend(hf_client) if hf_client else None
@@ -0,0 +1,355 @@
+import asyncio
+import hashlib
+import json
+import math
+import os
+import re
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Tuple, TypeVar
+
+from llm_backends import LLMBackend
+
+T = TypeVar('T')
+
+class MicroBatcher:
+    """Collects concurrent generation calls into batched backend requests.
+
+    Calls with the same (max_tokens, temperature, JSON schema) that arrive within
+    ``max_wait_ms`` of the first one are sent together through
+    ``backend.generate_batch`` and each caller gets its own completion back.
+    A group is dispatched early once it reaches ``max_batch_size``. Backends
+    that cannot batch are called directly so they pay no waiting window.
+    """
+
+    def __init__(self, backend: LLMBackend, max_batch_size: int = None, max_wait_ms: float = None):
+        self.backend = backend
+        self.max_batch_size = max_batch_size or int(os.environ.get('LLM_BATCH_MAX_SIZE', '8'))
+        if max_wait_ms is None:
+            max_wait_ms = float(os.environ.get('LLM_BATCH_MAX_WAIT_MS', '20'))
+        self.max_wait = max_wait_ms / 1000
+        self._pending: Dict[Tuple[int, float, Optional[str]], List[Tuple[str, asyncio.Future]]] = {}
+        self._timers: Dict[Tuple[int, float, Optional[str]], asyncio.TimerHandle] = {}
+        self.batches_dispatched = 0
+        self.requests_batched = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend.supports_batching and self.max_batch_size > 1
+
+    async def generate(self, prompt: str, max_tokens: int, temperature: float, json_schema: Optional[dict] = None) -> str:
+        """Generate one completion, sharing a backend batch with concurrent callers"""
+        if not self.enabled:
+            return await self.backend.generate(prompt, max_tokens, temperature, json_schema)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        key = (max_tokens, temperature, json.dumps(json_schema, sort_keys=True) if json_schema is not None else None)
+        group = self._pending.setdefault(key, [])
+        group.append((prompt, future))
+        if len(group) >= self.max_batch_size:
+            self._dispatch(key)
+        elif len(group) == 1:
+            self._timers[key] = loop.call_later(self.max_wait, self._dispatch, key)
+        return await future
+
+    def _dispatch(self, key: Tuple[int, float, Optional[str]]):
+        timer = self._timers.pop(key, None)
+        if timer:
+            timer.cancel()
+        group = self._pending.pop(key, None)
+        if group:
+            asyncio.ensure_future(self._run_batch(key, group))
+
+    async def _run_batch(self, key: Tuple[int, float, Optional[str]], group: List[Tuple[str, asyncio.Future]]):
+        max_tokens, temperature, schema = key
+        json_schema = json.loads(schema) if schema is not None else None
+        self.batches_dispatched += 1
+        self.requests_batched += len(group)
+        try:
+            outputs = await self.backend.generate_batch(
+                [prompt for prompt, _ in group], max_tokens, temperature, json_schema
+            )
+        except Exception as e:
+            for _, future in group:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), output in zip(group, outputs):
+            if not future.done():
+                future.set_result(output)
+
+    def stats(self) -> dict:
+        """Batching counters for monitoring"""
+        return {
+            'enabled': self.enabled,
+            'batches_dispatched': self.batches_dispatched,
+            'requests_batched': self.requests_batched,
+            'average_batch_size': round(self.requests_batched / self.batches_dispatched, 2) if self.batches_dispatched else 0.0
+        }
+
+class SingleFlight:
+    """Deduplicates identical in-flight generations.
+
+    Concurrent calls with the same key await one shared task instead of each
+    hitting the model. The task is shielded, so a caller that disconnects
+    does not cancel the work other callers are waiting on; once every caller
+    has been cancelled nobody can use the result and the task is cancelled
+    too. Keys are forgotten as soon as the task finishes, so later identical
+    calls generate afresh.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._callers: Dict[str, int] = {}
+        self.coalesced = 0
+
+    @staticmethod
+    def prompt_key(prompt: str, max_tokens: int, temperature: float) -> str:
+        """Key on the whitespace-normalised prompt plus sampling settings"""
+        normalized = re.sub(r'\s+', ' ', prompt).strip()
+        return hashlib.sha256(f"{max_tokens}|{temperature}|{normalized}".encode('utf-8')).hexdigest()
+
+    async def run(self, key: str, factory: Callable[[], Awaitable[T]]) -> T:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            self._callers[key] = 0
+            task.add_done_callback(lambda _: self._forget(key, task))
+        else:
+            self.coalesced += 1
+        self._callers[key] += 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            if self._inflight.get(key) is task:
+                self._callers[key] -= 1
+                if self._callers[key] == 0 and not task.done():
+                    # Forget it right away so a new identical call starts afresh instead of joining
+                    self._forget(key, task)
+                    task.cancel()
+
+    def _forget(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+            del self._callers[key]
+
+    def stats(self) -> dict:
+        return {'inflight': len(self._inflight), 'coalesced': self.coalesced}
+
+INTERACTIVE = 'interactive'
+BATCH = 'batch'
+BACKGROUND = 'background'
+PRIORITY_CLASSES = (INTERACTIVE, BATCH, BACKGROUND)
+
+class QueueFullError(Exception):
+    """Raised when a priority class has no room left in the generation queue"""
+
+    def __init__(self, priority: str, retry_after: int):
+        super().__init__(f"The {priority} generation queue is full, retry in {retry_after}s")
+        self.priority = priority
+        self.retry_after = retry_after
+
+class PriorityScheduler:
+    """Admission control for generations by priority class, fair across users.
+
+    At most ``max_concurrency`` generations hold a slot at once. Callers that
+    can't get one wait in their class's queue, which is split per user: a freed
+    slot goes to the highest non-empty class (interactive, then batch, then
+    background) and rotates round-robin across that class's users, so one
+    user's burst can't starve the rest. Each user may have at most
+    ``max_queue_per_user`` calls waiting in a class, so a burst is turned away
+    before it can fill the class queue for everyone else. A full class or
+    user queue rejects new calls right away with QueueFullError and a
+    Retry-After estimate based on how long slots have recently been held.
+    """
+
+    def __init__(self, max_concurrency: int = None, max_queue: Dict[str, int] = None, max_queue_per_user: int = None):
+        self.max_concurrency = max_concurrency or int(os.environ.get('LLM_MAX_CONCURRENCY', '8'))
+        self.max_queue = max_queue or {
+            INTERACTIVE: int(os.environ.get('LLM_QUEUE_INTERACTIVE', '32')),
+            BATCH: int(os.environ.get('LLM_QUEUE_BATCH', '64')),
+            BACKGROUND: int(os.environ.get('LLM_QUEUE_BACKGROUND', '16')),
+        }
+        self.max_queue_per_user = max_queue_per_user or int(os.environ.get('LLM_QUEUE_PER_USER', '4'))
+        self._running = 0
+        self._waiting: Dict[str, "OrderedDict[str, Deque[asyncio.Future]]"] = {
+            priority: OrderedDict() for priority in PRIORITY_CLASSES
+        }
+        self._queued = {priority: 0 for priority in PRIORITY_CLASSES}
+        self._average_seconds = 5.0
+        self.rejected = {priority: 0 for priority in PRIORITY_CLASSES}
+
+    @property
+    def idle(self) -> bool:
+        return self._running == 0 and not any(self._queued.values())
+
+    def retry_after(self, priority: str) -> int:
+        """Seconds until a slot is likely to free up for this class"""
+        ahead = sum(self._queued[p] for p in PRIORITY_CLASSES[:PRIORITY_CLASSES.index(priority) + 1])
+        return max(1, math.ceil((ahead / self.max_concurrency + 1) * self._average_seconds))
+
+    @asynccontextmanager
+    async def slot(self, priority: str = INTERACTIVE, user_id: Optional[str] = None):
+        """Hold one generation slot for the duration of the block"""
+        if priority not in self._waiting:
+            raise ValueError(f"Unknown priority class: {priority}")
+        await self._acquire(priority, user_id or '')
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            yield
+        finally:
+            held = loop.time() - started
+            self._average_seconds = 0.8 * self._average_seconds + 0.2 * held
+            self._release()
+
+    async def _acquire(self, priority: str, user_id: str):
+        if self._running < self.max_concurrency and not any(self._queued.values()):
+            self._running += 1
+            return
+        waiters = self._waiting[priority].get(user_id)
+        # Callers without a user id share one queue, so only identified users are capped
+        over_user_cap = bool(user_id) and waiters is not None and len(waiters) >= self.max_queue_per_user
+        if over_user_cap or self._queued[priority] >= self.max_queue[priority]:
+            self.rejected[priority] += 1
+            raise QueueFullError(priority, self.retry_after(priority))
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiting[priority].setdefault(user_id, deque()).append(future)
+        self._queued[priority] += 1
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Cancelled after being handed a slot: give it to the next waiter
+            if future.done() and not future.cancelled():
+                self._release()
+            else:
+                # Still queued: free its place so it doesn't count against the class or user cap
+                queue = self._waiting[priority].get(user_id)
+                if queue is not None and future in queue:
+                    queue.remove(future)
+                    self._queued[priority] -= 1
+                    if not queue:
+                        del self._waiting[priority][user_id]
+            raise
+
+    def _release(self):
+        self._running -= 1
+        while self._running < self.max_concurrency:
+            future = self._next_waiter()
+            if future is None:
+                return
+            self._running += 1
+            future.set_result(None)
+
+    def _next_waiter(self) -> Optional[asyncio.Future]:
+        for priority in PRIORITY_CLASSES:
+            users = self._waiting[priority]
+            while users:
+                user_id, waiters = users.popitem(last=False)
+                future = waiters.popleft()
+                self._queued[priority] -= 1
+                if waiters:
+                    users[user_id] = waiters  # back of the round-robin
+                if not future.cancelled():
+                    return future
+        return None
+
+    def stats(self) -> dict:
+        return {
+            'running': self._running,
+            'max_concurrency': self.max_concurrency,
+            'max_queue_per_user': self.max_queue_per_user,
+            'queued': dict(self._queued),
+            'rejected': dict(self.rejected),
+            'average_seconds': round(self._average_seconds, 2)
+        }
+
+class CircuitBreaker:
+    """Stops calling an inference backend that is failing or too slow.
+
+    Closed: calls go through and their outcomes fill a rolling window; a call
+    counts as failed if it raised, returned nothing usable or took longer than
+    ``slow_call_seconds``. Once the window holds ``min_calls`` outcomes with a
+    failure rate of at least ``failure_threshold`` the breaker opens and callers
+    fall back immediately. After ``open_seconds`` it half-opens and lets a
+    single probe through: success closes it, failure opens it again.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(
+        self,
+        window: int = 20,
+        min_calls: int = 5,
+        failure_threshold: float = None,
+        slow_call_seconds: float = None,
+        open_seconds: float = None
+    ):
+        self.min_calls = min_calls
+        self.failure_threshold = failure_threshold or float(os.environ.get('LLM_BREAKER_FAILURE_RATE', '0.5'))
+        self.slow_call_seconds = slow_call_seconds or float(os.environ.get('LLM_BREAKER_SLOW_SECONDS', '30'))
+        self.open_seconds = open_seconds or float(os.environ.get('LLM_BREAKER_OPEN_SECONDS', '30'))
+        self.state = self.CLOSED
+        self._outcomes: Deque[Tuple[bool, float]] = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self.trips = 0
+
+    @property
+    def is_open(self) -> bool:
+        """Open and still cooling down, so calls should not even be queued"""
+        return self.state == self.OPEN and time.monotonic() - self._opened_at < self.open_seconds
+
+    def allow(self) -> bool:
+        """Whether a call may go to the backend now"""
+        if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self.state = self.HALF_OPEN
+            self._probe_in_flight = False
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def record(self, success: bool, seconds: float):
+        """Report the outcome of a call that allow() let through"""
+        ok = success and seconds < self.slow_call_seconds
+        if self.state == self.HALF_OPEN:
+            self._probe_in_flight = False
+            if ok:
+                self.state = self.CLOSED
+                self._outcomes.clear()
+            else:
+                self._open()
+            return
+        self._outcomes.append((ok, seconds))
+        if self.state == self.CLOSED and len(self._outcomes) >= self.min_calls:
+            if self.failure_rate() >= self.failure_threshold:
+                self._open()
+
+    def _open(self):
+        self.state = self.OPEN
+        self._opened_at = time.monotonic()
+        self.trips += 1
+
+    def failure_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return sum(1 for ok, _ in self._outcomes if not ok) / len(self._outcomes)
+
+    def stats(self) -> dict:
+        latencies = [seconds for _, seconds in self._outcomes]
+        return {
+            'state': self.state,
+            'failure_rate': round(self.failure_rate(), 2),
+            'average_latency_ms': round(1000 * sum(latencies) / len(latencies)) if latencies else None,
+            'trips': self.trips,
+            'retry_in_seconds': max(0, round(self.open_seconds - (time.monotonic() - self._opened_at))) if self.state == self.OPEN else 0
+        }
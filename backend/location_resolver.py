@@ -0,0 +1,186 @@
+import json
+import os
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+DEFAULT_GAZETTEER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'gazetteer.json')
+
+EARTH_RADIUS_KM = 6378.1
+
+# Work-arrangement and connecting words stripped from a location before lookup
+# ("Warsaw (hybrid)", "Remote Poland", "Remote in Europe", "Based in Berlin", "Remote, CET timezone")
+REMOTE_PATTERN = re.compile(r'\b(?:remote|remotely|anywhere|worldwide|work from home|wfh|zdalnie|zdalna)\b', re.IGNORECASE)
+ARRANGEMENT_PATTERN = re.compile(
+    r'\b(?:remote|remotely|anywhere|worldwide|work from home|wfh|zdalnie|zdalna|hybrid|hybrydowo|office|on-?site|'
+    r'fully|only|based|100%|(?:in|within|from|across)(?: the)?|open to|time ?zones?|tz|friendly)\b',
+    re.IGNORECASE
+)
+PART_SEPARATOR = re.compile(r'\s*(?:[,/|;()\[\]+]|\s[-–—]\s|\bor\b|\band\b)\s*', re.IGNORECASE)
+
+# Letters NFKD doesn't decompose into ASCII
+FOLD_TABLE = str.maketrans({'ł': 'l', 'ø': 'o', 'æ': 'ae', 'œ': 'oe', 'ß': 'ss', 'đ': 'd', 'ı': 'i', 'þ': 'th'})
+
+class Place(NamedTuple):
+    city: Optional[str]
+    country_code: Optional[str]
+    country: Optional[str]
+    region: Optional[str]
+    remote: bool
+    lat: Optional[float]
+    lon: Optional[float]
+
+    @property
+    def resolved(self) -> bool:
+        return bool(self.city or self.country_code or self.region or self.remote)
+
+    @property
+    def point(self) -> Optional[dict]:
+        """GeoJSON point for the city, when one was resolved"""
+        if self.city is None:
+            return None
+        return {'type': 'Point', 'coordinates': [self.lon, self.lat]}
+
+def fold(text: str) -> str:
+    """Lowercase ASCII lookup key: "Kraków" and "krakow" fold alike"""
+    text = unicodedata.normalize('NFKD', text.lower().translate(FOLD_TABLE))
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return re.sub(r'[^a-z0-9]+', ' ', text).strip()
+
+class LocationResolver:
+    """Resolves free-form job locations against an offline gazetteer.
+
+    A location is split into parts ("Krakow, Poland", "Remote - Europe",
+    "San Francisco, CA") and each part is looked up by its folded form as a
+    region, country, US state or city; work-arrangement words only set the
+    remote flag. Country and state parts pick between same-named cities.
+    Results are memoized per distinct string, since job boards repeat the
+    same few hundred locations.
+    """
+
+    def __init__(self, gazetteer: dict, cache_size: int = 4096):
+        self.countries = gazetteer['countries']
+        self.us_states = set(gazetteer.get('us_states', []))
+        self._regions: Dict[str, str] = {}
+        for region, aliases in gazetteer.get('regions', {}).items():
+            for alias in [region] + aliases:
+                self._regions[fold(alias)] = region
+        self._countries: Dict[str, str] = {}
+        for code, country in self.countries.items():
+            for alias in [country['name']] + country.get('aliases', []):
+                self._countries[fold(alias)] = code
+        # Same-named cities keep gazetteer order, so the better known one comes first
+        self._cities: Dict[str, List[dict]] = {}
+        for city in gazetteer['cities']:
+            for alias in [city['name']] + city.get('aliases', []):
+                self._cities.setdefault(fold(alias), []).append(city)
+        self.resolve = lru_cache(maxsize=cache_size)(self._resolve)
+
+    @classmethod
+    def from_file(cls, path: str = None) -> "LocationResolver":
+        path = path or os.environ.get('GAZETTEER_PATH', DEFAULT_GAZETTEER_PATH)
+        with open(path, encoding='utf-8') as handle:
+            return cls(json.load(handle))
+
+    def _resolve(self, text: Optional[str]) -> Place:
+        if not text:
+            return Place(None, None, None, None, False, None, None)
+        remote = bool(REMOTE_PATTERN.search(text))
+        country_code, region = None, None
+        # "CA" after a city is California or Canada, "DE" Delaware or Germany: let the city decide
+        code_hints: List[str] = []
+        cities: List[dict] = []
+        for part in [text] + PART_SEPARATOR.split(text):
+            part = part.strip()
+            if re.fullmatch(r'[A-Z]{2}', part) and (part in self.us_states or part in self.countries):
+                code_hints += (['US'] if part in self.us_states else []) + ([part] if part in self.countries else [])
+                continue
+            key = fold(ARRANGEMENT_PATTERN.sub(' ', part))
+            if not key:
+                continue
+            if key in self._cities and not cities:
+                cities = self._cities[key]
+            elif key in self._countries:
+                country_code = country_code or self._countries[key]
+            elif key in self._regions:
+                region = region or self._regions[key]
+
+        hints = [country_code] if country_code else code_hints
+        city = None
+        if cities:
+            matching = [candidate for candidate in cities if not hints or candidate['country'] in hints]
+            if matching:
+                city = matching[0]
+        country_code = city['country'] if city else (hints[0] if hints else None)
+        country = self.countries.get(country_code) if country_code else None
+        if country:
+            region = region or country['region']
+        return Place(
+            city=city['name'] if city else None,
+            country_code=country_code,
+            country=country['name'] if country else None,
+            region=region,
+            remote=remote,
+            lat=city['lat'] if city else None,
+            lon=city['lon'] if city else None
+        )
+
+    def location_fields(self, text: Optional[str]) -> dict:
+        """Job document fields for a location: normalized parts plus a GeoJSON point for the 2dsphere index"""
+        place = self.resolve(text)
+        return {
+            'location_norm': {
+                'city': place.city,
+                'country_code': place.country_code,
+                'country': place.country,
+                'region': place.region,
+                'remote': place.remote
+            },
+            'geo': place.point
+        }
+
+    def preference_query(self, locations: List[str]) -> Tuple[Optional[dict], List[str]]:
+        """Mongo filter for jobs in any of the preferred locations, plus the locations that didn't resolve"""
+        clauses, unresolved = [], []
+        for location in locations:
+            place = self.resolve(location)
+            if not place.resolved:
+                unresolved.append(location)
+                continue
+            if place.city:
+                clauses.append({"location_norm.city": place.city, "location_norm.country_code": place.country_code})
+            elif place.country_code:
+                clauses.append({"location_norm.country_code": place.country_code})
+            elif place.region:
+                clauses.append({"location_norm.region": place.region})
+            if place.remote:
+                clauses.append({"location_norm.remote": True})
+        return ({"$or": clauses} if clauses else None), unresolved
+
+def matches_preference_query(location_norm: Optional[dict], query: Optional[dict]) -> bool:
+    """In-memory counterpart of a preference_query filter for one job's location_norm"""
+    if not query:
+        return False
+    norm = location_norm or {}
+    return any(
+        all(norm.get(key.split('.', 1)[1]) == value for key, value in clause.items())
+        for clause in query["$or"]
+    )
+
+def within_km_query(place: Place, radius_km: float) -> dict:
+    """Jobs whose city lies within radius_km of the place"""
+    return {"geo": {"$geoWithin": {"$centerSphere": [[place.lon, place.lat], radius_km / EARTH_RADIUS_KM]}}}
+
+def remote_in_region_query(region: str) -> dict:
+    """Remote jobs open to a region, counting remote jobs that name no region at all.
+
+    Remote locations the gazetteer can't place ("Remote, UTC+2") have no region
+    and so match every region rather than none.
+    """
+    return {"location_norm.remote": True, "location_norm.region": {"$in": [region, None]}}
+
+@lru_cache(maxsize=1)
+def default_resolver() -> LocationResolver:
+    """The resolver for the configured gazetteer, built once per process"""
+    return LocationResolver.from_file()
@@ -0,0 +1,149 @@
+import re
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+
+from search_index import tokenize
+
+YEARS_PATTERN = re.compile(r'(\d{1,2})\s*\+?\s*(?:years?|yrs?)', re.IGNORECASE)
+DATE_RANGE_PATTERN = re.compile(
+    r'\b((?:19|20)\d{2})\s*[-–—]\s*((?:19|20)\d{2}|present|current|now)\b',
+    re.IGNORECASE
+)
+
+# Title words that describe seniority rather than the role itself
+SENIORITY_LEVELS = {
+    'intern': 0, 'trainee': 0,
+    'junior': 1, 'jr': 1, 'entry': 1,
+    'mid': 2, 'regular': 2,
+    'senior': 3, 'sr': 3,
+    'lead': 4, 'staff': 4,
+    'principal': 5, 'head': 5, 'director': 5
+}
+
+# Typical years of experience implied by a seniority word when none is stated
+LEVEL_YEARS = {0: 0, 1: 0, 2: 2, 3: 5, 4: 7, 5: 10}
+
+# Words that carry no signal when checking requirement coverage
+FILLER_WORDS = {
+    'experience', 'years', 'year', 'strong', 'knowledge', 'skills', 'understanding',
+    'ability', 'work', 'working', 'proficiency', 'expertise', 'good', 'excellent',
+    'preferred', 'related', 'field', 'degree', 'similar', 'plus', 'including'
+}
+
+WEIGHTS = {'skills': 0.55, 'title': 0.2, 'experience': 0.25}
+
+def job_seniority(job_title: str) -> Optional[int]:
+    """Seniority level named in a job title, if any"""
+    levels = [SENIORITY_LEVELS[token] for token in tokenize(job_title) if token in SENIORITY_LEVELS]
+    return max(levels) if levels else None
+
+def required_years(job_title: str, requirements: List[str], job_description: str = "") -> int:
+    """Years of experience a job asks for, from explicit "5+ years" or the title's seniority"""
+    stated = [int(years) for years in YEARS_PATTERN.findall(" ".join(requirements) + " " + job_description)]
+    if stated:
+        return max(stated)
+    level = job_seniority(job_title)
+    return LEVEL_YEARS[level] if level is not None else 0
+
+def candidate_years(resume_text: str) -> int:
+    """Years of experience claimed in a resume, from "7+ years" or employment date ranges"""
+    stated = [int(years) for years in YEARS_PATTERN.findall(resume_text)]
+    current_year = datetime.now().year
+    starts, ends = [], []
+    for start, end in DATE_RANGE_PATTERN.findall(resume_text):
+        starts.append(int(start))
+        ends.append(current_year if not end[:1].isdigit() else int(end))
+    spanned = max(ends) - min(starts) if starts else 0
+    return max(stated + [spanned])
+
+def _requirement_terms(requirement: str) -> Set[str]:
+    return {token for token in tokenize(requirement) if token not in FILLER_WORDS and not token.isdigit()}
+
+def score_job_match(
+    resume_text: str,
+    job_title: str,
+    requirements: List[str],
+    resume_skills: List[str],
+    job_skills: List[str],
+    job_description: str = ""
+) -> Dict:
+    """Deterministic job match analysis in the same shape as the LLM response.
+
+    Combines skill overlap (or requirement coverage when the job lists no known
+    skills), how much of the job title appears in the resume, and years of
+    experience against what the job asks for.
+    """
+    resume_tokens = set(tokenize(resume_text))
+    resume_skill_set = {skill.lower() for skill in resume_skills}
+    job_skill_set = {skill.lower() for skill in job_skills}
+
+    matched_skills = sorted(job_skill_set & resume_skill_set)
+    missing_skills = sorted(job_skill_set - resume_skill_set)
+
+    covered, uncovered = [], []
+    for requirement in requirements:
+        terms = _requirement_terms(requirement)
+        if not terms:
+            continue
+        if len(terms & resume_tokens) / len(terms) >= 0.5:
+            covered.append(requirement)
+        else:
+            uncovered.append(requirement)
+    coverage = len(covered) / (len(covered) + len(uncovered)) if (covered or uncovered) else 0.5
+
+    if job_skill_set:
+        skill_score = 0.6 * len(matched_skills) / len(job_skill_set) + 0.4 * coverage
+    else:
+        skill_score = coverage
+
+    title_terms = {token for token in tokenize(job_title) if token not in SENIORITY_LEVELS}
+    title_score = len(title_terms & resume_tokens) / len(title_terms) if title_terms else 0.5
+
+    needed_years = required_years(job_title, requirements, job_description)
+    have_years = candidate_years(resume_text)
+    experience_score = 1.0 if needed_years == 0 else min(have_years / needed_years, 1.0)
+
+    match_score = round(100 * (
+        WEIGHTS['skills'] * skill_score
+        + WEIGHTS['title'] * title_score
+        + WEIGHTS['experience'] * experience_score
+    ))
+
+    strengths = [f"Experience with {skill}" for skill in matched_skills[:3]]
+    strengths += [f"Meets requirement: {requirement}" for requirement in covered[:3 - len(strengths)]]
+    if needed_years and have_years >= needed_years:
+        strengths.append(f"{have_years}+ years of experience meets the {needed_years}+ years asked for")
+
+    gaps = [f"No evidence of {skill}" for skill in missing_skills[:3]]
+    gaps += [f"Not clearly covered: {requirement}" for requirement in uncovered[:3 - len(gaps)]]
+    if needed_years and have_years < needed_years:
+        gaps.append(f"Role asks for {needed_years}+ years of experience; resume shows about {have_years}")
+
+    recommendations = []
+    if missing_skills:
+        recommendations.append(f"Highlight any work involving {', '.join(missing_skills[:3])}")
+    if uncovered:
+        recommendations.append("Address the uncovered requirements explicitly in your cover letter")
+    if title_score < 0.5:
+        recommendations.append(f"Frame your experience in terms of the {job_title} role")
+    if not recommendations:
+        recommendations.append("Emphasize measurable achievements from your most relevant projects")
+
+    if match_score >= 75:
+        verdict = "Strong match"
+    elif match_score >= 50:
+        verdict = "Partial match"
+    else:
+        verdict = "Weak match"
+    summary = (
+        f"{verdict} for {job_title}: {len(covered)} of {len(covered) + len(uncovered)} requirements covered, "
+        f"{len(matched_skills)} of {len(job_skill_set)} listed skills found."
+    )
+
+    return {
+        "match_score": match_score,
+        "strengths": strengths,
+        "gaps": gaps,
+        "recommendations": recommendations,
+        "summary": summary
+    }
@@ -0,0 +1,274 @@
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from pymongo import ASCENDING, DESCENDING, DeleteMany, UpdateOne
+
+from job_ranker import JobRanker
+from location_resolver import default_resolver, matches_preference_query
+from pagination import InvalidCursor, decode_cursor, encode_cursor, paginate
+from salary_parser import salary_in_range, salary_range_query
+from search_index import JobSearchIndex, tokenize
+
+class MatchScoreStore:
+    """Materialized per-user job relevance scores in the user_job_scores collection.
+
+    Rows are ``{user_id, job_id, score, updated_at}`` and are only rewritten for
+    what changed: a user's rows when their resume or preferences change, and
+    the rows for newly ingested jobs for users whose filters they pass and
+    whose top ``max_jobs_per_user`` they reach. Each user keeps at most that
+    many rows. Listing pages read them back pre-sorted through the
+    (user_id, score) index. Scoring an ingested batch filters its documents
+    in memory and costs a fixed number of queries, however many users there are.
+    """
+
+    # Fields the in-memory filters read from ingested jobs
+    FILTER_PROJECTION = {
+        "_id": 0, "job_id": 1, "title": 1, "location": 1, "location_norm": 1, "salary_min": 1, "salary_max": 1
+    }
+
+    # Page order; job_id breaks score ties so keyset cursors are stable
+    PAGE_SORT = [("score", DESCENDING), ("job_id", ASCENDING)]
+
+    def __init__(self, db, ranker: JobRanker, index: JobSearchIndex, max_jobs_per_user: int = 500):
+        self.db = db
+        self.collection = db.user_job_scores
+        self.ranker = ranker
+        self.index = index
+        self.max_jobs_per_user = max_jobs_per_user
+
+    def ensure_indexes(self):
+        """Create the indexes backing score reads and upserts"""
+        self.collection.create_index([("user_id", ASCENDING), ("score", DESCENDING), ("job_id", ASCENDING)])
+        self.collection.create_index([("user_id", ASCENDING), ("job_id", ASCENDING)], unique=True)
+        self.collection.create_index("job_id")
+
+    def _user_context(self, user_id: str) -> Tuple[Optional[dict], List[str]]:
+        preferences = self.db.preferences.find_one({"user_id": user_id}, {"_id": 0})
+        resume = self.db.resumes.find_one({"user_id": user_id}, {"parsed_data.skills": 1})
+        resume_skills = resume.get('parsed_data', {}).get('skills', []) if resume else []
+        return preferences, resume_skills
+
+    def _matching_jobs(self, query: dict, job_ids: Optional[List[str]] = None) -> Set[str]:
+        if job_ids is not None:
+            query = {"$and": [{"job_id": {"$in": job_ids}}, query]}
+        return {row['job_id'] for row in self.db.jobs.find(query, {"_id": 0, "job_id": 1})}
+
+    def _location_matches(self, locations: List[str], job_ids: Optional[List[str]] = None) -> Set[str]:
+        """Jobs in any preferred location, by normalized place where the gazetteer knows it"""
+        query, unresolved = default_resolver().preference_query(locations)
+        matched = self._matching_jobs(query, job_ids) if query else set()
+        if unresolved:
+            matched.update(self.index.match_all([('location', unresolved)]))
+        return matched
+
+    def _candidates(self, preferences: Optional[dict], job_ids: Optional[List[str]] = None) -> Optional[List[str]]:
+        """Job ids passing the user's hard title/location/salary filters, None for no filter"""
+        if not preferences:
+            return None
+        filters: List[Set[str]] = []
+        if preferences.get('job_titles'):
+            filters.append(set(self.index.match_all([('title', preferences['job_titles'])])))
+        if preferences.get('locations'):
+            filters.append(self._location_matches(preferences['locations'], job_ids))
+        # Salary is a range scan over the indexed annual bounds rather than an in-memory filter
+        salary_query = salary_range_query(preferences.get('min_salary'), preferences.get('max_salary'))
+        if salary_query:
+            filters.append(self._matching_jobs(salary_query, job_ids))
+        return list(set.intersection(*filters)) if filters else None
+
+    def _user_contexts(self) -> Dict[str, Tuple[Optional[dict], List[str]]]:
+        """Preferences and resume skills of every user with a profile to rank, in two queries"""
+        contexts: Dict[str, Tuple[Optional[dict], List[str]]] = {}
+        for preferences in self.db.preferences.find({}, {"_id": 0}):
+            contexts[preferences['user_id']] = (preferences, [])
+        for resume in self.db.resumes.find({}, {"user_id": 1, "parsed_data.skills": 1}):
+            preferences, _ = contexts.get(resume['user_id'], (None, []))
+            contexts[resume['user_id']] = (preferences, resume.get('parsed_data', {}).get('skills', []))
+        return contexts
+
+    def _job_filter(self, preferences: Optional[dict]) -> Optional[Callable[[dict], bool]]:
+        """In-memory counterpart of _candidates for jobs prepared by _filter_jobs, None for no filter"""
+        if not preferences:
+            return None
+        checks: List[Callable[[dict], bool]] = []
+        if preferences.get('job_titles'):
+            # A title phrase matches when all its tokens are in the job title, as in the index
+            titles = [tokens for tokens in (set(tokenize(title)) for title in preferences['job_titles']) if tokens]
+            checks.append(lambda job: any(tokens <= job['title_tokens'] for tokens in titles))
+        if preferences.get('locations'):
+            query, unresolved = default_resolver().preference_query(preferences['locations'])
+            places = [tokens for tokens in (set(tokenize(location)) for location in unresolved) if tokens]
+            checks.append(lambda job: matches_preference_query(job.get('location_norm'), query) or any(
+                tokens <= job['location_tokens'] for tokens in places
+            ))
+        min_salary, max_salary = preferences.get('min_salary'), preferences.get('max_salary')
+        if salary_range_query(min_salary, max_salary):
+            checks.append(lambda job: salary_in_range(job, min_salary, max_salary))
+        if not checks:
+            return None
+        return lambda job: all(check(job) for check in checks)
+
+    def _filter_jobs(self, job_ids: List[str]) -> List[dict]:
+        """The filtered fields of a batch of jobs, with their title and location tokens, in job_ids order"""
+        jobs = {job['job_id']: job for job in self.db.jobs.find({"job_id": {"$in": job_ids}}, self.FILTER_PROJECTION)}
+        prepared = []
+        for job_id in job_ids:
+            job = jobs.get(job_id)
+            if job:
+                job['title_tokens'] = set(tokenize(job.get('title') or ''))
+                job['location_tokens'] = set(tokenize(job.get('location') or ''))
+                prepared.append(job)
+        return prepared
+
+    def _rows_from(self, user_ids: List[str], position: int, count: int) -> Dict[str, List[Tuple[float, str]]]:
+        """Up to count (score, job_id) rows per user from position on in page order, in one aggregation"""
+        if not user_ids:
+            return {}
+        groups = self.collection.aggregate([
+            {"$match": {"user_id": {"$in": user_ids}}},
+            {"$sort": {"user_id": ASCENDING, "score": DESCENDING, "job_id": ASCENDING}},
+            {"$group": {"_id": "$user_id", "rows": {"$push": {"score": "$score", "job_id": "$job_id"}}}},
+            {"$project": {"rows": {"$slice": ["$rows", position, count]}}},
+            {"$match": {"rows.0": {"$exists": True}}}
+        ], allowDiskUse=True)
+        return {group['_id']: [(row['score'], row['job_id']) for row in group['rows']] for group in groups}
+
+    def refresh_user(self, user_id: str) -> int:
+        """Recompute all of a user's rows after their resume or preferences change"""
+        preferences, resume_skills = self._user_context(user_id)
+        ranked = self.ranker.rank(
+            preferences,
+            resume_skills,
+            candidate_ids=self._candidates(preferences),
+            limit=self.max_jobs_per_user
+        )
+        now = datetime.now()
+        self.collection.delete_many({"user_id": user_id})
+        if ranked:
+            self.collection.insert_many([
+                {'user_id': user_id, 'job_id': job_id, 'score': score, 'updated_at': now}
+                for job_id, score in ranked
+            ], ordered=False)
+        return len(ranked)
+
+    def score_jobs(self, job_ids: List[str]) -> int:
+        """Upsert rows for newly ingested or updated jobs for the users they affect"""
+        if not job_ids:
+            return 0
+        job_ids = list(dict.fromkeys(job_ids))
+        jobs = self._filter_jobs(job_ids)
+        # Users already holding rows for these jobs need them updated or dropped
+        existing: Dict[str, Set[str]] = {}
+        for row in self.collection.find({"job_id": {"$in": job_ids}}, {"_id": 0, "user_id": 1, "job_id": 1}):
+            existing.setdefault(row['user_id'], set()).add(row['job_id'])
+
+        operations = []
+        contexts = self._user_contexts()
+        scoped: Dict[str, List[str]] = {}
+        for user_id, (preferences, _) in contexts.items():
+            passes = self._job_filter(preferences)
+            scoped_ids = [job['job_id'] for job in jobs if passes is None or passes(job)]
+            # Jobs that no longer pass the user's filters drop out of the view
+            rejected = existing.get(user_id, set()).difference(scoped_ids)
+            if rejected:
+                operations.append(DeleteMany({"user_id": user_id, "job_id": {"$in": list(rejected)}}))
+            if scoped_ids:
+                scoped[user_id] = scoped_ids
+
+        # The lowest kept row of every full view the batch could enter
+        cutoffs = self._rows_from(list(scoped), self.max_jobs_per_user - 1, 1)
+        now = datetime.now()
+        touched = []
+        for user_id, scoped_ids in scoped.items():
+            preferences, resume_skills = contexts[user_id]
+            held = existing.get(user_id, set())
+            cutoff = cutoffs[user_id][0] if user_id in cutoffs else None
+            upserts = [
+                UpdateOne(
+                    {"user_id": user_id, "job_id": job_id},
+                    {"$set": {"score": score, "updated_at": now}},
+                    upsert=True
+                )
+                for job_id, score in self.ranker.rank(
+                    preferences, resume_skills, candidate_ids=scoped_ids, limit=len(scoped_ids)
+                )
+                # New jobs ranking below a full view's last row would only be trimmed again
+                if job_id in held or cutoff is None or (-score, job_id) < (-cutoff[0], cutoff[1])
+            ]
+            if upserts:
+                operations.extend(upserts)
+                touched.append(user_id)
+        if operations:
+            self.collection.bulk_write(operations, ordered=False)
+
+        # A view grows by at most one row per job in the batch; drop what fell past the cap
+        overflow = self._rows_from(touched, self.max_jobs_per_user, len(jobs))
+        if overflow:
+            self.collection.bulk_write([
+                DeleteMany({"user_id": user_id, "job_id": {"$in": [job_id for _, job_id in rows]}})
+                for user_id, rows in overflow.items()
+            ], ordered=False)
+        return len(operations)
+
+    def remove_jobs(self, job_ids: List[str]):
+        """Drop rows for jobs leaving the catalog"""
+        self.collection.delete_many({"job_id": {"$in": job_ids}})
+
+    def top(self, user_id: str, limit: int = 50) -> List[Tuple[str, float]]:
+        """Highest scoring (job_id, score) pairs for a user via the (user_id, score) index"""
+        rows = self.collection.find(
+            {"user_id": user_id}, {"_id": 0, "job_id": 1, "score": 1}
+        ).sort("score", DESCENDING).limit(limit)
+        return [(row['job_id'], row['score']) for row in rows]
+
+    def page(
+        self,
+        user_id: str,
+        limit: int = 50,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Tuple[str, float]], Optional[str]]:
+        """A page of (job_id, score) pairs, best first, plus the next page's cursor"""
+        rows, next_cursor = paginate(
+            self.collection, {"user_id": user_id}, self.PAGE_SORT, limit, cursor, projection={"_id": 0, "job_id": 1, "score": 1}
+        )
+        return [(row['job_id'], row['score']) for row in rows], next_cursor
+
+    def page_within(
+        self,
+        user_id: str,
+        job_ids: List[str],
+        limit: int = 50,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Tuple[str, float]], Optional[str]]:
+        """A page of the user's best jobs among job_ids, ranked on the fly, plus the next page's cursor.
+
+        For ad-hoc location searches, where job_ids come from the geo and region
+        indexes: the materialized view only holds the user's top jobs in their
+        preferred locations, so it can't answer "near Berlin" for someone who
+        never listed Berlin. Title and salary filters still apply; cursors use
+        the same (score, job_id) order as ``page``.
+        """
+        preferences, resume_skills = self._user_context(user_id)
+        # The requested place stands in for the preferred locations
+        candidates = self._candidates(dict(preferences, locations=[]) if preferences else None, job_ids)
+        if candidates is not None:
+            allowed = set(candidates)
+            job_ids = [job_id for job_id in job_ids if job_id in allowed]
+        ranked = self.ranker.rank(preferences, resume_skills, candidate_ids=job_ids, limit=len(job_ids))
+        ranked.sort(key=lambda item: (-item[1], item[0]))
+        if cursor:
+            after_score, after_id = decode_cursor(cursor, self.PAGE_SORT)
+            if not isinstance(after_score, (int, float)) or not isinstance(after_id, str):
+                raise InvalidCursor("Cursor does not match this listing")
+            ranked = [(job_id, score) for job_id, score in ranked if (-score, job_id) > (-after_score, after_id)]
+        if len(ranked) <= limit:
+            return ranked, None
+        ranked = ranked[:limit]
+        return ranked, encode_cursor([ranked[-1][1], ranked[-1][0]])
+
+    def scores_for(self, user_id: str, job_ids: List[str]) -> Dict[str, float]:
+        """Stored scores for specific jobs, keyed by job_id"""
+        rows = self.collection.find(
+            {"user_id": user_id, "job_id": {"$in": job_ids}}, {"_id": 0, "job_id": 1, "score": 1}
+        )
+        return {row['job_id']: row['score'] for row in rows}
@@ -0,0 +1,61 @@
+import base64
+from typing import Any, List, Optional, Sequence, Tuple
+
+from bson import json_util
+
+# (field, direction) pairs; the last field must be unique so every row has a distinct position
+SortSpec = Sequence[Tuple[str, int]]
+
+class InvalidCursor(ValueError):
+    """A continuation token that wasn't issued for this listing"""
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Opaque token for the sort key values of the last row on a page"""
+    # json_util keeps datetimes and ObjectIds typed, so the next page compares like with like
+    return base64.urlsafe_b64encode(json_util.dumps(list(values)).encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(token: str, sort: SortSpec) -> List[Any]:
+    """Sort key values from a token, checked against the listing's sort"""
+    try:
+        values = json_util.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode('utf-8'))
+    except Exception:
+        raise InvalidCursor("Malformed cursor")
+    if not isinstance(values, list) or len(values) != len(sort):
+        raise InvalidCursor("Cursor does not match this listing")
+    return values
+
+def keyset_filter(sort: SortSpec, values: Sequence[Any]) -> dict:
+    """Rows strictly after ``values`` in ``sort`` order.
+
+    For a sort on (a desc, b asc) this is ``a < va OR (a == va AND b > vb)``,
+    which the compound index on the same keys answers as a range seek.
+    """
+    branches = []
+    for position, (field, direction) in enumerate(sort):
+        branch = {name: value for (name, _), value in zip(sort[:position], values[:position])}
+        branch[field] = {"$lt" if direction < 0 else "$gt": values[position]}
+        branches.append(branch)
+    return {"$or": branches}
+
+def sort_values(row: dict, sort: SortSpec) -> List[Any]:
+    return [row.get(field) for field, _ in sort]
+
+def paginate(
+    collection,
+    query: dict,
+    sort: SortSpec,
+    limit: int,
+    cursor: Optional[str] = None,
+    projection: Optional[dict] = None
+) -> Tuple[List[dict], Optional[str]]:
+    """One page of ``query`` in ``sort`` order plus the token for the next page, None on the last one"""
+    if cursor:
+        query = {"$and": [query, keyset_filter(sort, decode_cursor(cursor, sort))]}
+    if projection is not None and any(value for field, value in projection.items() if field != '_id'):
+        # Sort keys have to come back to build the next cursor
+        projection = dict(projection, **{field: 1 for field, _ in sort})
+    rows = list(collection.find(query, projection).sort(list(sort)).limit(limit + 1))
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(sort_values(rows[-1], sort))
@@ -0,0 +1,43 @@
+import os
+from datetime import datetime
+from typing import Optional
+
+from pymongo import ASCENDING
+
+class ParseResultCache:
+    """Parsed resume output keyed by the SHA-256 of the uploaded file and the parser version.
+
+    Rows are ``{content_hash, parser_version, result, created_at}`` and expire
+    after ``ttl_days``. Bumping the parser version makes old rows misses
+    without having to clear the collection.
+    """
+
+    def __init__(self, db, ttl_days: int = None):
+        self.collection = db.resume_parse_cache
+        self.ttl_days = ttl_days or int(os.environ.get('PARSE_CACHE_TTL_DAYS', '30'))
+        self.hits = 0
+        self.misses = 0
+
+    def ensure_indexes(self):
+        self.collection.create_index([("content_hash", ASCENDING), ("parser_version", ASCENDING)], unique=True)
+        self.collection.create_index("created_at", expireAfterSeconds=self.ttl_days * 86400)
+
+    def get(self, content_hash: str, parser_version: str) -> Optional[dict]:
+        row = self.collection.find_one(
+            {"content_hash": content_hash, "parser_version": parser_version}, {"_id": 0, "result": 1}
+        )
+        if row:
+            self.hits += 1
+            return row['result']
+        self.misses += 1
+        return None
+
+    def put(self, content_hash: str, parser_version: str, result: dict):
+        self.collection.update_one(
+            {"content_hash": content_hash, "parser_version": parser_version},
+            {"$set": {'result': result, 'created_at': datetime.now()}},
+            upsert=True
+        )
+
+    def stats(self) -> dict:
+        return {'hits': self.hits, 'misses': self.misses}
@@ -0,0 +1,115 @@
+import asyncio
+import io
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Tuple, Union
+
+import PyPDF2
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+PdfSource = Union[bytes, str]
+
+# Part of the parse cache key: bump when extraction output changes
+PDF_PARSER_VERSION = f"pypdf2-{PyPDF2.__version__}/1"
+
+class PdfParseError(Exception):
+    """The PDF could not be read"""
+
+class PdfParseTimeout(PdfParseError):
+    """The PDF took longer than the per-file limit to read"""
+
+def _limit_memory(max_bytes: int):
+    # Runs in each worker: a pathological PDF fails with MemoryError instead of exhausting the host
+    if resource is not None and max_bytes:
+        resource.setrlimit(resource.RLIMIT_AS, (max_bytes, max_bytes))
+
+def _open(source: PdfSource) -> PyPDF2.PdfReader:
+    return PyPDF2.PdfReader(io.BytesIO(source) if isinstance(source, bytes) else source)
+
+def _extract_small(source: PdfSource, max_pages: int) -> Tuple[int, Optional[str]]:
+    """Page count, plus the full text when the document is small enough for one worker"""
+    reader = _open(source)
+    pages = len(reader.pages)
+    if pages > max_pages:
+        return pages, None
+    return pages, "\n".join(page.extract_text() or "" for page in reader.pages)
+
+def _extract_range(source: PdfSource, start: int, stop: int) -> str:
+    reader = _open(source)
+    return "\n".join(reader.pages[number].extract_text() or "" for number in range(start, stop))
+
+class PdfParser:
+    """PDF text extraction in a bounded pool of worker processes.
+
+    Parsing never runs on the event loop. Each file gets ``timeout`` seconds
+    and every worker runs under an address-space limit. Documents longer than
+    ``pages_per_task`` pages are split into page ranges extracted in parallel
+    and joined in order. A timed-out or crashed parse recycles the pool, since
+    a stuck worker process can't be cancelled any other way.
+    """
+
+    def __init__(self, workers: int = None, timeout: float = None, max_memory_mb: int = None, pages_per_task: int = None):
+        self.workers = workers or int(os.environ.get('PDF_PARSE_WORKERS', str(min(2, os.cpu_count() or 1))))
+        self.timeout = timeout or float(os.environ.get('PDF_PARSE_TIMEOUT_SECONDS', '20'))
+        self.max_memory_mb = max_memory_mb or int(os.environ.get('PDF_PARSE_MAX_MEMORY_MB', '1024'))
+        self.pages_per_task = pages_per_task or int(os.environ.get('PDF_PAGES_PER_TASK', '8'))
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn rather than fork: the server process holds Mongo clients and threads
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_limit_memory,
+                initargs=(self.max_memory_mb * 1024 * 1024,)
+            )
+        return self._pool
+
+    def shutdown(self, kill: bool = False):
+        pool, self._pool = self._pool, None
+        if pool is None:
+            return
+        if kill:
+            for process in list((getattr(pool, '_processes', None) or {}).values()):
+                process.terminate()
+        pool.shutdown(wait=not kill, cancel_futures=True)
+
+    async def parse(self, source: PdfSource) -> str:
+        """Text of a PDF given as bytes or a file path"""
+        try:
+            return await asyncio.wait_for(self._parse(source), self.timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"PDF parse exceeded {self.timeout:g}s, recycling parser workers")
+            self.shutdown(kill=True)
+            raise PdfParseTimeout(f"PDF took longer than {self.timeout:g}s to parse")
+        except BrokenProcessPool:
+            self.shutdown(kill=True)
+            raise PdfParseError("PDF parser worker crashed")
+        except MemoryError:
+            raise PdfParseError("PDF needs too much memory to parse")
+        except PdfParseError:
+            raise
+        except Exception as e:
+            raise PdfParseError(str(e))
+
+    async def _parse(self, source: PdfSource) -> str:
+        loop = asyncio.get_running_loop()
+        pool = self._executor()
+        pages, text = await loop.run_in_executor(pool, _extract_small, source, self.pages_per_task)
+        if text is not None:
+            return text
+        chunks = await asyncio.gather(*(
+            loop.run_in_executor(pool, _extract_range, source, start, min(start + self.pages_per_task, pages))
+            for start in range(0, pages, self.pages_per_task)
+        ))
+        return "\n".join(chunks)
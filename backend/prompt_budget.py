@@ -0,0 +1,160 @@
+import logging
+import os
+import re
+import threading
+from typing import Dict, List, Tuple
+
+try:
+    from transformers import AutoTokenizer
+    TOKENIZER_AVAILABLE = True
+except ImportError:
+    TOKENIZER_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+PROMPT_TOKENIZER = os.environ.get('PROMPT_TOKENIZER', os.environ.get('LOCAL_LLM_MODEL', 'google/gemma-2-2b-it'))
+RESUME_TOKEN_BUDGET = int(os.environ.get('RESUME_TOKEN_BUDGET', '900'))
+DESCRIPTION_TOKEN_BUDGET = int(os.environ.get('DESCRIPTION_TOKEN_BUDGET', '500'))
+
+# Section headings, lowest number kept first when a text must shrink
+RESUME_SECTION_PRIORITY = {
+    'summary': 0, 'profile': 0, 'objective': 0,
+    'skills': 1, 'technical skills': 1,
+    'experience': 2, 'professional experience': 2, 'work experience': 2, 'employment': 2,
+    'projects': 3,
+    'education': 4, 'certifications': 4,
+}
+DESCRIPTION_SECTION_PRIORITY = {
+    'requirements': 0, 'qualifications': 0, 'must have': 0,
+    'responsibilities': 1, 'what you will do': 1, 'role': 1,
+    'nice to have': 2, 'preferred': 2,
+    'benefits': 4, 'about us': 4, 'perks': 4,
+}
+HEADING_PATTERN = re.compile(r'^\s*(?:[*#]+\s*)?([A-Za-z][A-Za-z &/]{2,40}?)\s*(?:\*+)?\s*:?\s*$')
+
+class TokenCounter:
+    """Counts tokens with the model tokenizer, or roughly 4 characters per token without it"""
+
+    def __init__(self, model_name: str = PROMPT_TOKENIZER):
+        self.model_name = model_name
+        self._tokenizer = None
+        self._failed = not TOKENIZER_AVAILABLE
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._tokenizer is None and not self._failed:
+            with self._lock:
+                if self._tokenizer is None and not self._failed:
+                    try:
+                        self._tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+                    except Exception as e:
+                        logger.warning(f"Tokenizer {self.model_name} unavailable, estimating tokens: {e}")
+                        self._failed = True
+        return self._tokenizer
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        tokenizer = self._load()
+        if tokenizer is not None:
+            return len(tokenizer(text, add_special_tokens=False)['input_ids'])
+        return (len(text) + 3) // 4
+
+def split_sections(text: str) -> List[Tuple[str, List[str]]]:
+    """Split text into (heading, lines) sections; text before any heading has heading ''"""
+    sections: List[Tuple[str, List[str]]] = [('', [])]
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            continue
+        match = HEADING_PATTERN.match(stripped)
+        # "**Skills**" and "# Skills" are headings, "* Built APIs" is a bullet
+        is_heading = match and (stripped.isupper() or stripped.endswith(':') or stripped.startswith(('**', '#')))
+        if is_heading:
+            sections.append((match.group(1).strip().lower(), [stripped]))
+        else:
+            sections[-1][1].append(re.sub(r'\s+', ' ', stripped))
+    return [(heading, lines) for heading, lines in sections if lines]
+
+def fit_to_budget(text: str, budget: int, counter: TokenCounter, priorities: Dict[str, int]) -> str:
+    """Shrink text to a token budget, keeping high-priority sections and the original order.
+
+    Duplicate lines are dropped, sections are admitted in priority order (the
+    untitled lead section ranks with summaries) and the first section that
+    does not fit is cut line by line, its overflowing line at a word boundary.
+    Non-empty text never comes back empty.
+    """
+    if counter.count(text) <= budget:
+        return text
+
+    seen = set()
+    sections = []
+    for position, (heading, lines) in enumerate(split_sections(text)):
+        unique = [line for line in lines if not (line.lower() in seen or seen.add(line.lower()))]
+        priority = 0 if heading == '' else priorities.get(heading, 3)
+        sections.append((priority, position, unique))
+
+    kept: Dict[int, List[str]] = {}
+    remaining = budget
+    for priority, position, lines in sorted(sections):
+        cost = counter.count("\n".join(lines))
+        if cost <= remaining:
+            kept[position] = lines
+            remaining -= cost
+            continue
+        partial = []
+        for line in lines:
+            line_cost = counter.count(line) + 1
+            if line_cost > remaining:
+                cut = truncate_to_tokens(line, remaining - 1, counter)
+                if cut:
+                    partial.append(cut)
+                break
+            partial.append(line)
+            remaining -= line_cost
+        # A heading with nothing under it only wastes the budget
+        if partial and not (heading and partial == lines[:1]):
+            kept[position] = partial
+        break
+
+    fitted = "\n".join(line for position in sorted(kept) for line in kept[position])
+    if not fitted and text.strip():
+        # Not even one line fits, e.g. a resume extracted as a single line: keep its start
+        words = text.split()
+        fitted = truncate_to_tokens(" ".join(words), budget, counter) or _truncate_word(words[0], budget, counter)
+    return fitted
+
+def truncate_to_tokens(text: str, budget: int, counter: TokenCounter) -> str:
+    """Longest prefix of text ending at a word boundary that fits the budget"""
+    if counter.count(text) <= budget:
+        return text
+    words = text.split()
+    low, high = 0, len(words)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if counter.count(" ".join(words[:middle])) <= budget:
+            low = middle
+        else:
+            high = middle - 1
+    return " ".join(words[:low])
+
+def _truncate_word(word: str, budget: int, counter: TokenCounter) -> str:
+    """Longest prefix of a single word that fits the budget"""
+    low, high = 0, len(word)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if counter.count(word[:middle]) <= budget:
+            low = middle
+        else:
+            high = middle - 1
+    return word[:low]
+
+token_counter = TokenCounter()
+
+def fit_resume(text: str, budget: int = None) -> str:
+    """Resume text trimmed to the configured resume budget"""
+    return fit_to_budget(text, budget or RESUME_TOKEN_BUDGET, token_counter, RESUME_SECTION_PRIORITY)
+
+def fit_description(text: str, budget: int = None) -> str:
+    """Job description trimmed to the configured description budget"""
+    return fit_to_budget(text, budget or DESCRIPTION_TOKEN_BUDGET, token_counter, DESCRIPTION_SECTION_PRIORITY)
@@ -0,0 +1,93 @@
+import hashlib
+import re
+from typing import Dict, List
+
+from prompt_budget import split_sections
+
+# Bump when the digest layout changes so stored digests are rebuilt
+DIGEST_VERSION = 1
+
+SECTION_ALIASES = {
+    'summary': 'summary', 'profile': 'summary', 'objective': 'summary', 'about me': 'summary',
+    'professional summary': 'summary',
+    'skills': 'skills', 'technical skills': 'skills', 'core skills': 'skills',
+    'experience': 'experience', 'professional experience': 'experience', 'work experience': 'experience',
+    'employment': 'experience', 'employment history': 'experience', 'work history': 'experience',
+    'projects': 'projects', 'personal projects': 'projects',
+    'education': 'education', 'certifications': 'education', 'education and certifications': 'education',
+}
+
+# How many condensed lines each section keeps
+SECTION_LIMITS = {'header': 2, 'summary': 3, 'experience': 15, 'projects': 6, 'education': 4}
+MAX_BULLET_WORDS = 30
+
+BULLET_PREFIX = re.compile(r'^[\s•\-\*–·▪●○◦>]+')
+CONTACT_PATTERN = re.compile(r'@|\+?\d[\d\s().-]{7,}\d|https?://|linkedin|github\.com', re.IGNORECASE)
+
+def resume_hash(text: str) -> str:
+    """Identifies the resume text a digest was built from"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def condense_line(line: str) -> str:
+    """Bullet text without its marker, capped at MAX_BULLET_WORDS words"""
+    words = BULLET_PREFIX.sub('', line).split()
+    if len(words) > MAX_BULLET_WORDS:
+        words = words[:MAX_BULLET_WORDS] + ['...']
+    return " ".join(words)
+
+def build_resume_digest(text: str, skills: List[str]) -> Dict:
+    """Compact, stable view of a resume for prompts: sections, normalized skills and short bullets"""
+    sections: Dict[str, List[str]] = {name: [] for name in SECTION_LIMITS}
+    seen = set()
+    for heading, lines in split_sections(text):
+        if heading:
+            name = SECTION_ALIASES.get(heading)
+            lines = lines[1:]  # drop the heading line itself
+        else:
+            name = 'header'
+        if name is None or name == 'skills':
+            continue
+        for line in lines:
+            condensed = condense_line(line)
+            if name == 'header' and CONTACT_PATTERN.search(condensed):
+                continue
+            if len(condensed) < 3 or condensed.lower() in seen:
+                continue
+            seen.add(condensed.lower())
+            sections[name].append(condensed)
+
+    # Text without recognisable headings: treat the body as experience
+    if not any(sections[name] for name in ('summary', 'experience', 'projects', 'education')):
+        sections['experience'] = sections['header'][SECTION_LIMITS['header']:]
+
+    for name, limit in SECTION_LIMITS.items():
+        sections[name] = sections[name][:limit]
+
+    normalized_skills = sorted({skill.strip().lower() for skill in skills if skill.strip()})
+    return {
+        'version': DIGEST_VERSION,
+        'content_hash': resume_hash(text),
+        'header': sections['header'],
+        'summary': sections['summary'],
+        'skills': normalized_skills,
+        'experience': sections['experience'],
+        'projects': sections['projects'],
+        'education': sections['education'],
+        'text': render_digest(sections, normalized_skills)
+    }
+
+def render_digest(sections: Dict[str, List[str]], skills: List[str]) -> str:
+    """Prompt text for a digest, with headings fit_resume recognises"""
+    parts = list(sections['header'])
+    if sections['summary']:
+        parts += ["SUMMARY"] + sections['summary']
+    if skills:
+        parts += ["SKILLS", ", ".join(skills)]
+    for name in ('experience', 'projects', 'education'):
+        if sections[name]:
+            parts += [name.upper()] + [f"- {line}" for line in sections[name]]
+    return "\n".join(parts)
+
+def digest_is_current(digest: Dict, text: str) -> bool:
+    """Whether a stored digest matches this resume text and the current layout"""
+    return bool(digest) and digest.get('version') == DIGEST_VERSION and digest.get('content_hash') == resume_hash(text)
@@ -0,0 +1,140 @@
+import json
+import os
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+DEFAULT_RATES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'currency_rates.json')
+
+# Currency assumed when a salary names none
+DEFAULT_CURRENCY = os.environ.get('SALARY_DEFAULT_CURRENCY', 'USD')
+
+CURRENCY_SYMBOLS = {'$': 'USD', '€': 'EUR', '£': 'GBP', 'zł': 'PLN', 'zl': 'PLN', 'kč': 'CZK', 'kc': 'CZK', '₹': 'INR', '¥': 'JPY'}
+CURRENCY_PATTERN = re.compile(r'\b(USD|EUR|GBP|CHF|PLN|CZK|HUF|RON|UAH|SEK|NOK|DKK|CAD|AUD|INR|JPY)\b|(zł|zl\b|kč|kc\b|[$€£₹¥])', re.IGNORECASE)
+
+# Grouped thousands ("12,000", "15 000", "50.000", "120'000") or a plain number ("12.5"), optionally "k";
+# digits glued to letters, as in "B2B", are not amounts
+AMOUNT_PATTERN = re.compile(r"(?<![A-Za-z\d])(\d{1,3}(?:[,.'\s]\d{3})+(?![\d.,])|\d+(?:[.,]\d+)?)\s*(k\b)?", re.IGNORECASE)
+
+# Between the bounds of a range: "80-120k", "80 to 120k", "$80 - $120k"
+RANGE_SEPARATOR = re.compile(r'\s*(?:[-–—]|to)\s*(?:[$€£₹¥]\s*)?', re.IGNORECASE)
+
+PERIOD_PATTERNS = [
+    ('hour', re.compile(r'/\s*h\b|/\s*hr\b|\bper\s+hour\b|\bhourly\b|/\s*hour\b|\bh\s*$|\bgodz', re.IGNORECASE)),
+    ('day', re.compile(r'/\s*d(?:ay)?\b|\bper\s+day\b|\bdaily\b|\bdzie', re.IGNORECASE)),
+    ('week', re.compile(r'/\s*w(?:ee)?k\b|\bper\s+week\b|\bweekly\b', re.IGNORECASE)),
+    ('month', re.compile(r'/\s*mo(?:nth)?\b|/\s*mth\b|\bper\s+month\b|\bmonthly\b|\bmies|\bmsc\b', re.IGNORECASE)),
+    ('year', re.compile(r'/\s*y(?:ea)?r\b|\bper\s+(?:year|annum)\b|\bannual(?:ly)?\b|\byearly\b|\bp\.?a\.?(?!\w)|\brok', re.IGNORECASE)),
+]
+
+# Multipliers to an annual figure
+PERIODS_PER_YEAR = {'hour': 2080, 'day': 260, 'week': 52, 'month': 12, 'year': 1}
+
+@lru_cache(maxsize=1)
+def currency_rates() -> Dict[str, float]:
+    """Units of the base currency per unit of each currency, from the bundled rate table"""
+    path = os.environ.get('CURRENCY_RATES_PATH', DEFAULT_RATES_PATH)
+    with open(path, encoding='utf-8') as handle:
+        return {code.upper(): float(rate) for code, rate in json.load(handle)['rates'].items()}
+
+def _amount(number: str) -> Optional[float]:
+    grouped = re.fullmatch(r"\d{1,3}(?:[,.'\s]\d{3})+", number)
+    digits = re.sub(r"[,.'\s]", '', number) if grouped else number.replace(',', '.')
+    try:
+        return float(digits)
+    except ValueError:
+        return None
+
+def _amounts(text: str) -> List[float]:
+    """Every amount in the text, with a range's trailing "k" applied to its lower bound too"""
+    matches = list(AMOUNT_PATTERN.finditer(text))
+    amounts = []
+    for i, match in enumerate(matches):
+        value = _amount(match.group(1))
+        if not value:
+            continue
+        thousands = bool(match.group(2))
+        if not thousands and value < 1000 and i + 1 < len(matches):
+            following = matches[i + 1]
+            # "80-120k" means 80k-120k, but "$80,000 - 120k" already has its lower bound in full
+            if following.group(2) and RANGE_SEPARATOR.fullmatch(text, match.end(), following.start()):
+                thousands = True
+        amounts.append(value * 1000 if thousands else value)
+    return amounts
+
+def _currency(text: str) -> str:
+    match = CURRENCY_PATTERN.search(text)
+    if not match:
+        return DEFAULT_CURRENCY
+    if match.group(1):
+        return match.group(1).upper()
+    return CURRENCY_SYMBOLS[match.group(2).lower()]
+
+def _period(text: str, high: float) -> str:
+    for period, pattern in PERIOD_PATTERNS:
+        if pattern.search(text):
+            return period
+    # Unlabelled: hourly rates and monthly salaries (common on European boards) are far smaller than annual ones
+    if high <= 500:
+        return 'hour'
+    if high <= 30000:
+        return 'month'
+    return 'year'
+
+def parse_salary(salary_range: Optional[str]) -> Optional[dict]:
+    """{min, max, currency, period} as stated in a free-form salary string, None if it has no amount"""
+    if not salary_range:
+        return None
+    amounts = _amounts(salary_range)
+    if not amounts:
+        return None
+    low, high = min(amounts), max(amounts)
+    return {
+        'min': low,
+        'max': high,
+        'currency': _currency(salary_range),
+        'period': _period(salary_range, high)
+    }
+
+def annual_base_salary(salary: Optional[dict]) -> Optional[dict]:
+    """A parsed salary as an annual {min, max} in the rate table's base currency, None if the currency is unknown"""
+    if not salary:
+        return None
+    rate = currency_rates().get(salary['currency'])
+    if rate is None:
+        return None
+    factor = rate * PERIODS_PER_YEAR[salary['period']]
+    return {'min': round(salary['min'] * factor), 'max': round(salary['max'] * factor)}
+
+def salary_fields(salary_range: Optional[str]) -> dict:
+    """Job document fields for a salary string: the parsed salary plus indexed annual base-currency bounds"""
+    salary = parse_salary(salary_range)
+    annual = annual_base_salary(salary)
+    return {
+        'salary': salary,
+        'salary_min': annual['min'] if annual else None,
+        'salary_max': annual['max'] if annual else None
+    }
+
+def salary_range_query(min_salary: Optional[int], max_salary: Optional[int]) -> dict:
+    """Mongo filter for jobs whose annual base-currency range overlaps the wanted one.
+
+    Jobs that don't state a salary are kept; the ranker already scores them
+    below jobs known to pay enough.
+    """
+    clauses = []
+    if min_salary:
+        clauses.append({"$or": [{"salary_max": {"$gte": min_salary}}, {"salary_max": None}]})
+    if max_salary:
+        clauses.append({"$or": [{"salary_min": {"$lte": max_salary}}, {"salary_min": None}]})
+    if not clauses:
+        return {}
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+def salary_in_range(job: dict, min_salary: Optional[int], max_salary: Optional[int]) -> bool:
+    """In-memory counterpart of salary_range_query for one job document"""
+    if min_salary and job.get('salary_max') is not None and job['salary_max'] < min_salary:
+        return False
+    if max_salary and job.get('salary_min') is not None and job['salary_min'] > max_salary:
+        return False
+    return True
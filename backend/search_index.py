@@ -0,0 +1,415 @@
+import math
+import re
+import threading
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+# Tokens keep "node.js", "c++" and "c#" intact and work on non-ASCII text ("kraków")
+TOKEN_PATTERN = re.compile(r"[^\W_]+(?:[+#]+|\.[^\W_]+)*")
+
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in', 'is',
+    'it', 'of', 'on', 'or', 'our', 'that', 'the', 'to', 'we', 'with', 'you', 'your'
+}
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase search tokens, dropping stopwords"""
+    if not text:
+        return []
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+def _field_text(value) -> str:
+    """Flatten a job field (string or list of strings) into text"""
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        return " ".join(str(item) for item in value if item)
+    return str(value)
+
+def _view(values: array) -> np.ndarray:
+    """Zero-copy numpy view of a posting array; never keep it past the lock, or appends fail"""
+    return np.frombuffer(values, dtype=values.typecode)
+
+def _contains(postings: array, ordinal: int) -> bool:
+    """Membership test on a sorted posting array"""
+    i = bisect_left(postings, ordinal)
+    return i < len(postings) and postings[i] == ordinal
+
+def _intersect(posting_lists: Sequence[array]) -> Set[int]:
+    """Intersect sorted posting arrays, probing the larger ones from the smallest"""
+    if not posting_lists:
+        return set()
+    ordered = sorted(posting_lists, key=len)
+    result = set(ordered[0])
+    for postings in ordered[1:]:
+        if not result:
+            break
+        result = {ordinal for ordinal in result if _contains(postings, ordinal)}
+    return result
+
+class JobSearchIndex:
+    """In-process inverted index over the job catalog.
+
+    Every job gets an append-only integer ordinal. Postings are compact sorted
+    ``array('I')`` ordinal lists, so re-indexing a job appends a new ordinal and
+    tombstones the old one; tombstones are compacted away once they pile up.
+    Free-text search is scored with BM25, accumulated over numpy views of the
+    postings, and facet filters are evaluated as vectorized masks over
+    interned facet codes. The field postings (title, skill, location,
+    job_type, company) answer boolean AND/OR filters.
+    """
+
+    # Matches in the title count more than matches buried in the description
+    FIELD_WEIGHTS = {
+        'title': 3.0,
+        'company': 2.0,
+        'requirements': 1.5,
+        'description': 1.0
+    }
+
+    # Fields available to boolean queries
+    FILTER_FIELDS = ('title', 'skill', 'location', 'job_type', 'company')
+
+    # Per-job values search() can filter on, stored as interned integer codes
+    FACET_FIELDS = ('location', 'job_type', 'company', 'source', 'work_mode')
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, compact_ratio: float = 0.25):
+        self.k1 = k1
+        self.b = b
+        self.compact_ratio = compact_ratio
+        self._lock = threading.RLock()
+        # Incremental changes made while build() runs, replayed onto the rebuilt index
+        self._replay: Optional[List[Tuple[str, object]]] = None
+        self.clear()
+
+    def clear(self):
+        """Drop every indexed job"""
+        with self._lock:
+            # BM25 postings: token -> sorted ordinals, plus parallel weighted term frequencies
+            self._postings: Dict[str, array] = {}
+            self._frequencies: Dict[str, array] = {}
+            self._doc_freq: Counter = Counter()
+            # Boolean postings: "field:token" -> sorted ordinals
+            self._field_postings: Dict[str, array] = {}
+            self._doc_terms: List[Tuple[str, ...]] = []
+            self._doc_lengths = array('f')
+            self._job_ids: List[Optional[str]] = []
+            # Facet field -> value -> code, and the code of each ordinal
+            self._facet_values: Dict[str, Dict[str, int]] = {field: {} for field in self.FACET_FIELDS}
+            self._facet_codes: Dict[str, array] = {field: array('I') for field in self.FACET_FIELDS}
+            self._ordinals: Dict[str, int] = {}
+            self._total_length = 0.0
+            self._dead = 0
+            self._norms: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self._ordinals)
+
+    def __contains__(self, job_id: str) -> bool:
+        return job_id in self._ordinals
+
+    def build(self, jobs: Iterable[dict]) -> int:
+        """Rebuild the index from scratch, returning the number of jobs indexed.
+
+        The new index is assembled outside the lock, so searches keep answering
+        from the current one meanwhile; jobs added or removed during the build
+        are replayed onto the new index before it is swapped in.
+        """
+        fresh = JobSearchIndex(self.k1, self.b, self.compact_ratio)
+        with self._lock:
+            self._replay = []
+        try:
+            for job in jobs:
+                fresh._append(job)
+        finally:
+            with self._lock:
+                replay, self._replay = self._replay, None
+        with self._lock:
+            for operation, argument in replay:
+                if operation == 'add':
+                    fresh.add_jobs(argument)
+                else:
+                    fresh.remove_job(argument)
+            self.__dict__.update({
+                key: value for key, value in fresh.__dict__.items() if key not in ('_lock', '_replay')
+            })
+            return len(self)
+
+    @staticmethod
+    def _skill_terms(job: dict) -> Set[str]:
+        """Skill tokens for a job: structured skills when present, else requirement text"""
+        if job.get('skills'):
+            return set(tokenize(_field_text(job['skills'])))
+        return set(tokenize(_field_text(job.get('requirements'))))
+
+    def _append(self, job: dict):
+        job_id = job.get('job_id')
+        if not job_id:
+            return
+
+        term_weights: Dict[str, float] = {}
+        for field, weight in self.FIELD_WEIGHTS.items():
+            for token, count in Counter(tokenize(_field_text(job.get(field)))).items():
+                term_weights[token] = term_weights.get(token, 0.0) + weight * count
+        doc_length = sum(term_weights.values())
+
+        field_terms = {
+            'title': set(tokenize(job.get('title') or '')),
+            'skill': self._skill_terms(job),
+            'location': set(tokenize(job.get('location') or '')),
+            'job_type': set(tokenize(job.get('job_type') or '')),
+            'company': set(tokenize(job.get('company') or ''))
+        }
+
+        ordinal = len(self._job_ids)
+        self._job_ids.append(job_id)
+        self._doc_terms.append(tuple(term_weights))
+        self._doc_lengths.append(doc_length)
+        for field in self.FACET_FIELDS:
+            value = (job.get(field) or '').lower()
+            codes = self._facet_values[field]
+            code = codes.get(value)
+            if code is None:
+                code = codes[value] = len(codes)
+            self._facet_codes[field].append(code)
+        self._ordinals[job_id] = ordinal
+        self._total_length += doc_length
+        self._norms = None
+
+        postings, frequencies = self._postings, self._frequencies
+        for token, tf in term_weights.items():
+            token_postings = postings.get(token)
+            if token_postings is None:
+                token_postings = postings[token] = array('I')
+                frequencies[token] = array('f')
+            token_postings.append(ordinal)
+            frequencies[token].append(tf)
+        self._doc_freq.update(term_weights.keys())
+
+        for field, tokens in field_terms.items():
+            for token in tokens:
+                key = f"{field}:{token}"
+                if key not in self._field_postings:
+                    self._field_postings[key] = array('I')
+                self._field_postings[key].append(ordinal)
+
+    def add_job(self, job: dict):
+        """Index a job, replacing any previous version with the same job_id"""
+        self.add_jobs([job])
+
+    def add_jobs(self, jobs: Iterable[dict]) -> int:
+        """Incrementally index a batch of new or updated jobs"""
+        count = 0
+        with self._lock:
+            if self._replay is not None:
+                jobs = list(jobs)
+                self._replay.append(('add', jobs))
+            for job in jobs:
+                if job.get('job_id'):
+                    self._tombstone(job['job_id'])
+                    self._append(job)
+                    count += 1
+            self._maybe_compact()
+        return count
+
+    def remove_job(self, job_id: str):
+        """Remove a job from the index if present"""
+        with self._lock:
+            if self._replay is not None:
+                self._replay.append(('remove', job_id))
+            self._tombstone(job_id)
+            self._maybe_compact()
+
+    def _tombstone(self, job_id: str):
+        ordinal = self._ordinals.pop(job_id, None)
+        if ordinal is None:
+            return
+        for token in self._doc_terms[ordinal]:
+            self._doc_freq[token] -= 1
+            if self._doc_freq[token] <= 0:
+                del self._doc_freq[token]
+        self._total_length -= self._doc_lengths[ordinal]
+        self._job_ids[ordinal] = None
+        self._doc_terms[ordinal] = ()
+        self._doc_lengths[ordinal] = 0.0
+        self._dead += 1
+        self._norms = None
+
+    def _maybe_compact(self):
+        """Renumber live jobs once tombstones exceed compact_ratio of the catalog"""
+        if self._dead and self._dead > self.compact_ratio * max(len(self._ordinals), 1):
+            self.compact()
+
+    def compact(self):
+        """Drop tombstoned ordinals from every posting array"""
+        with self._lock:
+            remap = array('l', [-1]) * len(self._job_ids)
+            next_ordinal = 0
+            for ordinal, job_id in enumerate(self._job_ids):
+                if job_id is not None:
+                    remap[ordinal] = next_ordinal
+                    next_ordinal += 1
+
+            for token in list(self._postings):
+                kept_ordinals, kept_frequencies = array('I'), array('f')
+                for ordinal, tf in zip(self._postings[token], self._frequencies[token]):
+                    if remap[ordinal] >= 0:
+                        kept_ordinals.append(remap[ordinal])
+                        kept_frequencies.append(tf)
+                if kept_ordinals:
+                    self._postings[token], self._frequencies[token] = kept_ordinals, kept_frequencies
+                else:
+                    del self._postings[token], self._frequencies[token]
+
+            for key in list(self._field_postings):
+                kept = array('I', (remap[o] for o in self._field_postings[key] if remap[o] >= 0))
+                if kept:
+                    self._field_postings[key] = kept
+                else:
+                    del self._field_postings[key]
+
+            live = [o for o, job_id in enumerate(self._job_ids) if job_id is not None]
+            self._job_ids = [self._job_ids[o] for o in live]
+            self._doc_terms = [self._doc_terms[o] for o in live]
+            self._doc_lengths = array('f', (self._doc_lengths[o] for o in live))
+            self._facet_codes = {
+                field: array('I', (codes[o] for o in live)) for field, codes in self._facet_codes.items()
+            }
+            self._ordinals = {job_id: o for o, job_id in enumerate(self._job_ids)}
+            self._dead = 0
+            self._norms = None
+
+    def _length_norms(self) -> np.ndarray:
+        """BM25 length normalisation per ordinal, cached until the catalog changes.
+
+        Tombstoned ordinals get an infinite norm, so their postings add nothing
+        to a score and dead jobs drop out of the results without a lookup.
+        """
+        if self._norms is None:
+            avg_length = self._total_length / max(len(self._ordinals), 1) or 1.0
+            lengths = _view(self._doc_lengths).astype(np.float64)
+            norms = self.k1 * (1 - self.b + self.b * lengths / avg_length)
+            norms[[o for o, job_id in enumerate(self._job_ids) if job_id is None]] = np.inf
+            self._norms = norms
+        return self._norms
+
+    # Boolean retrieval
+
+    def _phrase_ordinals(self, field: str, phrase: str) -> Set[int]:
+        """Ordinals whose field contains every token of the phrase"""
+        tokens = set(tokenize(phrase))
+        if not tokens:
+            return set()
+        posting_lists = []
+        for token in tokens:
+            postings = self._field_postings.get(f"{field}:{token}")
+            if postings is None:
+                return set()
+            posting_lists.append(postings)
+        return _intersect(posting_lists)
+
+    def match_any(self, field: str, phrases: Iterable[str]) -> Set[int]:
+        """OR across phrases, each phrase an AND of its tokens within one field"""
+        if field not in self.FILTER_FIELDS:
+            raise ValueError(f"Unknown index field: {field}")
+        result: Set[int] = set()
+        with self._lock:
+            for phrase in phrases:
+                result |= self._phrase_ordinals(field, phrase)
+        return result
+
+    def match_all(self, clauses: Sequence[Tuple[str, Sequence[str]]], limit: Optional[int] = None) -> List[str]:
+        """AND across (field, phrases) clauses; returns live job_ids in catalog order"""
+        with self._lock:
+            result: Optional[Set[int]] = None
+            for field, phrases in clauses:
+                matches = self.match_any(field, phrases)
+                result = matches if result is None else result & matches
+                if not result:
+                    return []
+            if result is None:
+                return []
+            job_ids = [self._job_ids[o] for o in sorted(result) if self._job_ids[o] is not None]
+            return job_ids[:limit] if limit is not None else job_ids
+
+    # Ranked retrieval
+
+    def _filter_mask(self, candidates: np.ndarray, filters: Dict) -> np.ndarray:
+        """Which candidate ordinals pass every facet filter.
+
+        Filters are resolved against the few distinct facet values first, then
+        applied to all candidates at once as a membership test on their codes.
+        """
+        mask = np.ones(len(candidates), dtype=bool)
+        for field, expected in filters.items():
+            facet = 'company' if field == 'excluded_companies' else field
+            values = self._facet_values[facet]
+            if field == 'location':
+                wanted = [code for value, code in values.items() if expected in value]
+            elif field == 'excluded_companies':
+                wanted = [code for value, code in values.items() if value not in expected]
+            else:
+                wanted = [values[expected]] if expected in values else []
+            mask &= np.isin(_view(self._facet_codes[facet])[candidates], wanted)
+        return mask
+
+    def search(
+        self,
+        query: str,
+        location: Optional[str] = None,
+        job_type: Optional[str] = None,
+        company: Optional[str] = None,
+        source: Optional[str] = None,
+        excluded_companies: Optional[List[str]] = None,
+        work_mode: Optional[str] = None,
+        limit: int = 20
+    ) -> List[Tuple[str, float]]:
+        """Return (job_id, score) pairs for the query, most relevant first"""
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+
+        filters: Dict = {}
+        if location:
+            filters['location'] = location.lower()
+        if job_type:
+            filters['job_type'] = job_type.lower()
+        if company:
+            filters['company'] = company.lower()
+        if source:
+            filters['source'] = source.lower()
+        if work_mode:
+            filters['work_mode'] = work_mode.lower()
+        if excluded_companies:
+            filters['excluded_companies'] = {name.lower() for name in excluded_companies}
+
+        with self._lock:
+            doc_count = len(self._ordinals)
+            if doc_count == 0:
+                return []
+            norms = self._length_norms()
+
+            scores = np.zeros(len(self._job_ids))
+            for term in terms:
+                df = self._doc_freq.get(term)
+                if not df:
+                    continue
+                weight = math.log(1 + (doc_count - df + 0.5) / (df + 0.5)) * (self.k1 + 1)
+                ordinals = _view(self._postings[term])
+                tf = _view(self._frequencies[term])
+                # A posting list holds each ordinal once, so fancy-index += doesn't drop repeats
+                scores[ordinals] += weight * tf / (tf + norms[ordinals])
+
+            candidates = np.flatnonzero(scores)
+            if filters and len(candidates):
+                candidates = candidates[self._filter_mask(candidates, filters)]
+            if len(candidates) > limit:
+                candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+            # Highest score first, earlier ordinal first among ties
+            top = candidates[np.lexsort((candidates, -scores[candidates]))]
+            job_ids = self._job_ids
+            return [(job_ids[o], round(float(scores[o]), 4)) for o in top]
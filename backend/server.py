@@ -1,51 +1,44 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException, Depends, Form, BackgroundTasks
+from fastapi import FastAPI, File, UploadFile, HTTPException, Depends, Form, BackgroundTasks, Request, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from pymongo import MongoClient
+from pymongo import MongoClient, UpdateOne
 from bson import ObjectId
 import os
 from datetime import datetime
 import uuid
 import json
-from typing import Optional, List, Dict, Any
-import PyPDF2
-import io
+from typing import Optional, List, Tuple
 import re
+import hashlib
+import tempfile
 from pydantic import BaseModel
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from huggingface_hub import InferenceClient
 import logging
+from search_index import JobSearchIndex
+from job_ranker import JobRanker
+from match_scores import MatchScoreStore
+from match_scorer import score_job_match
+from embedding_index import EmbeddingStore
+from llm_backends import create_llm_backend
+from llm_scheduler import MicroBatcher, SingleFlight, PriorityScheduler, QueueFullError, CircuitBreaker, INTERACTIVE, BATCH, BACKGROUND
+from prompt_budget import fit_resume, fit_description, token_counter
+from resume_digest import build_resume_digest, digest_is_current, resume_hash
+from draft_pregenerator import DraftPregenerator
+from structured_output import JOB_MATCH_SCHEMA, parse_job_match
+from pdf_parser import PdfParser, PdfParseError, PdfParseTimeout, PDF_PARSER_VERSION
+from parse_cache import ParseResultCache
+from skill_extractor import default_extractor
+from job_fields import JobFieldExtractor, JOB_FIELDS_VERSION, job_skills
+from location_resolver import default_resolver, within_km_query, remote_in_region_query
+from pagination import paginate, InvalidCursor
+from json_response import DocumentResponse
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Utility function to convert MongoDB documents for JSON serialization
-def convert_objectid(doc: Dict[str, Any]) -> Dict[str, Any]:
-    """Convert MongoDB ObjectId to string for JSON serialization"""
-    if doc is None:
-        return None
-    if isinstance(doc, list):
-        return [convert_objectid(item) for item in doc]
-    if isinstance(doc, dict):
-        result = {}
-        for key, value in doc.items():
-            if isinstance(value, ObjectId):
-                result[key] = str(value)
-            elif isinstance(value, datetime):
-                result[key] = value.isoformat()
-            elif isinstance(value, dict):
-                result[key] = convert_objectid(value)
-            elif isinstance(value, list):
-                result[key] = convert_objectid(value)
-            else:
-                result[key] = value
-        return result
-    elif isinstance(doc, ObjectId):
-        return str(doc)
-    elif isinstance(doc, datetime):
-        return doc.isoformat()
-    return doc
-
 # Import the job scraper (will handle import errors gracefully)
 try:
     import sys
@@ -76,7 +69,7 @@ except ImportError as e:
             }
         ]
 
-app = FastAPI(title="AI Job Application System", version="1.0.0")
+app = FastAPI(title="AI Job Application System", version="1.0.0", default_response_class=DocumentResponse)
 
 # CORS middleware
 app.add_middleware(
@@ -102,11 +95,193 @@ if HUGGINGFACE_API_TOKEN:
 else:
     hf_client = None
 
+# Text generation backend: hosted Gemma by default, or a local CPU model (LLM_BACKEND=local|gguf)
+llm_backend = create_llm_backend(hf_client)
+# Concurrent generations share backend batches when the backend supports it
+llm_batcher = MicroBatcher(llm_backend) if llm_backend else None
+# Identical concurrent generations (double clicks, retries) share one model call
+ai_single_flight = SingleFlight()
+# Interactive work is admitted ahead of batch applies and background drafts
+ai_scheduler = PriorityScheduler()
+# Fail fast to the fallback response while the inference backend is down or too slow
+llm_circuit = CircuitBreaker()
+
 # Collections
 users_collection = db.users
 resumes_collection = db.resumes
 jobs_collection = db.jobs
 applications_collection = db.applications
+# Prompt/completion token counts for every generation
+ai_usage_collection = db.ai_usage
+
+# In-process full-text index and ranking matrix over jobs_collection, built on startup
+job_search_index = JobSearchIndex()
+job_ranker = JobRanker()
+# Materialized per-user relevance scores (user_job_scores collection)
+match_scores = MatchScoreStore(db, job_ranker, job_search_index)
+# Local sentence embeddings for semantic resume-to-job matching
+embedding_store = EmbeddingStore(db)
+
+# Single worker for CPU-heavy background work (embedding) off the request path
+background_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="background")
+
+# PDF text extraction runs in worker processes so uploads never block the event loop
+pdf_parser = PdfParser()
+# Parse results by file hash, so re-uploading the same PDF skips parsing
+parse_cache = ParseResultCache(db)
+# Bump the suffix when extract_resume_info output changes
+RESUME_PARSE_VERSION = f"{PDF_PARSER_VERSION}+extract-3+skills-{default_extractor().version}"
+# Largest resume PDF accepted, and the chunk size uploads are streamed in
+MAX_RESUME_BYTES = int(os.environ.get('MAX_RESUME_BYTES', str(10 * 1024 * 1024)))
+UPLOAD_CHUNK_BYTES = 64 * 1024
+
+# Structured job fields (skills, work mode, salary, location) are extracted once per job at ingestion
+job_field_extractor = JobFieldExtractor()
+
+def submit_background(fn, *args):
+    """Run fn in the background executor, logging failures instead of dropping them"""
+    def log_failure(future):
+        if future.exception():
+            logger.error(f"Background task {fn.__name__} failed: {future.exception()}")
+    background_executor.submit(fn, *args).add_done_callback(log_failure)
+
+# List orders for keyset pagination; _id breaks timestamp ties
+APPLICATION_PAGE_SORT = [("applied_at", -1), ("_id", -1)]
+DISCOVERY_PAGE_SORT = [("discovery_timestamp", -1), ("_id", -1)]
+
+# List views return summaries; large text bodies are only served by the detail endpoints
+APPLICATION_SUMMARY_PROJECTION = {
+    'application_id': 1, 'job_id': 1, 'job_title': 1, 'company': 1, 'status': 1, 'applied_at': 1,
+    'job_data.location': 1, 'job_data.source_url': 1
+}
+AI_CONTENT_SUMMARY_PROJECTIONS = {
+    'customized_resumes': {'job_title': 1, 'company': 1, 'created_at': 1},
+    'cover_letters': {'job_title': 1, 'company': 1, 'created_at': 1},
+    'job_matches': {'job_title': 1, 'created_at': 1, 'match_analysis.match_score': 1, 'match_analysis.analysis_source': 1}
+}
+# Older resumes carry parsed_data.raw_text, a second copy of content
+RESUME_VIEW_PROJECTION = {'parsed_data.raw_text': 0, 'digest': 0}
+
+JOB_INDEX_PROJECTION = {
+    'job_id': 1, 'title': 1, 'company': 1, 'description': 1, 'requirements': 1,
+    'skills': 1, 'location': 1, 'job_type': 1, 'source': 1, 'salary_range': 1, 'work_mode': 1,
+    'salary_min': 1, 'salary_max': 1, 'listed_skills': 1, 'fields_version': 1
+}
+# Fields older extraction versions stored that nothing reads any more
+RETIRED_JOB_FIELDS = ("seniority", "min_years")
+
+def backfill_job_fields(batch_size: int = 1000) -> int:
+    """Extract structured fields for catalog jobs ingested before the current extraction version"""
+    stale = {"fields_version": {"$ne": JOB_FIELDS_VERSION}}
+    updated = 0
+    while True:
+        batch = list(jobs_collection.find(stale, JOB_INDEX_PROJECTION).limit(batch_size))
+        if not batch:
+            return updated
+        fields = job_field_extractor.extract_many(batch)
+        jobs_collection.bulk_write([
+            UpdateOne({"_id": job['_id']}, {"$set": job_fields, "$unset": {field: "" for field in RETIRED_JOB_FIELDS}})
+            for job, job_fields in zip(batch, fields)
+        ], ordered=False)
+        updated += len(batch)
+
+@app.on_event("startup")
+async def build_job_search_index():
+    """Create Mongo indexes and load the job catalog into the search index"""
+    try:
+        jobs_collection.create_index("job_id")
+        for field in ("skills", "work_mode", "salary_min", "salary_max"):
+            jobs_collection.create_index(field)
+        existing_indexes = jobs_collection.index_information()
+        for field in RETIRED_JOB_FIELDS:
+            if f"{field}_1" in existing_indexes:
+                jobs_collection.drop_index(f"{field}_1")
+        jobs_collection.create_index([("geo", "2dsphere")])
+        jobs_collection.create_index([("location_norm.city", 1), ("location_norm.country_code", 1)])
+        jobs_collection.create_index("location_norm.country_code")
+        jobs_collection.create_index([("location_norm.remote", 1), ("location_norm.region", 1)])
+        ai_usage_collection.create_index([("purpose", 1), ("created_at", -1)])
+        applications_collection.create_index([("user_id", 1)] + APPLICATION_PAGE_SORT)
+        applications_collection.create_index([("user_id", 1), ("status", 1)] + APPLICATION_PAGE_SORT)
+        applications_collection.create_index([("user_id", 1), ("application_id", 1)])
+        db.discovered_jobs.create_index([("discovered_for_user", 1)] + DISCOVERY_PAGE_SORT)
+        for kind in AI_CONTENT_SUMMARY_PROJECTIONS:
+            db[kind].create_index([("user_id", 1), ("created_at", -1)])
+        match_scores.ensure_indexes()
+        embedding_store.ensure_indexes()
+        draft_pregenerator.ensure_indexes()
+        parse_cache.ensure_indexes()
+        # Indexing a large catalog takes tens of seconds; serve requests meanwhile
+        submit_background(load_job_catalog)
+    except Exception as e:
+        logger.error(f"Failed to build job search index: {e}")
+
+def load_job_catalog():
+    """Extract fields for stale jobs, build the search index and ranking matrix from the catalog, then embed it"""
+    backfilled = backfill_job_fields()
+    if backfilled:
+        logger.info(f"Extracted structured fields for {backfilled} existing jobs")
+    catalog = list(jobs_collection.find({}, JOB_INDEX_PROJECTION))
+    indexed = job_search_index.build(catalog)
+    ranked = job_ranker.build(catalog)
+    logger.info(f"Job search index built with {indexed} jobs, ranking matrix with {ranked} rows")
+    if embedding_store.available:
+        # Loads cached vectors and embeds anything new
+        embedding_store.index_jobs(catalog)
+
+def ingest_jobs(jobs: List[dict]) -> List[str]:
+    """Upsert jobs into the catalog by job_id with their structured fields, and index them incrementally"""
+    ingested = [
+        {key: value for key, value in job.items() if key != '_id' and key not in RETIRED_JOB_FIELDS}
+        for job in jobs if job.get('job_id')
+    ]
+    if not ingested:
+        return []
+    for job_doc, job_fields in zip(ingested, job_field_extractor.extract_many(ingested)):
+        job_doc.update(job_fields)
+    jobs_collection.bulk_write([
+        UpdateOne(
+            {"job_id": job_doc['job_id']},
+            {"$set": job_doc, "$unset": {field: "" for field in RETIRED_JOB_FIELDS}},
+            upsert=True
+        )
+        for job_doc in ingested
+    ], ordered=False)
+    job_search_index.add_jobs(ingested)
+    job_ranker.add_jobs(ingested)
+    if embedding_store.available and ingested:
+        submit_background(embedding_store.index_jobs, ingested)
+    return [job['job_id'] for job in ingested]
+
+def ingest_and_score_jobs(jobs: List[dict]) -> List[str]:
+    """Ingest jobs and materialize their match scores; blocking, so run it off the event loop"""
+    job_ids = ingest_jobs(jobs)
+    match_scores.score_jobs(job_ids)
+    return job_ids
+
+def job_location_query(near: Optional[str], radius_km: float, remote_region: Optional[str]) -> dict:
+    """Mongo filter for jobs near a place and/or remote in a region, empty when neither is asked for"""
+    clauses = []
+    if near:
+        place = default_resolver().resolve(near)
+        if place.point is None:
+            raise HTTPException(status_code=400, detail=f"Unknown city: {near}")
+        clauses.append(within_km_query(place, radius_km))
+    if remote_region:
+        region = default_resolver().resolve(remote_region).region
+        if region is None:
+            raise HTTPException(status_code=400, detail=f"Unknown region: {remote_region}")
+        clauses.append(remote_in_region_query(region))
+    if not clauses:
+        return {}
+    return clauses[0] if len(clauses) == 1 else {"$or": clauses}
+
+def refresh_user_scores(user_id: str):
+    """Recompute a user's materialized job scores without failing the calling request"""
+    try:
+        match_scores.refresh_user(user_id)
+    except Exception as e:
+        logger.error(f"Failed to refresh job scores for {user_id}: {e}")
 
 # Pydantic models
 class UserProfile(BaseModel):
@@ -130,6 +305,7 @@ class JobPreferences(BaseModel):
     job_type: str  # full-time, part-time, contract, remote
     keywords: List[str]
     excluded_companies: List[str] = []
+    pregenerate_applications: bool = False  # draft applications for top jobs in the background
 
 class ResumeData(BaseModel):
     user_id: str
@@ -174,7 +350,7 @@ class CoverLetterRequest(BaseModel):
     job_title: str
     company: str
     job_description: str
-    user_background: str
+    user_background: str = ""  # the stored resume is used when empty
     skills: List[str]
 
 class JobMatchRequest(BaseModel):
@@ -183,6 +359,7 @@ class JobMatchRequest(BaseModel):
     job_title: str
     job_description: str
     requirements: List[str]
+    include_narrative: bool = False  # force an LLM narrative even for low local scores
 
 class AIResponse(BaseModel):
     success: bool
@@ -204,92 +381,196 @@ class JobDiscoveryResponse(BaseModel):
     sources_scraped: List[str]
     timestamp: datetime
 
+# Skills recognised in resumes and job postings, from the taxonomy in data/skills.json
+skill_extractor = default_extractor()
+
+# Contact details in resumes
+
+EMAIL_PATTERN = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+PHONE_PATTERN = re.compile(r'\b(?:\+?1[-.\s]?)?\(?[0-9]{3}\)?[-.\s]?[0-9]{3}[-.\s]?[0-9]{4}\b')
+
+# Job match analyses scoring at least this locally also get an LLM narrative
+LLM_MATCH_THRESHOLD = int(os.environ.get('LLM_MATCH_THRESHOLD', '70'))
+
 # Utility functions
-def parse_pdf_resume(file_content: bytes) -> str:
+async def spool_upload(file: UploadFile) -> Tuple[str, str]:
+    """Stream an upload to a temp file in chunks, hashing as it goes; returns (path, sha256)"""
+    digest = hashlib.sha256()
+    size = 0
+    handle = tempfile.NamedTemporaryFile(suffix='.pdf', delete=False)
+    try:
+        with handle:
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_BYTES)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > MAX_RESUME_BYTES:
+                    raise HTTPException(status_code=413, detail=f"Resume must be at most {MAX_RESUME_BYTES // (1024 * 1024)} MB")
+                digest.update(chunk)
+                handle.write(chunk)
+    except BaseException:
+        os.unlink(handle.name)
+        raise
+    return handle.name, digest.hexdigest()
+
+async def parse_pdf_resume(file_path: str) -> str:
     """Extract text from PDF resume"""
     try:
-        pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_content))
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text()
-        return text
-    except Exception as e:
+        return await pdf_parser.parse(file_path)
+    except PdfParseTimeout as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except PdfParseError as e:
         raise HTTPException(status_code=400, detail=f"Error parsing PDF: {str(e)}")
 
 def extract_resume_info(text: str) -> dict:
     """Extract structured information from resume text"""
-    # Basic regex patterns for common resume information
-    email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-    phone_pattern = r'\b(?:\+?1[-.\s]?)?\(?[0-9]{3}\)?[-.\s]?[0-9]{3}[-.\s]?[0-9]{4}\b'
-    
-    emails = re.findall(email_pattern, text)
-    phones = re.findall(phone_pattern, text)
-    
-    # Extract skills (this is a simplified approach)
-    skills_keywords = [
-        'python', 'javascript', 'java', 'react', 'node.js', 'sql', 'mongodb',
-        'aws', 'docker', 'kubernetes', 'git', 'machine learning', 'data analysis',
-        'project management', 'leadership', 'communication', 'teamwork'
-    ]
-    
-    found_skills = []
-    text_lower = text.lower()
-    for skill in skills_keywords:
-        if skill in text_lower:
-            found_skills.append(skill)
+    emails = EMAIL_PATTERN.findall(text)
+    phones = PHONE_PATTERN.findall(text)
     
     return {
         'emails': emails,
         'phones': phones,
-        'skills': found_skills,
-        'raw_text': text
+        'skills': extract_skills(text)
     }
 
+def extract_skills(text: str) -> List[str]:
+    """Find known skills mentioned in free text"""
+    return skill_extractor.extract(text)
+
+def resume_digest_text(resume: dict) -> str:
+    """Compact resume text for prompts, rebuilding the stored digest if it is missing or stale"""
+    digest = resume.get('digest')
+    if not digest_is_current(digest, resume['content']):
+        digest = build_resume_digest(resume['content'], resume.get('parsed_data', {}).get('skills', []))
+        resumes_collection.update_one({"_id": resume['_id']}, {"$set": {"digest": digest}})
+    return digest['text']
+
+def resume_for_prompt(user_id: str, resume_text: str = "") -> str:
+    """The user's resume digest when resume_text is empty or their stored resume, otherwise the text itself"""
+    resume = resumes_collection.find_one({"user_id": user_id}, {"content": 1, "parsed_data.skills": 1, "digest": 1})
+    if resume and (not resume_text.strip() or resume.get('content') == resume_text):
+        return resume_digest_text(resume)
+    return resume_text
+
 # AI Service Functions
-async def generate_ai_content(prompt: str, max_tokens: int = 512, temperature: float = 0.7) -> str:
-    """Generate content using Hugging Face Google Gemma model with retry logic"""
+class ModelUnavailable(Exception):
+    """Raised instead of returning mock content when the caller needs real model output"""
+
+async def generate_ai_content(
+    prompt: str,
+    max_tokens: int = 512,
+    temperature: float = 0.7,
+    purpose: str = "general",
+    priority: str = INTERACTIVE,
+    user_id: Optional[str] = None,
+    json_schema: Optional[dict] = None,
+    allow_mock: bool = True
+) -> str:
+    """Generate content, coalescing identical in-flight requests into one generation.
+
+    Pass json_schema to ask for a single JSON object; backends that can will
+    constrain decoding to it and stop generating once the object closes.
+    With allow_mock=False, raises ModelUnavailable rather than returning the
+    mock fallback used while the backend is missing, failing or circuit-broken.
+    Structured requests always raise it: a canned payload would parse as a
+    real answer, so callers must fall back to something labelled as theirs.
+    """
+    # Keyed per priority so an interactive call never waits behind a queued background one
+    key = priority + ":" + ("json:" if json_schema else "") + SingleFlight.prompt_key(prompt, max_tokens, temperature)
+    text, from_model = await ai_single_flight.run(
+        key,
+        lambda: _generate_ai_content(prompt, max_tokens, temperature, purpose, priority, user_id, json_schema)
+    )
+    if not from_model and (not allow_mock or json_schema is not None):
+        raise ModelUnavailable(f"No model output for {purpose}")
+    return text
+
+def record_ai_usage(purpose: str, source: str, prompt: str, completion: str, attempts: int, started: datetime):
+    """Store prompt/completion token counts for one generation"""
     try:
-        if hf_client:
-            print(f"🤖 Calling Hugging Face API with Google Gemma model...")
-            
-            # Try with the new API format
-            for attempt in range(3):  # Retry up to 3 times
-                try:
-                    # Use the newer API format
-                    response = hf_client.text_generation(
-                        prompt=prompt,
-                        max_new_tokens=max_tokens,
-                        temperature=temperature,
-                        do_sample=True,
-                        return_full_text=False
-                    )
-                    
-                    # Check if response is valid
-                    if response and len(response.strip()) > 10:
-                        print(f"✅ AI generation successful on attempt {attempt + 1}")
-                        return response.strip()
-                    else:
-                        print(f"⚠️ Short response on attempt {attempt + 1}, retrying...")
-                        
-                except Exception as api_error:
-                    print(f"❌ API error on attempt {attempt + 1}: {str(api_error)}")
-                    if attempt == 2:  # Last attempt
-                        print("🔄 All API attempts failed, using enhanced mock response")
+        usage = {
+            'purpose': purpose,
+            'source': source,
+            'prompt_tokens': token_counter.count(prompt),
+            'completion_tokens': token_counter.count(completion),
+            'attempts': attempts,
+            'latency_ms': round((datetime.now() - started).total_seconds() * 1000),
+            'created_at': datetime.now()
+        }
+        ai_usage_collection.insert_one(usage)
+        logger.info(f"AI usage ({purpose}, {source}): {usage['prompt_tokens']} prompt / {usage['completion_tokens']} completion tokens")
+    except Exception as e:
+        logger.error(f"Failed to record AI usage: {e}")
+
+async def _generate_ai_content(
+    prompt: str,
+    max_tokens: int,
+    temperature: float,
+    purpose: str,
+    priority: str,
+    user_id: Optional[str],
+    json_schema: Optional[dict] = None
+) -> Tuple[str, bool]:
+    """Generate content using the configured Gemma backend with retry logic.
+
+    Returns the text and whether it came from the model rather than the mock fallback.
+    """
+    started = datetime.now()
+    try:
+        if llm_batcher and llm_circuit.is_open:
+            print("⚡ Inference circuit open, using enhanced mock response")
+            record_ai_usage(purpose, 'mock', prompt, '', 0, started)
+            return generate_enhanced_mock_response(prompt, max_tokens), False
+        if llm_batcher:
+            attempts = 0
+            # Raises QueueFullError (429) when this priority class is saturated
+            async with ai_scheduler.slot(priority, user_id):
+                print(f"🤖 Calling {llm_backend.name} backend with Google Gemma model...")
+                
+                for attempt in range(3):  # Retry up to 3 times
+                    # Stop retrying once the circuit opens; half-open lets a single probe through
+                    if not llm_circuit.allow():
+                        print("⚡ Inference circuit open, skipping remaining attempts")
                         break
-                    
-                # Wait before retry
-                import time
-                time.sleep(1)
+                    attempts += 1
+                    call_started = asyncio.get_running_loop().time()
+                    try:
+                        response = await llm_batcher.generate(prompt, max_tokens, temperature, json_schema)
+                        valid = bool(response and len(response.strip()) > 10)
+                        llm_circuit.record(valid, asyncio.get_running_loop().time() - call_started)
+                        
+                        # Check if response is valid
+                        if valid:
+                            print(f"✅ AI generation successful on attempt {attempt + 1}")
+                            record_ai_usage(purpose, llm_backend.name, prompt, response, attempt + 1, started)
+                            return response.strip(), True
+                        else:
+                            print(f"⚠️ Short response on attempt {attempt + 1}, retrying...")
+                            
+                    except Exception as api_error:
+                        llm_circuit.record(False, asyncio.get_running_loop().time() - call_started)
+                        print(f"❌ API error on attempt {attempt + 1}: {str(api_error)}")
+                        if attempt == 2:  # Last attempt
+                            print("🔄 All API attempts failed, using enhanced mock response")
+                            break
+                        
+                    # Wait before retry
+                    await asyncio.sleep(1)
             
             # If all attempts failed, use enhanced mock response
-            return generate_enhanced_mock_response(prompt, max_tokens)
+            record_ai_usage(purpose, 'mock', prompt, '', attempts, started)
+            return generate_enhanced_mock_response(prompt, max_tokens), False
         else:
-            print("⚠️ Hugging Face client not initialized, using enhanced mock response")
-            return generate_enhanced_mock_response(prompt, max_tokens)
+            print("⚠️ No LLM backend initialized, using enhanced mock response")
+            record_ai_usage(purpose, 'mock', prompt, '', 0, started)
+            return generate_enhanced_mock_response(prompt, max_tokens), False
             
+    except QueueFullError:
+        raise
     except Exception as e:
         print(f"❌ ERROR in AI generation: {str(e)}")
-        return generate_enhanced_mock_response(prompt, max_tokens)
+        return generate_enhanced_mock_response(prompt, max_tokens), False
 
 def generate_enhanced_mock_response(prompt: str, max_tokens: int) -> str:
     """Generate realistic mock responses based on prompt content"""
@@ -343,37 +624,30 @@ Thank you for your time and consideration.
 Best regards,
 John Doe"""
 
-    elif "job match" in prompt_lower or "analyze" in prompt_lower:
-        return """{
-    "match_score": 85,
-    "strengths": [
-        "Strong Python and React experience matching job requirements",
-        "Proven track record with web application development",
-        "Experience with modern frameworks and tools"
-    ],
-    "gaps": [
-        "Could benefit from more cloud platform experience",
-        "Consider gaining additional DevOps knowledge"
-    ],
-    "recommendations": [
-        "Highlight specific Python projects in your application",
-        "Emphasize your React component development experience",
-        "Consider taking AWS certification to strengthen cloud skills"
-    ],
-    "summary": "Excellent match for this position. Strong technical foundation with relevant experience. Minor gaps can be addressed through professional development."
-}"""
-    
     else:
         return f"Enhanced AI response for your request. This would normally be generated by Google Gemma 2B model based on your specific prompt: {prompt[:100]}..."
 
-async def customize_resume_for_job(original_resume: str, job_title: str, job_description: str, company: str) -> str:
+async def customize_resume_for_job(
+    original_resume: str,
+    job_title: str,
+    job_description: str,
+    company: str,
+    priority: str = INTERACTIVE,
+    user_id: Optional[str] = None,
+    allow_mock: bool = True
+) -> str:
     """Customize resume for specific job using AI"""
+    # Keep the prompt within budget; long resumes/descriptions lose low-priority sections first
+    original_resume = fit_resume(original_resume)
+    job_description = fit_description(job_description)
+    
+    # The resume leads the prompt so repeated generations share a stable prefix
     prompt = f"""
-As a professional resume writer, customize the following resume for a {job_title} position at {company}.
-
 Original Resume:
 {original_resume}
 
+As a professional resume writer, customize the resume above for a {job_title} position at {company}.
+
 Job Description:
 {job_description}
 
@@ -388,20 +662,34 @@ Instructions:
 Customized Resume:
 """
     
-    return await generate_ai_content(prompt, max_tokens=800, temperature=0.6)
+    return await generate_ai_content(
+        prompt, max_tokens=800, temperature=0.6, purpose="resume", priority=priority, user_id=user_id, allow_mock=allow_mock
+    )
 
-async def generate_cover_letter(applicant_name: str, job_title: str, company: str, job_description: str, user_background: str, skills: List[str]) -> str:
+async def generate_cover_letter(
+    applicant_name: str,
+    job_title: str,
+    company: str,
+    job_description: str,
+    user_background: str,
+    skills: List[str],
+    priority: str = INTERACTIVE,
+    user_id: Optional[str] = None,
+    allow_mock: bool = True
+) -> str:
     """Generate personalized cover letter using AI"""
     skills_text = ", ".join(skills)
+    user_background = fit_resume(user_background)
+    job_description = fit_description(job_description)
     
     prompt = f"""
-Write a professional cover letter for {applicant_name} applying for the {job_title} position at {company}.
-
 Applicant Background:
 {user_background}
 
 Key Skills: {skills_text}
 
+Write a professional cover letter for {applicant_name} applying for the {job_title} position at {company}.
+
 Job Description:
 {job_description}
 
@@ -416,22 +704,45 @@ Requirements:
 Cover Letter:
 """
     
-    return await generate_ai_content(prompt, max_tokens=600, temperature=0.7)
+    return await generate_ai_content(
+        prompt, max_tokens=600, temperature=0.7, purpose="cover_letter", priority=priority, user_id=user_id, allow_mock=allow_mock
+    )
 
-async def analyze_job_match(resume_text: str, job_title: str, job_description: str, requirements: List[str]) -> dict:
-    """Analyze how well a candidate matches a job using AI"""
+async def analyze_job_match(
+    resume_text: str,
+    job_title: str,
+    job_description: str,
+    requirements: List[str],
+    include_narrative: bool = False,
+    resume_digest: Optional[str] = None,
+    user_id: Optional[str] = None
+) -> dict:
+    """Analyze how well a candidate matches a job, using the LLM only when worthwhile"""
+    # Cheap deterministic score first; most jobs never need an LLM call
+    local_analysis = score_job_match(
+        resume_text,
+        job_title,
+        requirements,
+        resume_skills=extract_skills(resume_text),
+        job_skills=job_skills({'title': job_title, 'requirements': requirements, 'description': job_description}),
+        job_description=job_description
+    )
+    local_analysis['analysis_source'] = 'local'
+    if not include_narrative and local_analysis['match_score'] < LLM_MATCH_THRESHOLD:
+        return local_analysis
+    
     requirements_text = "\n".join([f"- {req}" for req in requirements])
     
     prompt = f"""
-Analyze the job match between this candidate and the job position. Provide a detailed assessment.
-
 Candidate Resume:
-{resume_text}
+{fit_resume(resume_digest or resume_text)}
+
+Analyze the job match between this candidate and the job position. Provide a detailed assessment.
 
 Job Title: {job_title}
 
 Job Description:
-{job_description}
+{fit_description(job_description)}
 
 Key Requirements:
 {requirements_text}
@@ -446,52 +757,144 @@ Please provide:
 Format your response as JSON with these exact keys: match_score, strengths, gaps, recommendations, summary
 """
     
-    response = await generate_ai_content(prompt, max_tokens=500, temperature=0.5)
+    try:
+        response = await generate_ai_content(
+            prompt,
+            max_tokens=500,
+            temperature=0.5,
+            purpose="job_match",
+            user_id=user_id,
+            json_schema=JOB_MATCH_SCHEMA,
+            allow_mock=False
+        )
+    except ModelUnavailable:
+        # Without model output the local scores are the honest answer, labelled as such
+        print("⚠️ No model output for job match, using local scores")
+        return local_analysis
+    
+    # Prefer the LLM's JSON (repaired and validated); fall back to the local analysis
+    llm_analysis = parse_job_match(response)
+    if llm_analysis:
+        llm_analysis['analysis_source'] = 'llm'
+        return llm_analysis
+    # No usable JSON: keep the local scores and use the text as the narrative
+    print("⚠️ Job match response had no valid JSON, using local scores")
+    local_analysis['summary'] = response
+    return local_analysis
+
+async def generate_application_materials(
+    user_profile: dict,
+    user_resume: dict,
+    job_data: dict,
+    priority: str = BATCH,
+    allow_mock: bool = True
+) -> dict:
+    """Customized resume and cover letter for one job"""
+    resume_digest = resume_digest_text(user_resume)
+    user_id = user_resume['user_id']
+    
+    customized_resume = await customize_resume_for_job(
+        resume_digest,
+        job_data.get('title', ''),
+        job_data.get('description', ''),
+        job_data.get('company', ''),
+        priority=priority,
+        user_id=user_id,
+        allow_mock=allow_mock
+    )
+    
+    cover_letter = await generate_cover_letter(
+        user_profile.get('name', ''),
+        job_data.get('title', ''),
+        job_data.get('company', ''),
+        job_data.get('description', ''),
+        resume_digest,
+        user_resume['parsed_data'].get('skills', []),
+        priority=priority,
+        user_id=user_id,
+        allow_mock=allow_mock
+    )
     
-    # Try to parse as JSON, fallback to text if needed
+    return {'customized_resume': customized_resume, 'cover_letter': cover_letter}
+
+async def draft_application(user_id: str, job: dict) -> Optional[dict]:
+    """Application materials for a background draft, or None if the user can't apply yet or the model is unavailable"""
+    user_resume = resumes_collection.find_one({"user_id": user_id})
+    user_profile = users_collection.find_one({"user_id": user_id})
+    if not user_resume or not user_profile:
+        return None
     try:
-        # Check if the response is already a string
-        if isinstance(response, str):
-            # Try to find JSON in the response
-            import re
-            json_match = re.search(r'\{.*\}', response, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(0)
-                import json
-                return json.loads(json_str)
-            else:
-                # If no JSON found, create a structured response
-                return {
-                    "match_score": 75,  # Mock score
-                    "strengths": ["Python experience", "React experience", "Software development background"],
-                    "gaps": ["May need more specific experience"],
-                    "recommendations": ["Highlight relevant projects"],
-                    "summary": response
-                }
-        else:
-            # If response is not a string (unlikely), return a mock response
-            return {
-                "match_score": 75,
-                "strengths": ["Python experience", "React experience", "Software development background"],
-                "gaps": ["May need more specific experience"],
-                "recommendations": ["Highlight relevant projects"],
-                "summary": "Mock analysis summary"
-            }
+        # Drafts are served as instant applies, so canned mock text must never be stored as one
+        return await generate_application_materials(user_profile, user_resume, job, priority=BACKGROUND, allow_mock=False)
+    except ModelUnavailable as e:
+        logger.info(f"Skipping draft of {job.get('job_id')} for {user_id}: {e}")
+        return None
+
+# Opt-in drafts for each user's top-ranked jobs, written only while no other generation is queued or running
+draft_pregenerator = DraftPregenerator(db, generate=draft_application, is_idle=lambda: ai_scheduler.idle)
+
+async def schedule_application_drafts(user_id: str):
+    """Start background drafts for a user who opted in, once a model backend is configured"""
+    try:
+        if not llm_batcher:
+            return
+        preferences = db.preferences.find_one({"user_id": user_id}, {"pregenerate_applications": 1})
+        if not preferences or not preferences.get('pregenerate_applications'):
+            draft_pregenerator.cancel(user_id)
+            return
+        user_resume = resumes_collection.find_one({"user_id": user_id}, {"content": 1})
+        if not user_resume:
+            return
+        top_jobs = [job_id for job_id, _ in match_scores.top(user_id, draft_pregenerator.top_n)]
+        draft_pregenerator.schedule(user_id, resume_hash(user_resume['content']), top_jobs)
     except Exception as e:
-        print(f"Error parsing job match response: {str(e)}")
-        # Return mock data for testing
-        return {
-            "match_score": 75,
-            "strengths": ["Python experience", "React experience", "Software development background"],
-            "gaps": ["May need more specific experience"],
-            "recommendations": ["Highlight relevant projects"],
-            "summary": "Mock analysis summary due to parsing error"
-        }
+        logger.error(f"Failed to schedule application drafts for {user_id}: {e}")
+
+@app.middleware("http")
+async def limit_resume_upload_size(request: Request, call_next):
+    """Turn away oversized resume uploads from Content-Length, before the body is read"""
+    if request.url.path == "/api/resumes/upload":
+        length = request.headers.get('content-length', '')
+        # Allow some room for the multipart envelope around the file
+        if length.isdigit() and int(length) > MAX_RESUME_BYTES + UPLOAD_CHUNK_BYTES:
+            return JSONResponse(
+                status_code=413,
+                content={"detail": f"Resume must be at most {MAX_RESUME_BYTES // (1024 * 1024)} MB"}
+            )
+    return await call_next(request)
+
+@app.on_event("shutdown")
+def stop_worker_pools():
+    """Stop the PDF and job field worker processes with the server"""
+    pdf_parser.shutdown()
+    job_field_extractor.shutdown()
+
+@app.exception_handler(InvalidCursor)
+async def invalid_cursor(request, exc: InvalidCursor):
+    """A stale or forged continuation token is the client's mistake"""
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
+
+@app.exception_handler(QueueFullError)
+async def generation_queue_full(request, exc: QueueFullError):
+    """Saturated generation queue: ask the client to come back later"""
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
 
 # API Routes
 @app.get("/api/health")
 async def health_check():
-    return {"status": "healthy", "timestamp": datetime.now()}
+    return {
+        "status": "healthy",
+        "timestamp": datetime.now(),
+        "inference": {
+            "backend": llm_backend.name if llm_backend else None,
+            "circuit": llm_circuit.stats(),
+            "queue": ai_scheduler.stats()
+        }
+    }
 
 @app.post("/api/users/profile")
 async def create_user_profile(profile: UserProfile):
@@ -520,7 +923,7 @@ async def get_user_profile(user_id: str):
     try:
         user = users_collection.find_one({"user_id": user_id})
         if user:
-            return convert_objectid(user)
+            return DocumentResponse(user)
         else:
             raise HTTPException(status_code=404, detail="User not found")
     except Exception as e:
@@ -534,21 +937,43 @@ async def upload_resume(file: UploadFile = File(...), user_id: str = Form(...)):
         if file.content_type != 'application/pdf':
             raise HTTPException(status_code=400, detail="Only PDF files are supported")
         
-        # Read file content
-        file_content = await file.read()
-        
-        # Parse PDF
-        text_content = parse_pdf_resume(file_content)
-        
-        # Extract information
-        parsed_data = extract_resume_info(text_content)
+        # Stream to disk with a size cap, hashing on the way
+        file_path, file_hash = await spool_upload(file)
+        try:
+            # Same file as the user's current resume: nothing to parse or rescore
+            current = resumes_collection.find_one(
+                {"user_id": user_id, "file_hash": file_hash, "parse_version": RESUME_PARSE_VERSION},
+                {"parsed_data": 1}
+            )
+            if current:
+                resumes_collection.update_one({"_id": current['_id']}, {"$set": {"file_name": file.filename}})
+                return {
+                    "message": "Resume uploaded and parsed successfully",
+                    "resume_id": str(current['_id']),
+                    "parsed_data": current['parsed_data']
+                }
+            
+            # Parse PDF and extract information, unless this exact file was parsed before
+            cached = parse_cache.get(file_hash, RESUME_PARSE_VERSION)
+            if cached:
+                text_content, parsed_data = cached['content'], cached['parsed_data']
+            else:
+                text_content = await parse_pdf_resume(file_path)
+                parsed_data = extract_resume_info(text_content)
+                parse_cache.put(file_hash, RESUME_PARSE_VERSION, {'content': text_content, 'parsed_data': parsed_data})
+        finally:
+            os.unlink(file_path)
         
         # Save to database
         resume_data = {
             'user_id': user_id,
             'file_name': file.filename,
+            'file_hash': file_hash,
+            'parse_version': RESUME_PARSE_VERSION,
             'content': text_content,
             'parsed_data': parsed_data,
+            # Compact prompt version of the resume, replaced with the resume on re-upload
+            'digest': build_resume_digest(text_content, parsed_data['skills']),
             'created_at': datetime.now()
         }
         
@@ -558,11 +983,19 @@ async def upload_resume(file: UploadFile = File(...), user_id: str = Form(...)):
         # Insert new resume
         result = resumes_collection.insert_one(resume_data)
         
+        # Resume skills feed job relevance, so rescore this user's jobs
+        refresh_user_scores(user_id)
+        await schedule_application_drafts(user_id)
+        if embedding_store.available:
+            submit_background(embedding_store.embed_resume, user_id, text_content)
+        
         return {
             "message": "Resume uploaded and parsed successfully",
             "resume_id": str(result.inserted_id),
             "parsed_data": parsed_data
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -570,11 +1003,13 @@ async def upload_resume(file: UploadFile = File(...), user_id: str = Form(...)):
 async def get_resume(user_id: str):
     """Get user's resume"""
     try:
-        resume = resumes_collection.find_one({"user_id": user_id})
+        resume = resumes_collection.find_one({"user_id": user_id}, RESUME_VIEW_PROJECTION)
         if resume:
-            return convert_objectid(resume)
+            return DocumentResponse(resume)
         else:
             raise HTTPException(status_code=404, detail="Resume not found")
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error in get_resume: {e}")
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
@@ -592,9 +1027,13 @@ async def save_job_preferences(preferences: JobPreferences):
                 {"user_id": preferences.user_id},
                 {"$set": pref_dict}
             )
+            refresh_user_scores(preferences.user_id)
+            await schedule_application_drafts(preferences.user_id)
             return {"message": "Preferences updated successfully"}
         else:
             db.preferences.insert_one(pref_dict)
+            refresh_user_scores(preferences.user_id)
+            await schedule_application_drafts(preferences.user_id)
             return {"message": "Preferences saved successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -605,19 +1044,28 @@ async def get_job_preferences(user_id: str):
     try:
         preferences = db.preferences.find_one({"user_id": user_id})
         if preferences:
-            return convert_objectid(preferences)
+            return DocumentResponse(preferences)
         else:
             return {"message": "No preferences found"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/jobs")
-async def get_jobs(user_id: str):
-    """Get jobs for user based on preferences"""
+async def get_jobs(
+    user_id: str,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    near: Optional[str] = None,
+    radius_km: float = Query(50, gt=0),
+    remote_region: Optional[str] = None
+):
+    """Get jobs for user based on preferences, ranked by relevance, a page at a time.
+
+    ``near`` keeps jobs within ``radius_km`` of a place and ``remote_region``
+    keeps remote jobs open to a region; given both, a job may match either.
+    Pass the returned ``next_cursor`` back as ``cursor`` for the next page.
+    """
     try:
-        # Get user preferences
-        preferences = db.preferences.find_one({"user_id": user_id})
-        
         # Check if we have jobs in database, if not, create sample jobs
         job_count = jobs_collection.count_documents({})
         if job_count == 0:
@@ -777,28 +1225,155 @@ async def get_jobs(user_id: str):
                 }
             ]
             
-            jobs_collection.insert_many(sample_jobs)
+            await asyncio.get_running_loop().run_in_executor(None, ingest_and_score_jobs, sample_jobs)
         
-        # Build query based on preferences
-        query = {}
-        if preferences and preferences.get('job_titles'):
-            job_titles_regex = "|".join(preferences['job_titles'])
-            query['title'] = {"$regex": job_titles_regex, "$options": "i"}
-        if preferences and preferences.get('locations'):
-            locations_regex = "|".join(preferences['locations'])
-            query['location'] = {"$regex": locations_regex, "$options": "i"}
+        # Read pre-sorted scores from the materialized view, computing them on first visit
+        limit = max(1, min(limit, 100))
+        location_query = job_location_query(near, radius_km, remote_region)
+        if location_query:
+            # Geo and region lookups go through the 2dsphere and location_norm indexes; the matches
+            # are ranked directly, since they may lie outside the user's preferred locations
+            nearby = [job['job_id'] for job in jobs_collection.find(location_query, {"_id": 0, "job_id": 1})]
+            ranked, next_cursor = match_scores.page_within(user_id, nearby, limit, cursor)
+        else:
+            if not cursor and not match_scores.top(user_id, 1):
+                match_scores.refresh_user(user_id)
+            ranked, next_cursor = match_scores.page(user_id, limit, cursor)
         
-        jobs = list(jobs_collection.find(query).limit(50))
-        return {"jobs": convert_objectid(jobs), "count": len(jobs)}
+        scores = dict(ranked)
+        jobs_by_id = {
+            job['job_id']: job
+            for job in jobs_collection.find({"job_id": {"$in": list(scores)}})
+        }
+        jobs = []
+        for job_id, score in ranked:
+            job = jobs_by_id.get(job_id)
+            if job:
+                job['relevance'] = score
+                jobs.append(job)
+        return DocumentResponse({"jobs": jobs, "count": len(jobs), "next_cursor": next_cursor})
+    except (HTTPException, InvalidCursor):
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/jobs/search")
+async def search_jobs(
+    query: str,
+    user_id: Optional[str] = None,
+    location: Optional[str] = None,
+    job_type: Optional[str] = None,
+    company: Optional[str] = None,
+    source: Optional[str] = None,
+    work_mode: Optional[str] = None,
+    limit: int = 20
+):
+    """Full-text job search ordered by BM25 relevance"""
+    try:
+        limit = max(1, min(limit, 100))
+        excluded_companies = []
+        if user_id:
+            preferences = db.preferences.find_one({"user_id": user_id}, {"excluded_companies": 1})
+            if preferences:
+                excluded_companies = preferences.get('excluded_companies', [])
+
+        hits = job_search_index.search(
+            query,
+            location=location,
+            job_type=job_type,
+            company=company,
+            source=source,
+            work_mode=work_mode,
+            excluded_companies=excluded_companies,
+            limit=limit
+        )
+        if not hits:
+            return {"jobs": [], "count": 0, "query": query}
+
+        scores = dict(hits)
+        jobs_by_id = {
+            job['job_id']: job
+            for job in jobs_collection.find({"job_id": {"$in": list(scores)}})
+        }
+        jobs = []
+        for job_id, score in hits:
+            job = jobs_by_id.get(job_id)
+            if job:
+                job['relevance'] = score
+                jobs.append(job)
+        return DocumentResponse({"jobs": jobs, "count": len(jobs), "query": query})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/jobs/similar/{user_id}")
+async def get_similar_jobs(user_id: str, limit: int = 20):
+    """Jobs semantically closest to the user's resume, from the local embedding index"""
+    if not embedding_store.available:
+        raise HTTPException(status_code=503, detail="Local embedding model is not available")
+    resume = resumes_collection.find_one({"user_id": user_id}, {"content": 1})
+    if not resume:
+        raise HTTPException(status_code=404, detail="Resume not found")
+    try:
+        hits = await asyncio.get_running_loop().run_in_executor(
+            None, embedding_store.similar_jobs, user_id, resume['content'], max(1, min(limit, 100))
+        )
+        similarities = dict(hits)
+        jobs_by_id = {
+            job['job_id']: job
+            for job in jobs_collection.find({"job_id": {"$in": list(similarities)}})
+        }
+        jobs = []
+        for job_id, similarity in hits:
+            job = jobs_by_id.get(job_id)
+            if job:
+                job['similarity'] = similarity
+                jobs.append(job)
+        return DocumentResponse({"jobs": jobs, "count": len(jobs)})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/applications/{user_id}")
-async def get_applications(user_id: str):
-    """Get user's job applications"""
+async def get_applications(user_id: str, status: Optional[str] = None, limit: int = 50, cursor: Optional[str] = None):
+    """Get user's job applications, newest first, a page at a time"""
+    try:
+        query = {"user_id": user_id}
+        if status:
+            query["status"] = status
+        applications, next_cursor = paginate(
+            applications_collection, query, APPLICATION_PAGE_SORT, max(1, min(limit, 100)), cursor,
+            projection=APPLICATION_SUMMARY_PROJECTION
+        )
+        return DocumentResponse({"applications": applications, "count": len(applications), "next_cursor": next_cursor})
+    except InvalidCursor:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/applications/{user_id}/stats")
+async def get_application_stats(user_id: str):
+    """Application counts by status, so dashboards don't need every application"""
+    try:
+        by_status = {
+            row['_id']: row['count']
+            for row in applications_collection.aggregate([
+                {"$match": {"user_id": user_id}},
+                {"$group": {"_id": "$status", "count": {"$sum": 1}}}
+            ])
+        }
+        return {"total": sum(by_status.values()), "by_status": by_status}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/applications/{user_id}/{application_id}")
+async def get_application(user_id: str, application_id: str):
+    """One application in full, including the customized resume, cover letter and job data"""
     try:
-        applications = list(applications_collection.find({"user_id": user_id}))
-        return {"applications": convert_objectid(applications), "count": len(applications)}
+        application = applications_collection.find_one({"user_id": user_id, "application_id": application_id})
+        if not application:
+            raise HTTPException(status_code=404, detail="Application not found")
+        return DocumentResponse(application)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -808,10 +1383,11 @@ async def ai_customize_resume(request: ResumeCustomizationRequest):
     """Customize resume for specific job using AI"""
     try:
         customized_resume = await customize_resume_for_job(
-            request.original_resume,
+            resume_for_prompt(request.user_id, request.original_resume),
             request.job_title,
             request.job_description,
-            request.company
+            request.company,
+            user_id=request.user_id
         )
         
         # Save customized resume to database
@@ -834,6 +1410,8 @@ async def ai_customize_resume(request: ResumeCustomizationRequest):
                 'company': request.company
             }
         )
+    except QueueFullError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -846,8 +1424,9 @@ async def ai_generate_cover_letter(request: CoverLetterRequest):
             request.job_title,
             request.company,
             request.job_description,
-            request.user_background,
-            request.skills
+            resume_for_prompt(request.user_id, request.user_background),
+            request.skills,
+            user_id=request.user_id
         )
         
         # Save cover letter to database
@@ -869,6 +1448,8 @@ async def ai_generate_cover_letter(request: CoverLetterRequest):
                 'company': request.company
             }
         )
+    except QueueFullError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -880,7 +1461,10 @@ async def ai_analyze_job_match(request: JobMatchRequest):
             request.resume_text,
             request.job_title,
             request.job_description,
-            request.requirements
+            request.requirements,
+            include_narrative=request.include_narrative,
+            resume_digest=resume_for_prompt(request.user_id, request.resume_text),
+            user_id=request.user_id
         )
         
         # Save analysis to database
@@ -898,23 +1482,35 @@ async def ai_analyze_job_match(request: JobMatchRequest):
             content=json.dumps(match_analysis),
             metadata=match_analysis
         )
+    except QueueFullError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/ai/user-content/{user_id}")
-async def get_user_ai_content(user_id: str):
-    """Get all AI-generated content for a user"""
+async def get_user_ai_content(user_id: str, limit: int = 50):
+    """Summaries of a user's most recent AI-generated content; bodies come from the detail endpoint"""
     try:
-        customized_resumes = list(db.customized_resumes.find({"user_id": user_id}))
-        cover_letters = list(db.cover_letters.find({"user_id": user_id}))
-        job_matches = list(db.job_matches.find({"user_id": user_id}))
-        
-        # Convert ObjectId to string
-        return {
-            "customized_resumes": convert_objectid(customized_resumes),
-            "cover_letters": convert_objectid(cover_letters),
-            "job_matches": convert_objectid(job_matches)
-        }
+        limit = max(1, min(limit, 100))
+        return DocumentResponse({
+            kind: list(db[kind].find({"user_id": user_id}, projection).sort("created_at", -1).limit(limit))
+            for kind, projection in AI_CONTENT_SUMMARY_PROJECTIONS.items()
+        })
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/ai/user-content/{user_id}/{kind}/{content_id}")
+async def get_user_ai_content_item(user_id: str, kind: str, content_id: str):
+    """One customized resume, cover letter or job match in full"""
+    try:
+        if kind not in AI_CONTENT_SUMMARY_PROJECTIONS or not ObjectId.is_valid(content_id):
+            raise HTTPException(status_code=404, detail="Content not found")
+        item = db[kind].find_one({"_id": ObjectId(content_id), "user_id": user_id})
+        if not item:
+            raise HTTPException(status_code=404, detail="Content not found")
+        return DocumentResponse(item)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -932,23 +1528,14 @@ async def ai_apply_to_job(user_id: str, job_data: dict):
         if not user_profile:
             raise HTTPException(status_code=404, detail="User profile not found")
         
-        # Generate customized resume
-        customized_resume = await customize_resume_for_job(
-            user_resume['content'],
-            job_data.get('title', ''),
-            job_data.get('description', ''),
-            job_data.get('company', '')
-        )
-        
-        # Generate cover letter
-        cover_letter = await generate_cover_letter(
-            user_profile.get('name', ''),
-            job_data.get('title', ''),
-            job_data.get('company', ''),
-            job_data.get('description', ''),
-            user_resume['content'],
-            user_resume['parsed_data'].get('skills', [])
-        )
+        # Use a pre-generated draft when one matches this job and resume, otherwise generate now
+        materials = draft_pregenerator.take(user_id, job_data, resume_hash(user_resume['content']))
+        from_draft = materials is not None
+        if not from_draft:
+            # The user is waiting on this response, so it must not queue behind batch work
+            materials = await generate_application_materials(user_profile, user_resume, job_data, priority=INTERACTIVE)
+        customized_resume = materials['customized_resume']
+        cover_letter = materials['cover_letter']
         
         # Create job application record
         application_id = str(uuid.uuid4())
@@ -972,14 +1559,17 @@ async def ai_apply_to_job(user_id: str, job_data: dict):
             "application_id": application_id,
             "message": f"Successfully applied to {job_data.get('title')} at {job_data.get('company')}",
             "customized_resume": customized_resume,
-            "cover_letter": cover_letter
+            "cover_letter": cover_letter,
+            "from_draft": from_draft
         }
+    except QueueFullError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 # Job Discovery Endpoints (Phase 3: Web Automation)
 @app.post("/api/discover/jobs")
-async def discover_jobs_from_web(request: JobDiscoveryRequest):
+async def discover_jobs_from_web(request: JobDiscoveryRequest, background_tasks: BackgroundTasks):
     """Discover jobs from web sources (JustJoinIT, InHire, Company careers)"""
     try:
         # Create mock jobs for testing
@@ -1008,20 +1598,19 @@ async def discover_jobs_from_web(request: JobDiscoveryRequest):
         # Insert jobs into discovered_jobs collection
         db.discovered_jobs.insert_many(mock_jobs)
         
-        # Also update the main jobs collection with new jobs
-        for job in mock_jobs:
-            # Check if job already exists to avoid duplicates
-            existing_job = jobs_collection.find_one({"job_id": job["job_id"]})
-            if not existing_job:
-                jobs_collection.insert_one(job)
+        # Also upsert into the main jobs collection (keyed by job_id, so no duplicates)
+        # and materialize match scores for the new jobs off the request path
+        background_tasks.add_task(ingest_and_score_jobs, mock_jobs)
+        background_tasks.add_task(schedule_application_drafts, request.user_id)
         
-        return JobDiscoveryResponse(
+        # insert_many adds ObjectId _ids to mock_jobs; the response class encodes them
+        return DocumentResponse(JobDiscoveryResponse(
             success=True,
             jobs_found=len(mock_jobs),
             jobs=mock_jobs,
             sources_scraped=["Mock Source"],
             timestamp=datetime.now()
-        )
+        ).model_dump())
         
     except Exception as e:
         logger.error(f"Job discovery failed: {str(e)}")
@@ -1054,26 +1643,32 @@ async def discover_jobs_from_web(request: JobDiscoveryRequest):
         )
 
 @app.get("/api/discover/jobs/{user_id}")
-async def get_discovered_jobs(user_id: str, source: Optional[str] = None, limit: int = 50):
-    """Get jobs discovered for a specific user"""
+async def get_discovered_jobs(user_id: str, source: Optional[str] = None, limit: int = 50, cursor: Optional[str] = None):
+    """Get jobs discovered for a specific user, newest first, a page at a time"""
     try:
         query = {"discovered_for_user": user_id}
         if source:
             query["source"] = source
         
-        discovered_jobs = list(
-            db.discovered_jobs.find(query)
-            .sort("discovery_timestamp", -1)
-            .limit(limit)
+        discovered_jobs, next_cursor = paginate(
+            db.discovered_jobs, query, DISCOVERY_PAGE_SORT, max(1, min(limit, 100)), cursor
         )
         
-        # Convert ObjectId to string
-        return {
+        # Attach materialized relevance scores via the (user_id, job_id) index
+        scores = match_scores.scores_for(user_id, [job['job_id'] for job in discovered_jobs if job.get('job_id')])
+        for job in discovered_jobs:
+            job['match_score'] = scores.get(job.get('job_id'))
+        
+        # Discovered jobs keep their ObjectId _id, encoded by the response class
+        return DocumentResponse({
             "success": True,
-            "jobs": convert_objectid(discovered_jobs),
-            "count": len(discovered_jobs)
-        }
+            "jobs": discovered_jobs,
+            "count": len(discovered_jobs),
+            "next_cursor": next_cursor
+        })
         
+    except InvalidCursor:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -1110,7 +1705,7 @@ async def get_available_sources():
     }
 
 @app.post("/api/discover/refresh-jobs")
-async def refresh_job_discoveries(user_id: str):
+async def refresh_job_discoveries(user_id: str, background_tasks: BackgroundTasks):
     """Refresh job discoveries for a user"""
     try:
         # Get user preferences for targeted discovery
@@ -1141,6 +1736,9 @@ async def refresh_job_discoveries(user_id: str):
                 
                 if not existing:
                     db.discovered_jobs.insert_one(job)
+            
+            background_tasks.add_task(ingest_and_score_jobs, discovered_jobs)
+            background_tasks.add_task(schedule_application_drafts, user_id)
         
         return {
             "success": True,
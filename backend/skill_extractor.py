@@ -0,0 +1,104 @@
+import json
+import os
+import re
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Iterable, List, Tuple
+
+DEFAULT_TAXONOMY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'skills.json')
+
+def normalize_text(text: str) -> str:
+    """Lowercase with whitespace runs collapsed, so multi-word skills match across line breaks"""
+    return re.sub(r'\s+', ' ', text.lower())
+
+class SkillExtractor:
+    """Finds taxonomy skills in text with one Aho-Corasick pass.
+
+    Every skill name and synonym is compiled into a single automaton mapping
+    to the skill's canonical name. Matches must sit on word boundaries (so
+    "java" is not found inside "javascript") and overlapping matches resolve
+    leftmost-longest (so "react native" wins over "react"). Names listed as
+    ambiguous in the taxonomy, like "go" or "c", only match via synonyms.
+    """
+
+    def __init__(self, skills: Dict[str, List[str]], ambiguous: Iterable[str] = (), version: int = 0):
+        ambiguous = set(ambiguous)
+        self.skills = sorted(skills)
+        # The taxonomy file's version; results derived from extraction depend on it
+        self.version = version
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[int, str]]] = [[]]
+        for canonical, synonyms in skills.items():
+            patterns = list(synonyms) if canonical in ambiguous else [canonical] + list(synonyms)
+            for pattern in patterns:
+                self._insert(normalize_text(pattern).strip(), canonical)
+        self._build_failure_links()
+
+    @classmethod
+    def from_file(cls, path: str = None) -> "SkillExtractor":
+        """Load a taxonomy file: {"version": n, "skills": {canonical: [synonyms]}, "ambiguous": [names]}"""
+        path = path or os.environ.get('SKILLS_TAXONOMY_PATH', DEFAULT_TAXONOMY_PATH)
+        with open(path, encoding='utf-8') as handle:
+            taxonomy = json.load(handle)
+        return cls(taxonomy['skills'], taxonomy.get('ambiguous', []), taxonomy.get('version', 0))
+
+    def _insert(self, pattern: str, canonical: str):
+        if not pattern:
+            return
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append((len(pattern), canonical))
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                # Patterns ending at the fallback state also end here
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def matches(self, text: str) -> List[Tuple[int, int, str]]:
+        """Non-overlapping (start, end, canonical) matches in the normalized text"""
+        text = normalize_text(text)
+        goto, fail, output = self._goto, self._fail, self._output
+        found = []
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for length, canonical in output[state]:
+                start, end = index - length + 1, index + 1
+                if (start == 0 or not text[start - 1].isalnum()) and (end == len(text) or not text[end].isalnum()):
+                    found.append((start, end, canonical))
+
+        found.sort(key=lambda match: (match[0], match[0] - match[1]))
+        selected, last_end = [], 0
+        for start, end, canonical in found:
+            if start >= last_end:
+                selected.append((start, end, canonical))
+                last_end = end
+        return selected
+
+    def extract(self, text: str) -> List[str]:
+        """Canonical skills mentioned in text, in order of first mention"""
+        return list(dict.fromkeys(canonical for _, _, canonical in self.matches(text)))
+
+@lru_cache(maxsize=1)
+def default_extractor() -> SkillExtractor:
+    """The extractor for the configured taxonomy, built once per process"""
+    return SkillExtractor.from_file()
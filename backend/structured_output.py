@@ -0,0 +1,131 @@
+import json
+import math
+import re
+from typing import Any, List, Optional
+
+from pydantic import BaseModel, Field, ValidationError, field_validator
+
+class JobMatchAnalysis(BaseModel):
+    """Shape of a job match analysis, whether it came from the LLM or the local scorer"""
+
+    match_score: int = Field(ge=0, le=100)
+    strengths: List[str] = []
+    gaps: List[str] = []
+    recommendations: List[str] = []
+    summary: str = ""
+
+    @field_validator('match_score', mode='before')
+    @classmethod
+    def coerce_score(cls, value: Any) -> int:
+        # Models write "85", "85%" or 85.0 as often as 85
+        if isinstance(value, str):
+            digits = re.search(r'\d+(?:\.\d+)?', value)
+            if not digits:
+                raise ValueError("match_score has no number")
+            value = digits.group(0)
+        # null, [85] or true would otherwise raise TypeError, which pydantic doesn't turn into a ValidationError
+        if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+            raise ValueError("match_score is not a number")
+        try:
+            score = float(value)
+        except OverflowError:
+            raise ValueError("match_score is out of range")
+        if not math.isfinite(score):
+            raise ValueError("match_score is not finite")
+        return min(100, max(0, round(score)))
+
+    @field_validator('strengths', 'gaps', 'recommendations', mode='before')
+    @classmethod
+    def coerce_list(cls, value: Any) -> List[str]:
+        if value is None:
+            return []
+        if isinstance(value, str):
+            return [value]
+        return [str(item) for item in value]
+
+JOB_MATCH_SCHEMA = JobMatchAnalysis.model_json_schema()
+
+class JsonObjectScanner:
+    """Follows streamed text to find where the first JSON object starts and closes.
+
+    Tracks string/escape state and the stack of open brackets, so a caller can
+    stop generation as soon as ``feed`` reports the object is complete, and
+    ``object_text`` can close whatever a truncated completion left open.
+    """
+
+    def __init__(self):
+        self._parts: List[str] = []
+        self._length = 0
+        self.start: Optional[int] = None
+        self.end: Optional[int] = None
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escaped = False
+
+    @property
+    def complete(self) -> bool:
+        return self.end is not None
+
+    def feed(self, chunk: str) -> bool:
+        """Consume more text; True once the first top-level object has closed"""
+        if self.complete:
+            return True
+        offset = self._length
+        self._parts.append(chunk)
+        self._length += len(chunk)
+        for i, char in enumerate(chunk):
+            if self.start is None:
+                if char == '{':
+                    self.start = offset + i
+                    self._stack.append('}')
+                continue
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == '{':
+                self._stack.append('}')
+            elif char == '[':
+                self._stack.append(']')
+            elif char in '}]' and self._stack:
+                self._stack.pop()
+                if not self._stack:
+                    self.end = offset + i + 1
+                    return True
+        return False
+
+    def object_text(self) -> Optional[str]:
+        """The object so far, with open strings and brackets closed if it was cut off"""
+        if self.start is None:
+            return None
+        text = "".join(self._parts)
+        if self.complete:
+            return text[self.start:self.end]
+        partial = text[self.start:]
+        if self._in_string:
+            partial += '"'
+        # Drop a dangling key or separator the model never got to finish
+        partial = re.sub(r'(?:,\s*"[^"]*"\s*:?\s*|[,:]\s*)$', '', partial)
+        return partial + "".join(reversed(self._stack))
+
+def repair_json(text: str) -> str:
+    """Fix the mistakes small models make most: smart quotes and trailing commas"""
+    text = text.replace('“', '"').replace('”', '"')
+    return re.sub(r',\s*([}\]])', r'\1', text)
+
+def parse_job_match(text: str) -> Optional[dict]:
+    """Validated job match analysis from a completion, or None if none can be recovered"""
+    scanner = JsonObjectScanner()
+    scanner.feed(text)
+    candidate = scanner.object_text()
+    if candidate is None:
+        return None
+    try:
+        return JobMatchAnalysis.model_validate(json.loads(repair_json(candidate))).model_dump()
+    except (ValueError, ValidationError):
+        return None
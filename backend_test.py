@@ -5,6 +5,7 @@ import tempfile
 from reportlab.pdfgen import canvas
 import time
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 
 # Get the backend URL from the frontend .env file
 with open('/app/frontend/.env', 'r') as f:
@@ -528,7 +529,7 @@ class TestBackendAPI(unittest.TestCase):
         
         response = requests.get(f"{API_URL}/ai/user-content/{TEST_USER_AI_ID}")
         print(f"Response: {response.status_code}")
-        print(f"Response structure: {json.dumps(response.json().keys(), indent=2)}")
+        print(f"Response structure: {json.dumps(list(response.json().keys()), indent=2)}")
         
         self.assertEqual(response.status_code, 200)
         data = response.json()
@@ -541,24 +542,48 @@ class TestBackendAPI(unittest.TestCase):
         self.assertGreaterEqual(len(data["cover_letters"]), 1)
         self.assertGreaterEqual(len(data["job_matches"]), 1)
         
+        # The listing carries summaries only; bodies come from the detail endpoint
+        for kind in ("customized_resumes", "cover_letters", "job_matches"):
+            for item in data[kind]:
+                self.assertIn("_id", item)
+                self.assertIn("job_title", item)
+                self.assertIn("created_at", item)
+                self.assertNotIn("customized_resume", item)
+                self.assertNotIn("cover_letter", item)
+        for item in data["customized_resumes"] + data["cover_letters"]:
+            self.assertIn("company", item)
+        for item in data["job_matches"]:
+            self.assertIn("match_score", item["match_analysis"])
+            self.assertNotIn("strengths", item["match_analysis"])
+        
         # Check content quality in each category
-        if len(data["customized_resumes"]) > 0:
-            resume = data["customized_resumes"][0]
-            self.assertIn("customized_resume", resume)
-            self.assertGreater(len(resume["customized_resume"]), 200)
-            
-        if len(data["cover_letters"]) > 0:
-            letter = data["cover_letters"][0]
-            self.assertIn("cover_letter", letter)
-            self.assertGreater(len(letter["cover_letter"]), 200)
-            
-        if len(data["job_matches"]) > 0:
-            match = data["job_matches"][0]
-            self.assertIn("match_analysis", match)
-            self.assertIn("match_score", match["match_analysis"])
+        resume = self._get_ai_content_item("customized_resumes", data["customized_resumes"][0]["_id"])
+        self.assertGreater(len(resume["customized_resume"]), 200)
+        
+        letter = self._get_ai_content_item("cover_letters", data["cover_letters"][0]["_id"])
+        self.assertGreater(len(letter["cover_letter"]), 200)
+        
+        match = self._get_ai_content_item("job_matches", data["job_matches"][0]["_id"])
+        self.assertIn("match_analysis", match)
+        self.assertIn("match_score", match["match_analysis"])
+        
+        # Unknown ids and kinds are 404s
+        response = requests.get(f"{API_URL}/ai/user-content/{TEST_USER_AI_ID}/cover_letters/000000000000000000000000")
+        self.assertEqual(response.status_code, 404)
+        response = requests.get(f"{API_URL}/ai/user-content/{TEST_USER_AI_ID}/resumes/{data['cover_letters'][0]['_id']}")
+        self.assertEqual(response.status_code, 404)
         
         print("✅ User AI Content Retrieval API test passed")
     
+    def _get_ai_content_item(self, kind, content_id):
+        """One AI content item in full, via the detail endpoint"""
+        response = requests.get(f"{API_URL}/ai/user-content/{TEST_USER_AI_ID}/{kind}/{content_id}")
+        print(f"{kind} detail: {response.status_code}")
+        self.assertEqual(response.status_code, 200)
+        item = response.json()
+        self.assertEqual(item["user_id"], TEST_USER_AI_ID)
+        return item
+    
     def test_15_verify_google_gemma_integration(self):
         """Test that the system is using Google Gemma 2B model with retry logic"""
         print("\n=== Testing Google Gemma 2B Integration ===")
@@ -622,6 +647,237 @@ class TestBackendAPI(unittest.TestCase):
         self.assertGreaterEqual(response.status_code, 400)  # Should be 4xx error
         
         print("✅ Enhanced Error Handling test passed")
+    
+    def test_17_search_jobs(self):
+        """Test full-text job search ordered by relevance"""
+        print("\n=== Testing Job Search API ===")
+        response = requests.get(
+            f"{API_URL}/jobs/search",
+            params={"query": "react developer", "user_id": TEST_USER_ID}
+        )
+        print(f"Response: {response.status_code}")
+        print(f"Jobs count: {response.json()['count']}")
+        
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertIn("jobs", data)
+        self.assertGreater(data["count"], 0, "Sample jobs mentioning React should match")
+        
+        # Results must be ordered by descending relevance
+        scores = [job["relevance"] for job in data["jobs"]]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        
+        # Filters narrow the result set
+        response = requests.get(
+            f"{API_URL}/jobs/search",
+            params={"query": "developer", "location": "Remote"}
+        )
+        self.assertEqual(response.status_code, 200)
+        for job in response.json()["jobs"]:
+            self.assertIn("remote", job["location"].lower())
+        
+        print("✅ Job Search API test passed")
+    
+    def test_18_ranked_jobs(self):
+        """Test that jobs are returned ranked by relevance to the user"""
+        print("\n=== Testing Ranked Jobs API ===")
+        response = requests.get(f"{API_URL}/jobs", params={"user_id": TEST_USER_ID, "limit": 5})
+        print(f"Response: {response.status_code}")
+        
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertLessEqual(data["count"], 5)
+        
+        scores = [job["relevance"] for job in data["jobs"]]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        for job in data["jobs"]:
+            self.assertNotIn(job["company"], SAMPLE_PREFERENCES["excluded_companies"])
+        
+        print("✅ Ranked Jobs API test passed")
+
+    def test_19_generation_queue_backpressure(self):
+        """Test that a saturated generation queue answers 429 with Retry-After"""
+        print("\n=== Testing Generation Queue Backpressure ===")
+        health = requests.get(f"{API_URL}/health").json()
+        if not health["inference"]["backend"]:
+            self.skipTest("No inference backend configured, generations never queue")
+        if health["inference"]["circuit"]["state"] == "open":
+            self.skipTest("Inference circuit is open, generations fall back without queueing")
+        # One user sending more concurrent requests than there are slots plus their share of the queue
+        queue = health["inference"]["queue"]
+        burst = queue["max_concurrency"] + queue["max_queue_per_user"] + 16
+
+        def customize(i):
+            # Distinct titles so identical in-flight requests aren't coalesced into one
+            request = dict(SAMPLE_RESUME_CUSTOMIZATION_REQUEST, job_title=f"{SAMPLE_JOB_TITLE} {i}")
+            return requests.post(f"{API_URL}/ai/customize-resume", json=request)
+
+        with ThreadPoolExecutor(max_workers=burst) as executor:
+            responses = list(executor.map(customize, range(burst)))
+        statuses = [response.status_code for response in responses]
+        print(f"Statuses: {sorted(set(statuses))}, 429s: {statuses.count(429)}")
+
+        self.assertIn(429, statuses)
+        for response in responses:
+            self.assertIn(response.status_code, (200, 429))
+            if response.status_code == 429:
+                self.assertIn("Retry-After", response.headers)
+                self.assertGreaterEqual(int(response.headers["Retry-After"]), 1)
+                self.assertIn("detail", response.json())
+
+        print("✅ Generation Queue Backpressure test passed")
+
+    def test_20_inference_health(self):
+        """Test that the health check reports inference circuit and queue state"""
+        print("\n=== Testing Inference Health API ===")
+        response = requests.get(f"{API_URL}/health")
+        print(f"Response: {response.status_code} - {response.text}")
+
+        self.assertEqual(response.status_code, 200)
+        inference = response.json()["inference"]
+        self.assertIn("backend", inference)
+
+        circuit = inference["circuit"]
+        self.assertIn(circuit["state"], ("closed", "open", "half_open"))
+        self.assertGreaterEqual(circuit["failure_rate"], 0)
+        self.assertLessEqual(circuit["failure_rate"], 1)
+        self.assertGreaterEqual(circuit["trips"], 0)
+        self.assertIn("average_latency_ms", circuit)
+        if circuit["state"] == "open":
+            self.assertGreaterEqual(circuit["retry_in_seconds"], 0)
+        else:
+            self.assertEqual(circuit["retry_in_seconds"], 0)
+
+        queue = inference["queue"]
+        self.assertGreaterEqual(queue["max_concurrency"], 1)
+        self.assertGreaterEqual(queue["max_queue_per_user"], 1)
+        self.assertLessEqual(queue["running"], queue["max_concurrency"])
+        for priority in ("interactive", "batch", "background"):
+            self.assertIn(priority, queue["queued"])
+            self.assertIn(priority, queue["rejected"])
+
+        print("✅ Inference Health API test passed")
+
+    def test_21_upload_oversized_resume(self):
+        """Test that resumes over the upload limit are rejected with 413"""
+        print("\n=== Testing Oversized Resume Upload ===")
+        # Past the default 10 MB limit; rejected from Content-Length before it is parsed
+        oversized = b"%PDF-1.4\n" + b"0" * (11 * 1024 * 1024)
+        response = requests.post(
+            f"{API_URL}/resumes/upload",
+            files={'file': ('huge.pdf', oversized, 'application/pdf')},
+            data={'user_id': TEST_USER_ID}
+        )
+        print(f"Response: {response.status_code} - {response.text}")
+
+        self.assertEqual(response.status_code, 413)
+        self.assertIn("detail", response.json())
+
+        # The user's existing resume is untouched
+        response = requests.get(f"{API_URL}/resumes/{TEST_USER_ID}")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.json()["file_name"], "huge.pdf")
+
+        print("✅ Oversized Resume Upload test passed")
+
+    def test_22_jobs_cursor_pagination(self):
+        """Test that job and application listings page with next_cursor and reject malformed cursors"""
+        print("\n=== Testing Cursor Pagination ===")
+        # A user without preferences sees every sample job, so there is always a second page
+        user_id = "test_user_pagination"
+        response = requests.get(f"{API_URL}/jobs", params={"user_id": user_id, "limit": 2})
+        print(f"Response: {response.status_code}")
+
+        self.assertEqual(response.status_code, 200)
+        first = response.json()
+        self.assertIn("next_cursor", first)
+        self.assertEqual(first["count"], 2, "Sample jobs should fill more than one page")
+        self.assertIsNotNone(first["next_cursor"])
+
+        response = requests.get(
+            f"{API_URL}/jobs",
+            params={"user_id": user_id, "limit": 2, "cursor": first["next_cursor"]}
+        )
+        self.assertEqual(response.status_code, 200)
+        second = response.json()
+        self.assertGreater(second["count"], 0)
+
+        # The second page continues where the first left off, in the same order
+        first_ids = {job["job_id"] for job in first["jobs"]}
+        for job in second["jobs"]:
+            self.assertNotIn(job["job_id"], first_ids)
+        self.assertLessEqual(second["jobs"][0]["relevance"], first["jobs"][-1]["relevance"])
+
+        # Applications page the same way
+        response = requests.get(f"{API_URL}/applications/{TEST_USER_ID}", params={"limit": 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("next_cursor", response.json())
+
+        # A cursor that doesn't decode is the client's mistake, not a server error
+        listings = [
+            (f"{API_URL}/jobs", {"user_id": user_id}),
+            (f"{API_URL}/applications/{TEST_USER_ID}", {})
+        ]
+        for listing, params in listings:
+            response = requests.get(listing, params=dict(params, cursor="not-a-cursor"))
+            print(f"Malformed cursor: {response.status_code} - {response.text}")
+            self.assertEqual(response.status_code, 400)
+            self.assertIn("detail", response.json())
+
+        print("✅ Cursor Pagination test passed")
+
+    def test_23_get_application_detail(self):
+        """Test retrieving one application in full, and the 404 for an unknown one"""
+        print("\n=== Testing Application Detail API ===")
+        self.test_13_ai_apply_to_job()
+
+        # The listing is newest first and leaves the generated documents out
+        response = requests.get(f"{API_URL}/applications/{TEST_USER_ID}", params={"limit": 1})
+        self.assertEqual(response.status_code, 200)
+        summary = response.json()["applications"][0]
+        application_id = summary["application_id"]
+        self.assertNotIn("customized_resume", summary)
+        self.assertNotIn("cover_letter", summary)
+
+        response = requests.get(f"{API_URL}/applications/{TEST_USER_ID}/{application_id}")
+        print(f"Response: {response.status_code}")
+        self.assertEqual(response.status_code, 200)
+        application = response.json()
+        self.assertEqual(application["application_id"], application_id)
+        self.assertEqual(application["company"], SAMPLE_COMPANY)
+        self.assertGreater(len(application["customized_resume"]), 200)
+        self.assertGreater(len(application["cover_letter"]), 200)
+        self.assertIn("job_data", application)
+
+        # Unknown applications, and other users' applications, are 404s
+        response = requests.get(f"{API_URL}/applications/{TEST_USER_ID}/no-such-application")
+        print(f"Unknown application: {response.status_code} - {response.text}")
+        self.assertEqual(response.status_code, 404)
+        response = requests.get(f"{API_URL}/applications/{TEST_USER_AI_ID}/{application_id}")
+        self.assertEqual(response.status_code, 404)
+
+        print("✅ Application Detail API test passed")
+
+    def test_24_jobs_near_a_city(self):
+        """Test the location filter on job listings and its validation"""
+        print("\n=== Testing Jobs Near a City ===")
+        user_id = "test_user_pagination"
+        response = requests.get(f"{API_URL}/jobs", params={"user_id": user_id, "near": "Cracow", "radius_km": 25})
+        print(f"Response: {response.status_code}")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("jobs", response.json())
+
+        # A radius that isn't positive is rejected by validation instead of reaching the geo query
+        for radius in (-5, 0):
+            response = requests.get(f"{API_URL}/jobs", params={"user_id": user_id, "near": "Krakow", "radius_km": radius})
+            print(f"radius_km={radius}: {response.status_code}")
+            self.assertEqual(response.status_code, 422)
+
+        response = requests.get(f"{API_URL}/jobs", params={"user_id": user_id, "near": "Atlantis"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("detail", response.json())
+
+        print("✅ Jobs Near a City test passed")
 
 class TestWebAutomationAPI(unittest.TestCase):
     """Test suite for the Phase 3 Web Automation features"""
@@ -815,6 +1071,40 @@ class TestWebAutomationAPI(unittest.TestCase):
         
         print("✅ Fallback Job Creation test passed")
 
+    def test_07_discovered_jobs_pagination(self):
+        """Test paging through discovered jobs with next_cursor"""
+        print("\n=== Testing Discovered Jobs Pagination ===")
+
+        # Make sure there is more than one page to walk
+        self.test_01_discover_jobs()
+
+        seen = []
+        cursor = None
+        while True:
+            params = {"limit": 2}
+            if cursor:
+                params["cursor"] = cursor
+            response = requests.get(f"{API_URL}/discover/jobs/{TEST_USER_ID}", params=params)
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            self.assertLessEqual(data["count"], 2)
+            seen.extend(job["_id"] for job in data["jobs"])
+            cursor = data["next_cursor"]
+            if not cursor:
+                break
+        print(f"Jobs paged: {len(seen)}")
+
+        # Every discovered job appears exactly once, in the order a single large page lists them
+        self.assertEqual(len(seen), len(set(seen)))
+        response = requests.get(f"{API_URL}/discover/jobs/{TEST_USER_ID}", params={"limit": 100})
+        self.assertEqual(seen[:100], [job["_id"] for job in response.json()["jobs"]])
+
+        response = requests.get(f"{API_URL}/discover/jobs/{TEST_USER_ID}", params={"cursor": "not-a-cursor"})
+        print(f"Malformed cursor: {response.status_code} - {response.text}")
+        self.assertEqual(response.status_code, 400)
+
+        print("✅ Discovered Jobs Pagination test passed")
+
 if __name__ == "__main__":
     # Install reportlab if not already installed
     try:
@@ -0,0 +1,112 @@
+import asyncio
+import os
+import sys
+import unittest
+
+import mongomock
+
+# The pre-generator is a plain module in the backend package directory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+from draft_pregenerator import DraftPregenerator
+from llm_scheduler import SingleFlight
+
+JOBS = [{'job_id': f'job_{i}', 'title': 'Python Developer', 'company': f'Company {i}'} for i in range(4)]
+
+class TestDraftPregenerator(unittest.TestCase):
+    """Unit tests for background application drafts: budget, cancellation and claiming"""
+
+    def setUp(self):
+        self.db = mongomock.MongoClient().db
+        self.db.jobs.insert_many([dict(job) for job in JOBS])
+        self.generated = []
+
+    async def generate(self, user_id, job):
+        self.generated.append(job['job_id'])
+        await asyncio.sleep(0)
+        return {'customized_resume': f"resume for {job['job_id']}", 'cover_letter': 'letter'}
+
+    def pregenerator(self, generate=None, **options):
+        pregenerator = DraftPregenerator(
+            self.db, generate=generate or self.generate, is_idle=lambda: True, idle_poll_seconds=0.01, **options
+        )
+        pregenerator.ensure_indexes()
+        return pregenerator
+
+    async def finish(self, pregenerator, user_id):
+        task = pregenerator._tasks.get(user_id)
+        if task:
+            await asyncio.gather(task, return_exceptions=True)
+
+    def test_01_drafts_top_jobs_once(self):
+        pregenerator = self.pregenerator(top_n=3)
+
+        async def scenario():
+            pregenerator.schedule('u', 'resume-1', [job['job_id'] for job in JOBS])
+            await self.finish(pregenerator, 'u')
+            # Rescheduling with the same resume finds every draft current
+            pregenerator.schedule('u', 'resume-1', [job['job_id'] for job in JOBS])
+            await self.finish(pregenerator, 'u')
+
+        asyncio.run(scenario())
+        self.assertEqual(self.generated, ['job_0', 'job_1', 'job_2'])
+        self.assertEqual(self.db.application_drafts.count_documents({'user_id': 'u'}), 3)
+
+    def test_02_budget_survives_deleted_drafts(self):
+        pregenerator = self.pregenerator(top_n=4, daily_budget=3)
+        job_ids = [job['job_id'] for job in JOBS]
+
+        async def scenario():
+            pregenerator.schedule('u', 'resume-1', job_ids[:2])
+            await self.finish(pregenerator, 'u')
+            # A new resume deletes the old drafts, but not what they cost
+            pregenerator.schedule('u', 'resume-2', job_ids)
+            await self.finish(pregenerator, 'u')
+
+        asyncio.run(scenario())
+        self.assertEqual(self.generated, ['job_0', 'job_1', 'job_0'])
+        self.assertEqual(self.db.application_drafts.count_documents({'user_id': 'u'}), 1)
+        self.assertEqual(self.db.draft_budgets.find_one({'user_id': 'u'})['drafts'], 3)
+        self.assertEqual(pregenerator._remaining_budget('other'), 3)
+
+    def test_03_cancel_stops_the_shared_generation(self):
+        flight = SingleFlight()
+        inner = {}
+
+        async def generate(user_id, job):
+            async def slow():
+                inner['task'] = asyncio.current_task()
+                await asyncio.sleep(60)
+                return {'customized_resume': 'late', 'cover_letter': 'late'}
+            return await flight.run(job['job_id'], slow)
+
+        pregenerator = self.pregenerator(generate=generate)
+
+        async def scenario():
+            pregenerator.schedule('u', 'resume-1', ['job_0'])
+            await asyncio.sleep(0.05)
+            pregenerator.cancel('u')
+            await asyncio.sleep(0)
+            await asyncio.sleep(0)
+            return inner['task'].cancelled()
+
+        self.assertTrue(asyncio.run(scenario()))
+        self.assertIsNone(self.db.application_drafts.find_one({'user_id': 'u'}))
+        self.assertIsNone(self.db.draft_budgets.find_one({'user_id': 'u'}))
+
+    def test_04_take_claims_a_matching_draft_once(self):
+        pregenerator = self.pregenerator(top_n=1)
+
+        async def scenario():
+            pregenerator.schedule('u', 'resume-1', ['job_0'])
+            await self.finish(pregenerator, 'u')
+
+        asyncio.run(scenario())
+        job = self.db.jobs.find_one({'job_id': 'job_0'}, {'_id': 0})
+        self.assertIsNone(pregenerator.take('u', job, 'resume-2'))
+        self.assertIsNone(pregenerator.take('u', dict(job, title='Chef'), 'resume-1'))
+        self.assertEqual(pregenerator.take('u', job, 'resume-1')['customized_resume'], 'resume for job_0')
+        self.assertIsNone(pregenerator.take('u', job, 'resume-1'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+import mongomock
+import numpy as np
+
+# The index is a plain module in the backend package directory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+import embedding_index
+from embedding_index import EmbeddingIndex, EmbeddingStore, content_hash, quantize
+
+def unit_vectors(count, dimensions=16, seed=0):
+    vectors = np.random.default_rng(seed).normal(size=(count, dimensions)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+class FakeEmbedder:
+    """Deterministic embeddings from the text's hash, counting the texts it was asked to embed"""
+
+    model_name = 'fake-model'
+
+    def __init__(self):
+        self.embedded = []
+
+    def embed(self, texts):
+        self.embedded.extend(texts)
+        return np.vstack([unit_vectors(1, seed=int(content_hash(text)[:8], 16))[0] for text in texts])
+
+class TestEmbeddingIndex(unittest.TestCase):
+    """Unit tests for int8 quantization, exact and IVF search, and the embedding cache"""
+
+    def index_with(self, vectors, **options):
+        index = EmbeddingIndex(**options)
+        rows, scales = quantize(vectors)
+        job_ids = [f'job_{i}' for i in range(len(vectors))]
+        index.add(job_ids, [str(i) for i in range(len(vectors))], rows, scales)
+        return index
+
+    def test_01_quantize_round_trip(self):
+        vectors = unit_vectors(50)
+        rows, scales = quantize(vectors)
+        self.assertEqual(rows.dtype, np.int8)
+        self.assertTrue(np.allclose(rows.astype(np.float32) * scales[:, None], vectors, atol=0.01))
+        # All-zero rows don't divide by zero
+        rows, scales = quantize(np.zeros((1, 4), dtype=np.float32))
+        self.assertEqual(scales[0], 1.0)
+        self.assertFalse(rows.any())
+
+    def test_02_exact_search(self):
+        vectors = unit_vectors(100)
+        index = self.index_with(vectors)
+        results = index.search(vectors[42], limit=5)
+        self.assertEqual(results[0][0], 'job_42')
+        self.assertAlmostEqual(results[0][1], 1.0, places=2)
+        scores = [score for _, score in results]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertEqual(len(index.search(vectors[0], limit=500)), 100)
+        self.assertEqual(EmbeddingIndex().search(vectors[0]), [])
+
+    def test_03_replacing_a_job(self):
+        vectors = unit_vectors(10)
+        index = self.index_with(vectors)
+        rows, scales = quantize(vectors[:1])
+        index.add(['job_5'], ['new'], rows, scales)
+        self.assertEqual(len(index), 10)
+        self.assertEqual(index.content_hash_for('job_5'), 'new')
+        top_two = [job_id for job_id, _ in index.search(vectors[0], limit=2)]
+        self.assertEqual(sorted(top_two), ['job_0', 'job_5'])
+        self.assertNotIn('job_5', [job_id for job_id, _ in index.search(vectors[5], limit=1)])
+
+    def test_04_ivf_recall(self):
+        vectors = unit_vectors(600, dimensions=8)
+        index = self.index_with(vectors, nprobe=8, min_ivf_size=200)
+        self.assertIsNotNone(index._centroids)
+        hits = sum(index.search(vectors[i], limit=1)[0][0] == f'job_{i}' for i in range(0, 600, 10))
+        # Probing 8 of ~24 lists finds nearly every exact self-match
+        self.assertGreaterEqual(hits, 55)
+        # Vectors added after training are assigned to a list and found
+        rows, scales = quantize(unit_vectors(1, dimensions=8, seed=99))
+        index.add(['late'], ['late'], rows, scales)
+        self.assertEqual(index.search(unit_vectors(1, dimensions=8, seed=99)[0], limit=1)[0][0], 'late')
+
+    def test_05_store_embeds_each_text_once(self):
+        embedder = FakeEmbedder()
+        store = EmbeddingStore(mongomock.MongoClient().db, embedder=embedder)
+        jobs = [{'job_id': 'a', 'title': 'Python Developer'}, {'job_id': 'b', 'title': 'Chef'}]
+        with mock.patch.object(embedding_index, 'EMBEDDINGS_AVAILABLE', True):
+            self.assertEqual(store.index_jobs(jobs), 2)
+            # Unchanged jobs are skipped, a changed one is re-embedded
+            self.assertEqual(store.index_jobs(jobs), 0)
+            self.assertEqual(store.index_jobs([{'job_id': 'b', 'title': 'Head Chef'}]), 1)
+            self.assertEqual(len(embedder.embedded), 3)
+
+            # A fresh index loads vectors from the cache instead of embedding again
+            fresh = EmbeddingStore(store.cache.database, embedder=embedder)
+            self.assertEqual(fresh.index_jobs(jobs), 2)
+            self.assertEqual(len(embedder.embedded), 3)
+
+            resume = embedder.embed(["Python Developer\n\n"])[0]
+            self.assertEqual(fresh.index.search(resume, limit=1)[0][0], 'a')
+
+    def test_06_resume_embedding_is_reused(self):
+        embedder = FakeEmbedder()
+        store = EmbeddingStore(mongomock.MongoClient().db, embedder=embedder)
+        first = store.embed_resume('u', 'Python developer')
+        again = store.embed_resume('u', 'Python developer')
+        self.assertEqual(len(embedder.embedded), 1)
+        self.assertTrue(np.allclose(first, again, atol=1e-3))
+        store.embed_resume('u', 'Chef')
+        self.assertEqual(len(embedder.embedded), 2)
+
+if __name__ == '__main__':
+    unittest.main()
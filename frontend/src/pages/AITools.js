@@ -59,12 +59,6 @@ const AITools = ({ user }) => {
       const profileResponse = await userProfileAPI.get(user.user_id);
       setUserProfile(profileResponse.data);
       
-      // Pre-fill background info
-      setCoverLetterForm(prev => ({
-        ...prev,
-        userBackground: resumeResponse.data?.content?.substring(0, 500) || ''
-      }));
-      
     } catch (error) {
       console.error('Error fetching user data:', error);
     }
@@ -387,7 +381,7 @@ const AITools = ({ user }) => {
                   value={coverLetterForm.userBackground}
                   onChange={(e) => setCoverLetterForm({...coverLetterForm, userBackground: e.target.value})}
                   className="textarea-field h-20"
-                  placeholder="Brief summary of your experience..."
+                  placeholder="Leave blank to use your uploaded resume..."
                 />
               </div>
               
@@ -20,6 +20,9 @@ const Applications = ({ user }) => {
   const [loading, setLoading] = useState(true);
   const [filter, setFilter] = useState('all');
   const [viewingApplication, setViewingApplication] = useState(null);
+  const [statusCounts, setStatusCounts] = useState({ total: 0, by_status: {} });
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   const statusOptions = [
     { value: 'all', label: 'All Applications' },
@@ -32,13 +35,20 @@ const Applications = ({ user }) => {
 
   useEffect(() => {
     fetchApplications();
-  }, [user]);
+  }, [user, filter]);
+
+  const statusParam = () => (filter === 'all' ? null : filter);
 
   const fetchApplications = async () => {
     try {
       setLoading(true);
-      const response = await applicationsAPI.getApplications(user.user_id);
+      const [response, statsResponse] = await Promise.all([
+        applicationsAPI.getApplications(user.user_id, { status: statusParam() }),
+        applicationsAPI.getApplicationStats(user.user_id),
+      ]);
       setApplications(response.data.applications || []);
+      setNextCursor(response.data.next_cursor || null);
+      setStatusCounts(statsResponse.data);
     } catch (error) {
       console.error('Error fetching applications:', error);
       toast.error('Failed to load applications');
@@ -47,6 +57,20 @@ const Applications = ({ user }) => {
     }
   };
 
+  const loadMoreApplications = async () => {
+    try {
+      setLoadingMore(true);
+      const response = await applicationsAPI.getApplications(user.user_id, { status: statusParam(), cursor: nextCursor });
+      setApplications(prev => [...prev, ...(response.data.applications || [])]);
+      setNextCursor(response.data.next_cursor || null);
+    } catch (error) {
+      console.error('Error loading more applications:', error);
+      toast.error('Failed to load more applications');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const filteredApplications = applications.filter(app => 
     filter === 'all' || app.status === filter
   );
@@ -79,6 +103,17 @@ const Applications = ({ user }) => {
     }
   };
 
+  // List rows are summaries; fetch the full application (resume, cover letter) when opened
+  const viewApplication = async (application) => {
+    try {
+      const response = await applicationsAPI.getApplication(user.user_id, application.application_id);
+      setViewingApplication(response.data);
+    } catch (error) {
+      console.error('Error fetching application:', error);
+      toast.error('Failed to load application');
+    }
+  };
+
   const ApplicationCard = ({ application }) => (
     <div className="card hover:shadow-lg transition-shadow duration-200">
       <div className="flex items-start justify-between mb-4">
@@ -110,15 +145,15 @@ const Applications = ({ user }) => {
         </div>
         <div className="flex items-center space-x-2">
           <button
-            onClick={() => setViewingApplication(application)}
+            onClick={() => viewApplication(application)}
             className="btn-secondary flex items-center space-x-2 text-sm"
           >
             <Eye className="w-4 h-4" />
             <span>View</span>
           </button>
-          {application.source_url && (
+          {application.job_data?.source_url && (
             <button
-              onClick={() => window.open(application.source_url, '_blank')}
+              onClick={() => window.open(application.job_data.source_url, '_blank')}
               className="p-2 text-secondary-500 hover:text-secondary-700 rounded-lg hover:bg-secondary-100"
             >
               <ExternalLink className="w-4 h-4" />
@@ -216,10 +251,11 @@ const Applications = ({ user }) => {
   );
 
   const getStats = () => {
-    const total = applications.length;
-    const pending = applications.filter(app => app.status === 'pending').length;
-    const interviews = applications.filter(app => app.status === 'interview').length;
-    const accepted = applications.filter(app => app.status === 'accepted').length;
+    // Counts come from the server so they cover every application, not just the loaded pages
+    const total = statusCounts.total;
+    const pending = statusCounts.by_status.pending || 0;
+    const interviews = statusCounts.by_status.interview || 0;
+    const accepted = statusCounts.by_status.accepted || 0;
     const successRate = total > 0 ? Math.round((accepted / total) * 100) : 0;
 
     return { total, pending, interviews, accepted, successRate };
@@ -318,7 +354,7 @@ const Applications = ({ user }) => {
             ))}
           </select>
           <span className="text-sm text-secondary-600">
-            Showing {filteredApplications.length} of {applications.length} applications
+            Showing {filteredApplications.length} of {filter === 'all' ? statusCounts.total : (statusCounts.by_status[filter] || 0)} applications
           </span>
         </div>
       </div>
@@ -329,6 +365,13 @@ const Applications = ({ user }) => {
           {filteredApplications.map((application) => (
             <ApplicationCard key={application.application_id} application={application} />
           ))}
+          {nextCursor && (
+            <div className="md:col-span-2 lg:col-span-3 flex justify-center">
+              <button onClick={loadMoreApplications} disabled={loadingMore} className="btn-secondary">
+                {loadingMore ? 'Loading...' : 'Load more applications'}
+              </button>
+            </div>
+          )}
         </div>
       ) : (
         <div className="card text-center py-12">
@@ -53,8 +53,12 @@ const Dashboard = ({ user }) => {
     try {
       setLoading(true);
       
-      // Fetch applications
-      const applicationsResponse = await applicationsAPI.getApplications(user.user_id);
+      // Fetch application counts and the most recent applications
+      const [statsResponse, applicationsResponse] = await Promise.all([
+        applicationsAPI.getApplicationStats(user.user_id),
+        applicationsAPI.getApplications(user.user_id, { limit: 5 }),
+      ]);
+      const applicationCounts = statsResponse.data;
       const applications = applicationsResponse.data.applications || [];
       
       // Check setup progress
@@ -82,10 +86,10 @@ const Dashboard = ({ user }) => {
       setSetupProgress(setupChecks);
       
       // Calculate stats
-      const totalApplications = applications.length;
-      const pendingApplications = applications.filter(app => app.status === 'pending').length;
-      const interviewsScheduled = applications.filter(app => app.status === 'interview').length;
-      const acceptedApplications = applications.filter(app => app.status === 'accepted').length;
+      const totalApplications = applicationCounts.total;
+      const pendingApplications = applicationCounts.by_status.pending || 0;
+      const interviewsScheduled = applicationCounts.by_status.interview || 0;
+      const acceptedApplications = applicationCounts.by_status.accepted || 0;
       const successRate = totalApplications > 0 ? Math.round((acceptedApplications / totalApplications) * 100) : 0;
       
       setStats({
@@ -95,12 +99,8 @@ const Dashboard = ({ user }) => {
         successRate,
       });
       
-      // Get recent applications (last 5)
-      const sortedApplications = applications
-        .sort((a, b) => new Date(b.applied_at) - new Date(a.applied_at))
-        .slice(0, 5);
-      
-      setRecentApplications(sortedApplications);
+      // The API already returns applications newest first
+      setRecentApplications(applications);
       
     } catch (error) {
       console.error('Error fetching dashboard data:', error);
@@ -31,6 +31,8 @@ const JobDiscovery = ({ user }) => {
   });
   const [applying, setApplying] = useState({});
   const [filterSource, setFilterSource] = useState('all');
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     fetchAvailableSources();
@@ -53,6 +55,7 @@ const JobDiscovery = ({ user }) => {
       const source = filterSource === 'all' ? null : filterSource;
       const response = await jobDiscoveryAPI.getDiscoveredJobs(user.user_id, source);
       setDiscoveredJobs(response.data.jobs || []);
+      setNextCursor(response.data.next_cursor || null);
     } catch (error) {
       console.error('Error fetching discovered jobs:', error);
       toast.error('Failed to load discovered jobs');
@@ -61,6 +64,21 @@ const JobDiscovery = ({ user }) => {
     }
   };
 
+  const loadMoreDiscoveredJobs = async () => {
+    try {
+      setLoadingMore(true);
+      const source = filterSource === 'all' ? null : filterSource;
+      const response = await jobDiscoveryAPI.getDiscoveredJobs(user.user_id, source, 50, nextCursor);
+      setDiscoveredJobs(prev => [...prev, ...(response.data.jobs || [])]);
+      setNextCursor(response.data.next_cursor || null);
+    } catch (error) {
+      console.error('Error loading more discovered jobs:', error);
+      toast.error('Failed to load more jobs');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const loadUserPreferences = async () => {
     try {
       const response = await preferencesAPI.get(user.user_id);
@@ -423,6 +441,13 @@ const JobDiscovery = ({ user }) => {
           {discoveredJobs.map((job) => (
             <JobCard key={job.job_id || job._id} job={job} />
           ))}
+          {nextCursor && (
+            <div className="md:col-span-2 flex justify-center">
+              <button onClick={loadMoreDiscoveredJobs} disabled={loadingMore} className="btn-secondary">
+                {loadingMore ? 'Loading...' : 'Load more jobs'}
+              </button>
+            </div>
+          )}
         </div>
       ) : (
         <div className="card text-center py-12">
@@ -25,6 +25,7 @@ const JobPreferences = ({ user }) => {
       max_salary: '',
       experience_level: '',
       job_type: '',
+      pregenerate_applications: false,
     },
   });
 
@@ -67,6 +68,7 @@ const JobPreferences = ({ user }) => {
         setValue('max_salary', preferences.max_salary || '');
         setValue('experience_level', preferences.experience_level || '');
         setValue('job_type', preferences.job_type || '');
+        setValue('pregenerate_applications', !!preferences.pregenerate_applications);
       }
     } catch (error) {
       if (error.response?.status !== 404) {
@@ -93,6 +95,7 @@ const JobPreferences = ({ user }) => {
         max_salary: data.max_salary ? parseInt(data.max_salary) : null,
         experience_level: data.experience_level,
         job_type: data.job_type,
+        pregenerate_applications: data.pregenerate_applications,
       };
 
       await preferencesAPI.save(cleanData);
@@ -246,7 +249,7 @@ const JobPreferences = ({ user }) => {
             <div className="flex items-center space-x-2">
               <DollarSign className="w-5 h-5 text-secondary-600" />
               <label className="block text-sm font-medium text-secondary-700">
-                Minimum Salary (Annual)
+                Minimum Salary (Annual, USD)
               </label>
             </div>
             <input
@@ -266,7 +269,7 @@ const JobPreferences = ({ user }) => {
             <div className="flex items-center space-x-2">
               <DollarSign className="w-5 h-5 text-secondary-600" />
               <label className="block text-sm font-medium text-secondary-700">
-                Maximum Salary (Annual)
+                Maximum Salary (Annual, USD)
               </label>
             </div>
             <input
@@ -312,6 +315,18 @@ const JobPreferences = ({ user }) => {
           />
         </div>
 
+        {/* Background drafts */}
+        <div className="mt-8">
+          <label className="flex items-center space-x-3 text-sm text-secondary-700">
+            <input
+              type="checkbox"
+              {...register('pregenerate_applications')}
+              className="h-4 w-4 rounded border-secondary-300"
+            />
+            <span>Prepare tailored resumes and cover letters for my top matches in the background</span>
+          </label>
+        </div>
+
         <div className="flex items-center justify-between pt-6 mt-8 border-t border-secondary-200">
           <p className="text-sm text-secondary-600">
             {isDirty ? 'You have unsaved changes' : 'All changes saved'}
@@ -20,6 +20,8 @@ const JobSearch = ({ user }) => {
   const [searchQuery, setSearchQuery] = useState('');
   const [filterOpen, setFilterOpen] = useState(false);
   const [applying, setApplying] = useState({});
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     fetchJobs();
@@ -30,6 +32,7 @@ const JobSearch = ({ user }) => {
       setLoading(true);
       const response = await jobsAPI.getJobs(user.user_id);
       setJobs(response.data.jobs || []);
+      setNextCursor(response.data.next_cursor || null);
     } catch (error) {
       console.error('Error fetching jobs:', error);
       toast.error('Failed to load jobs');
@@ -38,6 +41,20 @@ const JobSearch = ({ user }) => {
     }
   };
 
+  const loadMoreJobs = async () => {
+    try {
+      setLoadingMore(true);
+      const response = await jobsAPI.getJobs(user.user_id, nextCursor);
+      setJobs(prev => [...prev, ...(response.data.jobs || [])]);
+      setNextCursor(response.data.next_cursor || null);
+    } catch (error) {
+      console.error('Error loading more jobs:', error);
+      toast.error('Failed to load more jobs');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleSearch = async (e) => {
     e.preventDefault();
     if (!searchQuery.trim()) {
@@ -49,6 +66,7 @@ const JobSearch = ({ user }) => {
       setLoading(true);
       const response = await jobsAPI.searchJobs(searchQuery, user.user_id);
       setJobs(response.data.jobs || []);
+      setNextCursor(null);
     } catch (error) {
       console.error('Error searching jobs:', error);
       toast.error('Failed to search jobs');
@@ -252,6 +270,13 @@ const JobSearch = ({ user }) => {
           {jobs.map((job) => (
             <JobCard key={job.job_id} job={job} />
           ))}
+          {nextCursor && (
+            <div className="md:col-span-2 flex justify-center">
+              <button onClick={loadMoreJobs} disabled={loadingMore} className="btn-secondary">
+                {loadingMore ? 'Loading...' : 'Load more jobs'}
+              </button>
+            </div>
+          )}
         </div>
       ) : (
         <div className="card text-center py-12">
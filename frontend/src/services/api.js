@@ -34,13 +34,16 @@ export const preferencesAPI = {
 
 // Jobs API
 export const jobsAPI = {
-  getJobs: (userId) => api.get(`/api/jobs?user_id=${userId}`),
-  searchJobs: (query, userId) => api.get(`/api/jobs/search?query=${query}&user_id=${userId}`),
+  getJobs: (userId, cursor = null) => api.get('/api/jobs', { params: { user_id: userId, cursor: cursor || undefined } }),
+  searchJobs: (query, userId) => api.get('/api/jobs/search', { params: { query, user_id: userId } }),
 };
 
 // Applications API
 export const applicationsAPI = {
-  getApplications: (userId) => api.get(`/api/applications/${userId}`),
+  getApplications: (userId, { status = null, limit = 50, cursor = null } = {}) =>
+    api.get(`/api/applications/${userId}`, { params: { status: status || undefined, limit, cursor: cursor || undefined } }),
+  getApplicationStats: (userId) => api.get(`/api/applications/${userId}/stats`),
+  getApplication: (userId, applicationId) => api.get(`/api/applications/${userId}/${applicationId}`),
   createApplication: (applicationData) => api.post('/api/applications', applicationData),
   updateApplication: (applicationId, updateData) => api.put(`/api/applications/${applicationId}`, updateData),
 };
@@ -52,14 +55,16 @@ export const aiAPI = {
   analyzeJobMatch: (data) => api.post('/api/ai/analyze-job-match', data),
   applyToJob: (userId, jobData) => api.post(`/api/ai/apply-to-job?user_id=${userId}`, jobData),
   getUserAIContent: (userId) => api.get(`/api/ai/user-content/${userId}`),
+  getUserAIContentItem: (userId, kind, contentId) => api.get(`/api/ai/user-content/${userId}/${kind}/${contentId}`),
 };
 
 // Job Discovery API (Phase 3: Web Automation)
 export const jobDiscoveryAPI = {
   discoverJobs: (data) => api.post('/api/discover/jobs', data),
-  getDiscoveredJobs: (userId, source = null, limit = 50) => {
+  getDiscoveredJobs: (userId, source = null, limit = 50, cursor = null) => {
     const params = new URLSearchParams({ limit: limit.toString() });
     if (source) params.append('source', source);
+    if (cursor) params.append('cursor', cursor);
     return api.get(`/api/discover/jobs/${userId}?${params}`);
   },
   getAvailableSources: () => api.get('/api/discover/sources'),
@@ -0,0 +1,70 @@
+import os
+import sys
+import unittest
+
+# The extraction is a plain module in the backend package directory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+from job_fields import JOB_FIELDS_VERSION, JobFieldExtractor, extract_job_fields, listed_skills, work_mode
+from skill_extractor import default_extractor
+
+SCRAPED = {
+    'job_id': 'a', 'title': 'Backend Developer', 'location': 'Berlin',
+    'description': 'We use Kafka and Kubernetes.', 'skills': ['Python', 'Django', 'Our in-house ORM']
+}
+
+class TestJobFields(unittest.TestCase):
+    """Unit tests for structured fields extracted from jobs at ingestion"""
+
+    def test_01_listed_skills_are_kept_apart_from_derived_ones(self):
+        fields = extract_job_fields(SCRAPED)
+        self.assertEqual(fields['listed_skills'], ['Python', 'Django', 'Our in-house ORM'])
+        self.assertEqual(fields['skills'], ['python', 'django', 'our in-house orm'])
+        self.assertEqual(fields['fields_version'], JOB_FIELDS_VERSION)
+        self.assertNotIn('seniority', fields)
+        self.assertNotIn('min_years', fields)
+
+    def test_02_backfill_starts_from_the_source_list(self):
+        stored = dict(SCRAPED, **extract_job_fields(SCRAPED))
+        # As if the taxonomy learned a new synonym and a backfill re-extracts the stored document
+        stored['skills'] = ['stale']
+        again = extract_job_fields(stored)
+        self.assertEqual(again['skills'], ['python', 'django', 'our in-house orm'])
+        self.assertEqual(again['listed_skills'], SCRAPED['skills'])
+
+    def test_03_jobs_without_a_source_list_are_extracted_from_text(self):
+        scraped = {key: value for key, value in SCRAPED.items() if key != 'skills'}
+        fields = extract_job_fields(scraped)
+        self.assertEqual(fields['listed_skills'], [])
+        self.assertEqual(fields['skills'], ['apache kafka', 'kubernetes'])
+        # Re-extracting uses the text again rather than the derived skills
+        stored = dict(scraped, **dict(fields, skills=['stale']))
+        self.assertEqual(extract_job_fields(stored)['skills'], ['apache kafka', 'kubernetes'])
+
+    def test_04_jobs_extracted_by_older_versions(self):
+        # Their 'skills' were derived and the source list was lost, so the text is used
+        legacy = dict(SCRAPED, skills=['stale'], fields_version=5, seniority=3)
+        self.assertEqual(listed_skills(legacy), [])
+        self.assertEqual(extract_job_fields(legacy)['skills'], ['apache kafka', 'kubernetes'])
+        # Jobs from before field extraction still have the source's list
+        self.assertEqual(listed_skills(dict(SCRAPED, skills='Python')), ['Python'])
+
+    def test_05_version_follows_the_taxonomy(self):
+        self.assertTrue(JOB_FIELDS_VERSION.endswith(f"skills-{default_extractor().version}"))
+
+    def test_06_work_mode(self):
+        self.assertEqual(work_mode({'location': 'Remote'}), 'remote')
+        self.assertEqual(work_mode({'location': 'Remote / Office Berlin'}), 'hybrid')
+        self.assertEqual(work_mode({'location': 'Berlin', 'description': 'Hybrid, 2 days a week'}), 'hybrid')
+        self.assertEqual(work_mode({'location': 'Berlin'}), 'onsite')
+
+    def test_07_extract_many_keeps_order(self):
+        extractor = JobFieldExtractor(workers=1)
+        jobs = [dict(SCRAPED, job_id=str(i), skills=[f'Skill {i}']) for i in range(3)]
+        self.assertEqual([fields['listed_skills'] for fields in extractor.extract_many(jobs)], [
+            ['Skill 0'], ['Skill 1'], ['Skill 2']
+        ])
+        self.assertEqual(extractor.stats()['jobs_extracted'], 3)
+
+if __name__ == '__main__':
+    unittest.main()
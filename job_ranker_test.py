@@ -0,0 +1,106 @@
+import os
+import sys
+import unittest
+
+# The ranker is a plain module in the backend package directory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+from job_ranker import JobRanker
+
+PYTHON_DEVELOPER = {'job_titles': ['Python Developer'], 'keywords': ['django'], 'locations': ['Berlin']}
+
+def job(job_id, title, skills=(), location='', company='', salary_min=None, salary_max=None):
+    return {
+        'job_id': job_id, 'title': title, 'skills': list(skills), 'location': location,
+        'company': company, 'salary_min': salary_min, 'salary_max': salary_max
+    }
+
+class TestJobRanker(unittest.TestCase):
+    """Unit tests for CSR relevance ranking, salary fit and incremental updates"""
+
+    def setUp(self):
+        self.ranker = JobRanker()
+        self.ranker.build([
+            job('exact', 'Python Developer', ['Python', 'Django'], 'Berlin', 'Acme'),
+            job('title', 'Python Developer', ['Flask'], 'Munich', 'Globex'),
+            job('skills', 'Backend Engineer', ['Django'], 'Berlin', 'Initech'),
+            job('chef', 'Chef', ['Cooking'], 'Rome', 'Trattoria')
+        ])
+
+    def ids(self, ranked):
+        return [job_id for job_id, _ in ranked]
+
+    def test_01_rank_order(self):
+        ranked = self.ranker.rank(PYTHON_DEVELOPER)
+        self.assertEqual(self.ids(ranked)[:3], ['exact', 'title', 'skills'])
+        self.assertEqual(self.ids(ranked)[-1], 'chef')
+        scores = [score for _, score in ranked]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
+    def test_02_limit_and_candidates(self):
+        self.assertEqual(self.ids(self.ranker.rank(PYTHON_DEVELOPER, limit=1)), ['exact'])
+        self.assertEqual(self.ranker.rank(PYTHON_DEVELOPER, limit=0), [])
+        ranked = self.ranker.rank(PYTHON_DEVELOPER, candidate_ids=['chef', 'skills', 'missing'])
+        self.assertEqual(self.ids(ranked), ['skills', 'chef'])
+        # Candidate scores match the full-catalog scores
+        full = dict(self.ranker.rank(PYTHON_DEVELOPER))
+        for job_id, score in ranked:
+            self.assertAlmostEqual(score, full[job_id], places=3)
+
+    def test_03_resume_skills(self):
+        ranked = self.ranker.rank({}, resume_skills=['Cooking'])
+        self.assertEqual(self.ids(ranked)[0], 'chef')
+
+    def test_04_excluded_companies(self):
+        preferences = dict(PYTHON_DEVELOPER, excluded_companies=['ACME', 'Unknown Ltd'])
+        self.assertNotIn('exact', self.ids(self.ranker.rank(preferences)))
+        self.assertEqual(len(self.ranker.rank(preferences)), 3)
+
+    def test_05_salary_fit(self):
+        ranker = JobRanker()
+        ranker.build([
+            job('paid', 'Engineer', salary_min=100000, salary_max=140000),
+            job('short', 'Engineer', salary_min=60000, salary_max=90000),
+            job('unknown', 'Engineer'),
+            job('over', 'Engineer', salary_min=250000, salary_max=300000)
+        ])
+        ranked = ranker.rank({'job_titles': ['Engineer'], 'min_salary': 120000, 'max_salary': 200000})
+        # Overlap scores 1.0, a gap decays with its size (200k/250k, 90k/120k), unknown scores 0.5
+        self.assertEqual(self.ids(ranked), ['paid', 'over', 'short', 'unknown'])
+        # Without a wanted range, salary doesn't separate jobs
+        scores = {score for _, score in ranker.rank({'job_titles': ['Engineer']})}
+        self.assertEqual(len(scores), 1)
+
+    def test_06_add_and_remove(self):
+        self.ranker.add_jobs([job('new', 'Senior Python Developer', ['Python', 'Django'], 'Berlin')])
+        self.assertIn('new', self.ids(self.ranker.rank(PYTHON_DEVELOPER, limit=2)))
+        # Re-adding replaces the old version
+        self.ranker.add_jobs([job('exact', 'Chef', ['Cooking'], 'Rome')])
+        self.assertEqual(self.ids(self.ranker.rank({}, resume_skills=['Cooking']))[:2], ['chef', 'exact'])
+        self.ranker.remove_job('title')
+        self.assertNotIn('title', self.ids(self.ranker.rank(PYTHON_DEVELOPER)))
+        self.assertEqual(len(self.ranker), 4)
+
+    def test_07_build_keeps_jobs_ingested_before_it(self):
+        ranker = JobRanker()
+        # Ingested while the catalog snapshot was being read and the search index built
+        ranker.add_jobs([job('b', 'Python Developer')])
+        ranker.rank(PYTHON_DEVELOPER)
+        ranker.add_jobs([job('c', 'Python Developer')])
+        ranker.add_jobs([job('a', 'Python Developer', ['Django'])])
+        ranker.build([job('a', 'Python Developer'), job('d', 'Python Developer')])
+        self.assertEqual(sorted(self.ids(ranker.rank(PYTHON_DEVELOPER))), ['a', 'b', 'c', 'd'])
+        # The newer ingested version of 'a' wins over the snapshot's
+        self.assertEqual(self.ids(ranker.rank({}, resume_skills=['Django']))[0], 'a')
+
+    def test_08_build_replays_removals(self):
+        ranker = JobRanker()
+        ranker.remove_job('a')
+        ranker.build([job('a', 'Python Developer'), job('b', 'Python Developer')])
+        self.assertEqual(self.ids(ranker.rank(PYTHON_DEVELOPER)), ['b'])
+        # Once built, later builds start from their snapshot alone
+        ranker.build([job('a', 'Python Developer')])
+        self.assertEqual(self.ids(ranker.rank(PYTHON_DEVELOPER)), ['a'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+import asyncio
+import os
+import sys
+import threading
+import unittest
+from unittest import mock
+
+# The backends are a plain module in the backend package directory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+from llm_backends import HostedGemmaBackend, LocalTransformersBackend, create_llm_backend
+
+SCHEMA = {'type': 'object'}
+
+class FakeInferenceClient:
+    """Stands in for InferenceClient, streaming a fixed completion token by token"""
+
+    def __init__(self, tokens, accepts_grammar=True):
+        self.tokens = tokens
+        self.accepts_grammar = accepts_grammar
+        self.calls = []
+        self.streamed = 0
+
+    def text_generation(self, prompt, max_new_tokens, temperature, do_sample, stream=False,
+                        return_full_text=True, grammar=None):
+        self.calls.append({'stream': stream, 'grammar': grammar})
+        if grammar is not None and not self.accepts_grammar:
+            raise ValueError("grammar is not supported by this endpoint")
+        if not stream:
+            return "".join(self.tokens)
+        return self._stream()
+
+    def _stream(self):
+        for token in self.tokens:
+            self.streamed += 1
+            yield token
+
+class GatedLocalBackend(LocalTransformersBackend):
+    """Local backend without a model: prompts are echoed and each batch is recorded.
+
+    The worker blocks in its eager load until ``ready`` is set, so a test can
+    queue several requests before the first batch is drawn.
+    """
+
+    def __init__(self, fail=False, **options):
+        self.ready = threading.Event()
+        self.batches = []
+        self.fail = fail
+        super().__init__(model_name='fake', **options)
+
+    def _load(self):
+        self.ready.wait()
+
+    def _prompt_tokens(self, prompt):
+        return len(prompt.split())
+
+    def _generate(self, prompts, max_tokens, temperature, json_output=False):
+        self.batches.append(list(prompts))
+        if self.fail:
+            raise RuntimeError("out of memory")
+        return [f"{prompt}!" for prompt in prompts]
+
+async def generate_together(backend, calls):
+    """Queue every call before the worker starts drawing batches"""
+    tasks = [asyncio.ensure_future(backend.generate_batch(*call)) for call in calls]
+    await asyncio.sleep(0)
+    backend.ready.set()
+    return await asyncio.gather(*tasks, return_exceptions=True)
+
+class TestLLMBackends(unittest.TestCase):
+    """Unit tests for hosted JSON streaming, local request batching and backend selection"""
+
+    def test_01_hosted_json_stops_when_the_object_closes(self):
+        client = FakeInferenceClient(['Sure: ', '{"match_score": ', '80}', ' Anything else?', ' More'])
+        backend = HostedGemmaBackend(client)
+        self.assertTrue(backend.use_grammar)
+        text = asyncio.run(backend.generate('prompt', 64, 0.7, json_schema=SCHEMA))
+        self.assertEqual(text, 'Sure: {"match_score": 80}')
+        self.assertEqual(client.streamed, 3)
+        self.assertEqual(client.calls[0]['grammar'], {'type': 'json', 'value': SCHEMA})
+
+    def test_02_hosted_falls_back_when_grammar_is_rejected(self):
+        client = FakeInferenceClient(['{"a": 1}'], accepts_grammar=False)
+        backend = HostedGemmaBackend(client)
+        self.assertEqual(asyncio.run(backend.generate('prompt', 64, 0.7, json_schema=SCHEMA)), '{"a": 1}')
+        self.assertFalse(backend.use_grammar)
+        # Later requests don't try the grammar again
+        asyncio.run(backend.generate('prompt', 64, 0.7, json_schema=SCHEMA))
+        self.assertEqual([call['grammar'] for call in client.calls], [{'type': 'json', 'value': SCHEMA}, None, None])
+
+    def test_03_hosted_plain_text(self):
+        client = FakeInferenceClient(['Dear ', 'hiring manager'])
+        backend = HostedGemmaBackend(client)
+        self.assertEqual(asyncio.run(backend.generate('prompt', 64, 0.7)), 'Dear hiring manager')
+        self.assertFalse(client.calls[0]['stream'])
+        results = asyncio.run(backend.generate_batch(['a', 'b'], 64, 0.7))
+        self.assertEqual(results, ['Dear hiring manager'] * 2)
+
+    def test_04_local_batches_compatible_requests(self):
+        backend = GatedLocalBackend()
+        results = asyncio.run(generate_together(backend, [
+            (['one'], 16, 0.7),
+            (['two', 'three'], 16, 0.7),
+            (['json'], 16, 0.7, SCHEMA),
+            (['four'], 16, 0.7)
+        ]))
+        self.assertEqual(results, [['one!'], ['two!', 'three!'], ['json!'], ['four!']])
+        # JSON requests stop on their own criterion, so they never share a batch with text ones
+        self.assertEqual(backend.batches, [['one', 'two', 'three', 'four'], ['json']])
+
+    def test_05_local_respects_the_kv_budget_and_batch_size(self):
+        # Each prompt costs one token plus 16 new ones
+        backend = GatedLocalBackend(kv_token_budget=40, max_batch_size=8)
+        results = asyncio.run(generate_together(backend, [(['a'], 16, 0.7), (['b'], 16, 0.7), (['c'], 16, 0.7)]))
+        self.assertEqual(results, [['a!'], ['b!'], ['c!']])
+        self.assertEqual(backend.batches, [['a', 'b'], ['c']])
+
+        backend = GatedLocalBackend(max_batch_size=2)
+        asyncio.run(generate_together(backend, [(['a'], 16, 0.7), (['b', 'c'], 16, 0.7), (['d'], 16, 0.7)]))
+        self.assertEqual(backend.batches, [['a', 'd'], ['b', 'c']])
+
+    def test_06_local_failure_reaches_every_request_in_the_batch(self):
+        backend = GatedLocalBackend(fail=True)
+        results = asyncio.run(generate_together(backend, [(['a'], 16, 0.7), (['b'], 16, 0.7)]))
+        self.assertEqual(len(backend.batches), 1)
+        for result in results:
+            self.assertIsInstance(result, RuntimeError)
+
+    def test_07_backend_selection(self):
+        client = FakeInferenceClient([])
+        with mock.patch.dict(os.environ, {}, clear=False):
+            os.environ.pop('LLM_BACKEND', None)
+            self.assertIsInstance(create_llm_backend(client), HostedGemmaBackend)
+            self.assertIsNone(create_llm_backend(None))
+        # Unusable local backends fall back to hosted inference
+        for name in ('local', 'gguf'):
+            with mock.patch.dict(os.environ, {'LLM_BACKEND': name}):
+                with mock.patch('llm_backends.TRANSFORMERS_AVAILABLE', False), \
+                        mock.patch('llm_backends.LLAMA_CPP_AVAILABLE', False):
+                    self.assertIsInstance(create_llm_backend(client), HostedGemmaBackend)
+                    self.assertIsNone(create_llm_backend(None))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,363 @@
+import asyncio
+import os
+import sys
+import unittest
+from unittest import mock
+
+# The scheduler is a plain module in the backend package directory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+from llm_backends import LLMBackend
+from llm_scheduler import (
+    BACKGROUND, BATCH, INTERACTIVE, CircuitBreaker, MicroBatcher, PriorityScheduler, QueueFullError, SingleFlight
+)
+
+class FakeBackend(LLMBackend):
+    """Echoes prompts and records every backend call it receives"""
+
+    def __init__(self, supports_batching=True, error=None):
+        self.supports_batching = supports_batching
+        self.error = error
+        self.batches = []
+        self.single_calls = []
+
+    async def generate(self, prompt, max_tokens, temperature, json_schema=None):
+        self.single_calls.append(prompt)
+        return f"{prompt}@{max_tokens}"
+
+    async def generate_batch(self, prompts, max_tokens, temperature, json_schema=None):
+        self.batches.append((list(prompts), max_tokens, json_schema))
+        if self.error:
+            raise self.error
+        return [f"{prompt}@{max_tokens}" for prompt in prompts]
+
+class TestMicroBatcher(unittest.TestCase):
+    """Unit tests for grouping concurrent generations into backend batches"""
+
+    def test_01_batches_by_settings(self):
+        backend = FakeBackend()
+        batcher = MicroBatcher(backend, max_batch_size=8, max_wait_ms=10)
+
+        async def scenario():
+            return await asyncio.gather(
+                batcher.generate('a', 16, 0.7),
+                batcher.generate('b', 32, 0.7),
+                batcher.generate('c', 16, 0.7),
+                batcher.generate('d', 16, 0.7, json_schema={'type': 'object'})
+            )
+
+        self.assertEqual(asyncio.run(scenario()), ['a@16', 'b@32', 'c@16', 'd@16'])
+        self.assertEqual(sorted((prompts, tokens) for prompts, tokens, _ in backend.batches), [
+            (['a', 'c'], 16), (['b'], 32), (['d'], 16)
+        ])
+        self.assertEqual([schema for prompts, _, schema in backend.batches if prompts == ['d']], [{'type': 'object'}])
+        self.assertEqual(batcher.stats()['batches_dispatched'], 3)
+        self.assertEqual(batcher.stats()['requests_batched'], 4)
+
+    def test_02_full_batch_dispatches_early(self):
+        backend = FakeBackend()
+        # The window alone would hold the batch for a minute
+        batcher = MicroBatcher(backend, max_batch_size=2, max_wait_ms=60000)
+
+        async def scenario():
+            return await asyncio.wait_for(asyncio.gather(
+                batcher.generate('a', 16, 0.7), batcher.generate('b', 16, 0.7)
+            ), timeout=1)
+
+        self.assertEqual(asyncio.run(scenario()), ['a@16', 'b@16'])
+        self.assertEqual(backend.batches, [(['a', 'b'], 16, None)])
+        self.assertEqual(batcher._timers, {})
+
+    def test_03_batch_failure_reaches_every_caller(self):
+        backend = FakeBackend(error=RuntimeError("backend down"))
+        batcher = MicroBatcher(backend, max_batch_size=8, max_wait_ms=10)
+
+        async def scenario():
+            return await asyncio.gather(
+                batcher.generate('a', 16, 0.7), batcher.generate('b', 16, 0.7), return_exceptions=True
+            )
+
+        results = asyncio.run(scenario())
+        self.assertEqual(len(backend.batches), 1)
+        self.assertEqual([str(result) for result in results], ["backend down"] * 2)
+
+    def test_04_backends_without_batching_are_called_directly(self):
+        backend = FakeBackend(supports_batching=False)
+        batcher = MicroBatcher(backend, max_batch_size=8, max_wait_ms=60000)
+        self.assertFalse(batcher.enabled)
+        self.assertEqual(asyncio.run(batcher.generate('a', 16, 0.7)), 'a@16')
+        self.assertEqual((backend.single_calls, backend.batches), (['a'], []))
+        self.assertFalse(MicroBatcher(FakeBackend(), max_batch_size=1).enabled)
+
+class TestSingleFlight(unittest.TestCase):
+    """Unit tests for sharing one generation between identical concurrent calls"""
+
+    def test_01_identical_calls_share_one_task(self):
+        flight = SingleFlight()
+        calls = []
+
+        async def generate(text):
+            calls.append(text)
+            await asyncio.sleep(0.01)
+            return text.upper()
+
+        async def scenario():
+            results = await asyncio.gather(
+                flight.run('k', lambda: generate('a')),
+                flight.run('k', lambda: generate('a')),
+                flight.run('other', lambda: generate('b'))
+            )
+            # Finished keys are forgotten, so a later call generates again
+            results.append(await flight.run('k', lambda: generate('a')))
+            return results
+
+        self.assertEqual(asyncio.run(scenario()), ['A', 'A', 'B', 'A'])
+        self.assertEqual(calls, ['a', 'b', 'a'])
+        self.assertEqual(flight.stats(), {'inflight': 0, 'coalesced': 1})
+
+    def test_02_cancelled_caller_leaves_the_shared_task_running(self):
+        flight = SingleFlight()
+        release = None
+
+        async def generate():
+            await release.wait()
+            return 'letter'
+
+        async def scenario():
+            nonlocal release
+            release = asyncio.Event()
+            leaving = asyncio.ensure_future(flight.run('k', generate))
+            staying = asyncio.ensure_future(flight.run('k', generate))
+            await asyncio.sleep(0)
+            leaving.cancel()
+            await asyncio.sleep(0)
+            release.set()
+            return leaving.cancelled(), await staying
+
+        self.assertEqual(asyncio.run(scenario()), (True, 'letter'))
+
+    def test_03_shared_task_is_cancelled_once_every_caller_is(self):
+        flight = SingleFlight()
+        started = []
+
+        async def generate():
+            started.append(asyncio.current_task())
+            await asyncio.sleep(60)
+
+        async def scenario():
+            callers = [asyncio.ensure_future(flight.run('k', generate)) for _ in range(2)]
+            await asyncio.sleep(0)
+            for caller in callers:
+                caller.cancel()
+            await asyncio.sleep(0)
+            # The cancelled key is free straight away for a fresh generation
+            again = asyncio.ensure_future(flight.run('k', generate))
+            await asyncio.sleep(0)
+            cancelled = started[0].cancelled()
+            again.cancel()
+            await asyncio.gather(again, return_exceptions=True)
+            return cancelled, len(started)
+
+        self.assertEqual(asyncio.run(scenario()), (True, 2))
+        self.assertEqual(flight.stats()['inflight'], 0)
+
+    def test_04_failures_reach_every_caller(self):
+        flight = SingleFlight()
+
+        async def generate():
+            await asyncio.sleep(0)
+            raise RuntimeError("backend down")
+
+        async def scenario():
+            return await asyncio.gather(flight.run('k', generate), flight.run('k', generate), return_exceptions=True)
+
+        self.assertEqual([str(result) for result in asyncio.run(scenario())], ["backend down"] * 2)
+
+    def test_05_prompt_key(self):
+        key = SingleFlight.prompt_key
+        self.assertEqual(key('Write a  letter\n for Acme ', 100, 0.7), key('Write a letter for Acme', 100, 0.7))
+        self.assertNotEqual(key('Write a letter', 100, 0.7), key('Write a letter', 200, 0.7))
+        self.assertNotEqual(key('Write a letter', 100, 0.7), key('Write a letter', 100, 0.2))
+        self.assertNotEqual(key('Write a letter', 100, 0.7), key('Write a memo', 100, 0.7))
+
+class TestPriorityScheduler(unittest.TestCase):
+    """Unit tests for generation slots: admission, priority order and per-user fairness"""
+
+    def run_queued(self, scheduler, callers, release_after=()):
+        """Queue callers behind one held slot, then free it; returns the order they ran in and any errors"""
+        order = []
+
+        async def call(name, priority, user_id):
+            async with scheduler.slot(priority, user_id):
+                order.append(name)
+                await asyncio.sleep(0)
+
+        async def scenario():
+            blocker = asyncio.Event()
+
+            async def hold():
+                async with scheduler.slot(INTERACTIVE, 'holder'):
+                    await blocker.wait()
+
+            holder = asyncio.ensure_future(hold())
+            await asyncio.sleep(0)
+            tasks = []
+            for name, priority, user_id in callers:
+                tasks.append(asyncio.ensure_future(call(name, priority, user_id)))
+                await asyncio.sleep(0)
+            blocker.set()
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+            await holder
+            return [result for result in results if isinstance(result, Exception)]
+
+        errors = asyncio.run(scenario())
+        return order, errors
+
+    def test_01_free_slots_are_taken_immediately(self):
+        scheduler = PriorityScheduler(max_concurrency=2)
+
+        async def scenario():
+            async with scheduler.slot(BATCH, 'a'):
+                async with scheduler.slot(BACKGROUND, 'b'):
+                    return scheduler.stats()['running'], scheduler.idle
+
+        self.assertEqual(asyncio.run(scenario()), (2, False))
+        self.assertTrue(scheduler.idle)
+        with self.assertRaises(ValueError):
+            asyncio.run(scheduler.slot('urgent').__aenter__())
+
+    def test_02_freed_slots_go_to_the_highest_class(self):
+        scheduler = PriorityScheduler(max_concurrency=1)
+        order, errors = self.run_queued(scheduler, [
+            ('background', BACKGROUND, 'a'), ('batch', BATCH, 'b'), ('interactive', INTERACTIVE, 'c')
+        ])
+        self.assertEqual(errors, [])
+        self.assertEqual(order, ['interactive', 'batch', 'background'])
+
+    def test_03_full_class_queue_rejects(self):
+        scheduler = PriorityScheduler(max_concurrency=1, max_queue={INTERACTIVE: 2, BATCH: 1, BACKGROUND: 1})
+        order, errors = self.run_queued(scheduler, [
+            ('a1', BATCH, 'a'), ('b1', BATCH, 'b'), ('c1', INTERACTIVE, 'c')
+        ])
+        self.assertEqual(order, ['c1', 'a1'])
+        self.assertEqual(len(errors), 1)
+        self.assertIsInstance(errors[0], QueueFullError)
+        self.assertEqual(errors[0].priority, BATCH)
+        self.assertGreaterEqual(errors[0].retry_after, 1)
+        self.assertEqual(scheduler.stats()['rejected'][BATCH], 1)
+
+    def test_04_users_take_turns_and_bursts_are_capped(self):
+        scheduler = PriorityScheduler(max_concurrency=1, max_queue_per_user=3)
+        order, errors = self.run_queued(scheduler, [
+            ('a1', BATCH, 'a'), ('a2', BATCH, 'a'), ('a3', BATCH, 'a'), ('a4', BATCH, 'a'),
+            ('b1', BATCH, 'b'), ('b2', BATCH, 'b')
+        ])
+        # The burst's fourth call is turned away; the other user is still admitted and served in turn
+        self.assertEqual([error.priority for error in errors], [BATCH])
+        self.assertEqual(order, ['a1', 'b1', 'a2', 'b2', 'a3'])
+
+    def test_05_anonymous_callers_are_not_capped_per_user(self):
+        scheduler = PriorityScheduler(max_concurrency=1, max_queue_per_user=1)
+        order, errors = self.run_queued(scheduler, [('x', BATCH, None), ('y', BATCH, None)])
+        self.assertEqual((order, errors), (['x', 'y'], []))
+
+    def test_06_cancelled_waiters_free_their_place(self):
+        scheduler = PriorityScheduler(max_concurrency=1, max_queue_per_user=1)
+
+        async def scenario():
+            blocker = asyncio.Event()
+
+            async def hold():
+                async with scheduler.slot(INTERACTIVE, 'holder'):
+                    await blocker.wait()
+
+            async def call():
+                async with scheduler.slot(BATCH, 'a'):
+                    return 'ran'
+
+            holder = asyncio.ensure_future(hold())
+            await asyncio.sleep(0)
+            leaving = asyncio.ensure_future(call())
+            await asyncio.sleep(0)
+            leaving.cancel()
+            await asyncio.gather(leaving, return_exceptions=True)
+            queued = scheduler.stats()['queued'][BATCH]
+            # The user's place is free again, so the cap doesn't reject their retry
+            retry = asyncio.ensure_future(call())
+            await asyncio.sleep(0)
+            blocker.set()
+            await holder
+            return queued, await retry
+
+        self.assertEqual(asyncio.run(scenario()), (0, 'ran'))
+        self.assertTrue(scheduler.idle)
+
+class TestCircuitBreaker(unittest.TestCase):
+    """Unit tests for the breaker's closed, open and half-open states"""
+
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch('llm_scheduler.time.monotonic', lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.breaker = CircuitBreaker(window=10, min_calls=4, failure_threshold=0.5, slow_call_seconds=5, open_seconds=30)
+
+    def record(self, *outcomes):
+        for ok in outcomes:
+            self.assertTrue(self.breaker.allow())
+            self.breaker.record(ok, 0.1)
+
+    def test_01_opens_at_the_failure_threshold(self):
+        # Failures below min_calls never open it
+        self.record(False, False, False)
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        self.record(True)
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.assertTrue(self.breaker.is_open)
+        self.assertFalse(self.breaker.allow())
+        self.assertEqual(self.breaker.stats()['trips'], 1)
+        self.assertEqual(self.breaker.stats()['retry_in_seconds'], 30)
+
+    def test_02_stays_closed_below_the_threshold(self):
+        self.record(True, False, True, True, False, True)
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        self.assertAlmostEqual(self.breaker.failure_rate(), 2 / 6)
+
+    def test_03_slow_calls_count_as_failures(self):
+        for _ in range(4):
+            self.assertTrue(self.breaker.allow())
+            self.breaker.record(True, 6.0)
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+
+    def test_04_half_open_lets_one_probe_through_and_closes_on_success(self):
+        self.record(False, False, False, False)
+        self.now += 29
+        self.assertFalse(self.breaker.allow())
+        self.now += 1
+        self.assertFalse(self.breaker.is_open)
+        self.assertTrue(self.breaker.allow())
+        self.assertEqual(self.breaker.state, CircuitBreaker.HALF_OPEN)
+        # Only one probe at a time
+        self.assertFalse(self.breaker.allow())
+        self.breaker.record(True, 0.1)
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        # The failures that opened it are forgotten
+        self.assertEqual(self.breaker.failure_rate(), 0.0)
+        self.assertTrue(self.breaker.allow())
+
+    def test_05_failed_probe_opens_it_again(self):
+        self.record(False, False, False, False)
+        self.now += 30
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record(False, 0.1)
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.assertTrue(self.breaker.is_open)
+        self.assertEqual(self.breaker.stats()['trips'], 2)
+        # The cool-down starts over from the failed probe
+        self.now += 29
+        self.assertFalse(self.breaker.allow())
+        self.now += 1
+        self.assertTrue(self.breaker.allow())
+
+if __name__ == '__main__':
+    unittest.main()
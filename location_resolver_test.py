@@ -0,0 +1,97 @@
+import os
+import sys
+import unittest
+
+# The resolver is a plain module in the backend package directory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+from location_resolver import (
+    EARTH_RADIUS_KM, LocationResolver, default_resolver, fold, matches_preference_query, remote_in_region_query,
+    within_km_query
+)
+
+GAZETTEER = {
+    'countries': {
+        'US': {'name': 'United States', 'aliases': ['USA'], 'region': 'North America'},
+        'GB': {'name': 'United Kingdom', 'aliases': ['UK'], 'region': 'Europe'},
+        'CA': {'name': 'Canada', 'region': 'North America'},
+    },
+    'us_states': ['OR', 'ME', 'CA'],
+    'regions': {'Europe': ['EMEA', 'EU']},
+    'cities': [
+        {'name': 'London', 'country': 'GB', 'lat': 51.5, 'lon': -0.13},
+        {'name': 'London', 'country': 'CA', 'lat': 42.98, 'lon': -81.25},
+        {'name': 'Portland', 'country': 'US', 'lat': 45.52, 'lon': -122.68},
+    ]
+}
+
+class TestLocationResolver(unittest.TestCase):
+    """Unit tests for resolving free-form job locations and the filters built from them"""
+
+    def setUp(self):
+        self.resolver = default_resolver()
+
+    def city(self, text):
+        place = self.resolver.resolve(text)
+        return place.city, place.country_code
+
+    def test_01_spellings_of_one_city_resolve_alike(self):
+        for text in ('Krakow', 'Kraków', 'Cracow', 'KRAKÓW', 'Krakow, Poland', 'Kraków (hybrid)', 'Based in Cracow, PL'):
+            self.assertEqual(self.city(text), ('Kraków', 'PL'), text)
+        self.assertEqual(fold('Kraków'), fold('krakow'))
+        self.assertEqual(fold('Łódź'), 'lodz')
+
+    def test_02_remote_and_regions(self):
+        place = self.resolver.resolve('Remote - Europe')
+        self.assertEqual((place.city, place.region, place.remote), (None, 'Europe', True))
+        place = self.resolver.resolve('Remote, Poland')
+        self.assertEqual((place.country_code, place.region, place.remote), ('PL', 'Europe', True))
+        self.assertTrue(self.resolver.resolve('Remote in EMEA').remote)
+        # Unplaceable remote locations still count as remote
+        place = self.resolver.resolve('Remote, UTC+2')
+        self.assertEqual((place.region, place.remote, place.resolved), (None, True, True))
+
+    def test_03_unknown_and_empty(self):
+        for text in ('Nowhere Land', '', None):
+            place = self.resolver.resolve(text)
+            self.assertFalse(place.resolved)
+            self.assertIsNone(place.point)
+
+    def test_04_country_hints_pick_between_same_named_cities(self):
+        resolver = LocationResolver(GAZETTEER)
+        self.assertEqual(resolver.resolve('London').country_code, 'GB')
+        self.assertEqual(resolver.resolve('London, Canada').country_code, 'CA')
+        # "CA" is both a country and a state: the city decides
+        self.assertEqual(resolver.resolve('London, CA').country_code, 'CA')
+        self.assertEqual(resolver.resolve('Portland, OR').city, 'Portland')
+        self.assertEqual(resolver.resolve('Portland, UK').city, None)
+
+    def test_05_location_fields(self):
+        fields = self.resolver.location_fields('Cracow')
+        self.assertEqual(fields['location_norm']['city'], 'Kraków')
+        self.assertEqual(fields['location_norm']['country_code'], 'PL')
+        self.assertEqual(fields['geo']['type'], 'Point')
+        lon, lat = fields['geo']['coordinates']
+        self.assertAlmostEqual(lat, 50.06, places=1)
+        self.assertAlmostEqual(lon, 19.94, places=1)
+
+    def test_06_preference_queries_match_in_memory(self):
+        query, unresolved = self.resolver.preference_query(['Krakow', 'Remote', 'Atlantis'])
+        self.assertEqual(unresolved, ['Atlantis'])
+        for text, expected in (('Cracow', True), ('Warsaw', False), ('Remote, Germany', True)):
+            norm = self.resolver.location_fields(text)['location_norm']
+            self.assertEqual(matches_preference_query(norm, query), expected, text)
+        self.assertEqual(self.resolver.preference_query(['Atlantis']), (None, ['Atlantis']))
+        self.assertFalse(matches_preference_query({'city': 'Kraków'}, None))
+
+    def test_07_geo_and_region_queries(self):
+        place = self.resolver.resolve('Krakow')
+        center, radius = within_km_query(place, 50)['geo']['$geoWithin']['$centerSphere']
+        self.assertEqual(center, [place.lon, place.lat])
+        self.assertAlmostEqual(radius, 50 / EARTH_RADIUS_KM)
+        self.assertEqual(remote_in_region_query('Europe'), {
+            'location_norm.remote': True, 'location_norm.region': {'$in': ['Europe', None]}
+        })
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import os
+import sys
+import unittest
+
+import mongomock
+
+# The store is a plain module in the backend package directory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+from job_ranker import JobRanker
+from location_resolver import default_resolver
+from match_scores import MatchScoreStore
+from salary_parser import salary_fields
+from search_index import JobSearchIndex
+
+def job(job_id, title, location, salary_range=None, skills=()):
+    """A job document with the location and salary fields ingestion stores"""
+    return {
+        'job_id': job_id, 'title': title, 'location': location, 'salary_range': salary_range,
+        'skills': list(skills), 'description': title,
+        **salary_fields(salary_range), **default_resolver().location_fields(location)
+    }
+
+class TestMatchScoreStore(unittest.TestCase):
+    """Unit tests for materialized per-user scores: filters, cutoffs, rejection and trimming"""
+
+    def setUp(self):
+        self.db = mongomock.MongoClient().db
+        self.ranker = JobRanker()
+        self.index = JobSearchIndex()
+        self.store = MatchScoreStore(self.db, self.ranker, self.index, max_jobs_per_user=3)
+        self.ranker.build([])
+        self.index.build([])
+        self.db.preferences.insert_many([
+            {'user_id': 'krakow', 'job_titles': ['Python Developer'], 'locations': ['Cracow'], 'min_salary': 50000},
+            {'user_id': 'anyone', 'keywords': ['python']}
+        ])
+        self.db.resumes.insert_one({'user_id': 'anyone', 'parsed_data': {'skills': ['Django']}})
+
+    def ingest(self, *jobs):
+        for document in jobs:
+            self.db.jobs.replace_one({'job_id': document['job_id']}, document, upsert=True)
+        self.index.add_jobs(jobs)
+        self.ranker.add_jobs(jobs)
+        return self.store.score_jobs([document['job_id'] for document in jobs])
+
+    def rows(self, user_id):
+        return [job_id for job_id, _ in self.store.top(user_id, 10)]
+
+    def test_01_filters_apply_per_user(self):
+        self.ingest(
+            job('krakow', 'Senior Python Developer', 'Kraków, Poland', '$80,000 - $100,000'),
+            job('warsaw', 'Python Developer', 'Warsaw, Poland'),
+            job('poorly_paid', 'Python Developer', 'Krakow', '$20,000 - $30,000 per year'),
+            job('unpaid_unknown', 'Python Developer', 'Krakow'),
+            job('chef', 'Chef', 'Krakow')
+        )
+        self.assertEqual(sorted(self.rows('krakow')), ['krakow', 'unpaid_unknown'])
+        # Without preferences every job is a candidate, capped at max_jobs_per_user
+        self.assertEqual(len(self.rows('anyone')), 3)
+
+    def test_02_in_memory_filters_match_the_catalog_queries(self):
+        jobs = [
+            job('krakow', 'Python Developer', 'Krakow, Poland', '$60,000'),
+            job('cracow', 'Lead Python Developer', 'Cracow'),
+            job('remote', 'Python Developer', 'Remote'),
+            job('berlin', 'Python Developer', 'Berlin', '$90,000'),
+            job('short', 'Python Developer', 'Kraków', '$10,000 per year'),
+            job('backend', 'Backend Developer', 'Krakow')
+        ]
+        for document in jobs:
+            self.db.jobs.insert_one(dict(document))
+        self.index.add_jobs(jobs)
+        self.store.max_jobs_per_user = 10
+        preferences = self.db.preferences.find_one({'user_id': 'krakow'})
+        passes = self.store._job_filter(preferences)
+        prepared = self.store._filter_jobs([document['job_id'] for document in jobs])
+        in_memory = [document['job_id'] for document in prepared if passes(document)]
+        self.assertEqual(sorted(in_memory), sorted(self.store._candidates(preferences)))
+        self.assertEqual(sorted(in_memory), ['cracow', 'krakow'])
+
+    def test_03_rejected_jobs_leave_the_view(self):
+        self.ingest(job('moving', 'Python Developer', 'Krakow'))
+        self.assertIn('moving', self.rows('krakow'))
+        self.ingest(job('moving', 'Python Developer', 'Berlin'))
+        self.assertNotIn('moving', self.rows('krakow'))
+        self.assertIn('moving', self.rows('anyone'))
+
+    def test_04_full_views_skip_jobs_below_the_cutoff_and_trim(self):
+        self.db.preferences.delete_many({})
+        self.db.resumes.delete_many({})
+        self.db.preferences.insert_one({'user_id': 'u', 'job_titles': ['Python Developer'], 'keywords': ['django']})
+        self.ingest(*[job(f'good_{i}', 'Python Developer', 'Berlin', skills=['Flask']) for i in range(3)])
+        self.assertEqual(len(self.rows('u')), 3)
+
+        # A weaker match can't enter a full view, so it isn't written at all
+        self.ingest(job('weak', 'Python Developer', 'Berlin', skills=['Flask', 'Cooking', 'Sewing']))
+        self.assertNotIn('weak', self.rows('u'))
+        self.assertIsNone(self.db.user_job_scores.find_one({'user_id': 'u', 'job_id': 'weak'}))
+
+        # A stronger one enters and pushes the last row in page order (lowest score, then job_id) out
+        self.ingest(job('best', 'Python Developer', 'Berlin', skills=['Django']))
+        self.assertEqual(sorted(self.rows('u')), ['best', 'good_0', 'good_1'])
+
+    def test_05_no_users_or_jobs(self):
+        self.assertEqual(self.store.score_jobs([]), 0)
+        self.assertEqual(self.store.score_jobs(['missing']), 0)
+
+if __name__ == '__main__':
+    unittest.main()
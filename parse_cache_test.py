@@ -0,0 +1,51 @@
+import os
+import sys
+import unittest
+
+import mongomock
+
+# The cache is a plain module in the backend package directory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+from parse_cache import ParseResultCache
+
+RESULT = {'content': 'Jane Doe\nPython Developer', 'parsed_data': {'skills': ['Python']}}
+
+class TestParseResultCache(unittest.TestCase):
+    """Unit tests for resume parse results cached by file hash and parser version"""
+
+    def setUp(self):
+        self.db = mongomock.MongoClient().db
+        self.cache = ParseResultCache(self.db, ttl_days=7)
+        self.cache.ensure_indexes()
+
+    def test_01_hit_after_put(self):
+        self.assertIsNone(self.cache.get('abc', 'v1'))
+        self.cache.put('abc', 'v1', RESULT)
+        self.assertEqual(self.cache.get('abc', 'v1'), RESULT)
+        self.assertEqual(self.cache.stats(), {'hits': 1, 'misses': 1})
+
+    def test_02_keyed_by_hash_and_parser_version(self):
+        self.cache.put('abc', 'v1', RESULT)
+        # A new parser version or a different file never sees old output
+        self.assertIsNone(self.cache.get('abc', 'v2'))
+        self.assertIsNone(self.cache.get('def', 'v1'))
+        self.cache.put('abc', 'v2', {'content': 'newer'})
+        self.assertEqual(self.cache.get('abc', 'v1'), RESULT)
+        self.assertEqual(self.cache.get('abc', 'v2'), {'content': 'newer'})
+
+    def test_03_put_replaces_one_row(self):
+        self.cache.put('abc', 'v1', RESULT)
+        self.cache.put('abc', 'v1', {'content': 'reparsed'})
+        self.assertEqual(self.db.resume_parse_cache.count_documents({}), 1)
+        self.assertEqual(self.cache.get('abc', 'v1'), {'content': 'reparsed'})
+
+    def test_04_rows_expire(self):
+        indexes = self.db.resume_parse_cache.index_information()
+        ttl = [index for index in indexes.values() if index['key'] == [('created_at', 1)]]
+        self.assertEqual(ttl[0]['expireAfterSeconds'], 7 * 86400)
+        unique = [index for index in indexes.values() if index['key'] == [('content_hash', 1), ('parser_version', 1)]]
+        self.assertTrue(unique[0]['unique'])
+
+if __name__ == '__main__':
+    unittest.main()
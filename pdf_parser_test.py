@@ -0,0 +1,80 @@
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+
+# The parser is a plain module in the backend package directory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+from pdf_parser import PdfParseError, PdfParser, PdfParseTimeout
+
+def make_pdf(pages):
+    """A minimal PDF with one line of Helvetica text per page"""
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [%s] /Count %d >>" % (" ".join(f"{4 + 2 * i} 0 R" for i in range(len(pages))), len(pages)),
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"
+    ]
+    for i, text in enumerate(pages):
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>"
+        )
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+    data = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(data))
+        data += f"{number} 0 obj\n{body}\nendobj\n".encode()
+    xref = len(data)
+    data += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    data += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    data += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF".encode()
+    return data
+
+class TestPdfParser(unittest.TestCase):
+    """Unit tests for PDF extraction in the worker pool: page ranges, errors and timeouts"""
+
+    def setUp(self):
+        self.parser = PdfParser(workers=2, timeout=60, pages_per_task=2)
+        self.addCleanup(self.parser.shutdown)
+
+    def parse(self, source, parser=None):
+        return asyncio.run((parser or self.parser).parse(source))
+
+    def test_01_small_document(self):
+        text = self.parse(make_pdf(["Jane Doe", "Python Developer"]))
+        self.assertEqual([line.strip() for line in text.splitlines()], ["Jane Doe", "Python Developer"])
+
+    def test_02_long_document_is_split_into_ordered_page_ranges(self):
+        pages = [f"Page number {i}" for i in range(7)]
+        text = self.parse(make_pdf(pages))
+        self.assertEqual([line.strip() for line in text.splitlines()], pages)
+
+    def test_03_file_path(self):
+        with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as handle:
+            handle.write(make_pdf(["From disk"] * 3))
+        self.addCleanup(os.remove, handle.name)
+        self.assertEqual(self.parse(handle.name).split("\n")[0].strip(), "From disk")
+
+    def test_04_unreadable_pdf(self):
+        with self.assertRaises(PdfParseError):
+            self.parse(b"not a pdf at all")
+        # The pool survives an ordinary parse error
+        self.assertIsNotNone(self.parser._pool)
+        self.assertIn("Still works", self.parse(make_pdf(["Still works"])))
+
+    def test_05_timeout_recycles_the_pool(self):
+        # Starting the worker processes alone takes longer than this
+        parser = PdfParser(workers=1, timeout=0.001)
+        self.addCleanup(parser.shutdown)
+        with self.assertRaises(PdfParseTimeout):
+            self.parse(make_pdf(["Slow"]), parser)
+        self.assertIsNone(parser._pool)
+        parser.timeout = 60
+        self.assertIn("Slow", self.parse(make_pdf(["Slow"]), parser))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import os
+import sys
+import unittest
+
+# The budgeting helpers are a plain module in the backend package directory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+from prompt_budget import RESUME_SECTION_PRIORITY, fit_to_budget, truncate_to_tokens
+
+class WordCounter:
+    """One token per whitespace-separated word, so budgets are easy to reason about"""
+
+    def count(self, text):
+        return len(text.split())
+
+RESUME = """Jane Doe
+Backend engineer with eight years of Python
+
+EDUCATION:
+BSc Computer Science, Warsaw University of Technology
+
+EXPERIENCE:
+Senior Engineer at Acme building payment APIs
+Engineer at Globex maintaining data pipelines
+
+SKILLS:
+Python Django PostgreSQL Kafka
+"""
+
+class TestPromptBudget(unittest.TestCase):
+    """Unit tests for shrinking resumes and descriptions to a token budget"""
+
+    def fit(self, text, budget):
+        return fit_to_budget(text, budget, WordCounter(), RESUME_SECTION_PRIORITY)
+
+    def test_01_text_within_budget_is_unchanged(self):
+        self.assertEqual(self.fit(RESUME, 1000), RESUME)
+
+    def test_02_sections_kept_by_priority_in_original_order(self):
+        fitted = self.fit(RESUME, 30)
+        self.assertLessEqual(WordCounter().count(fitted), 30)
+        # Lead, skills and experience outrank education, which is dropped
+        self.assertEqual(fitted.splitlines(), [
+            'Jane Doe',
+            'Backend engineer with eight years of Python',
+            'EXPERIENCE:',
+            'Senior Engineer at Acme building payment APIs',
+            'Engineer at Globex maintaining data pipelines',
+            'SKILLS:',
+            'Python Django PostgreSQL Kafka'
+        ])
+
+    def test_03_section_that_does_not_fit_is_cut_line_by_line(self):
+        fitted = self.fit(RESUME, 22)
+        self.assertLessEqual(WordCounter().count(fitted), 22)
+        self.assertNotIn('Globex', fitted)
+        self.assertNotIn('EDUCATION:', fitted)
+        # The experience line that overflows keeps its leading words, and skills stay after it
+        lines = fitted.splitlines()
+        cut = lines[lines.index('EXPERIENCE:') + 1]
+        self.assertTrue('Senior Engineer at Acme building payment APIs'.startswith(cut + ' '))
+        self.assertEqual(lines[-1], 'Python Django PostgreSQL Kafka')
+
+    def test_04_oversized_single_line_is_truncated_at_a_word_boundary(self):
+        # PDF extraction often yields the whole resume as one line
+        text = " ".join(f"word{i}" for i in range(100))
+        fitted = self.fit(text, 10)
+        self.assertTrue(text.startswith(fitted + " "))
+        self.assertIn(WordCounter().count(fitted), (9, 10))
+
+    def test_05_oversized_line_under_a_heading_keeps_its_start(self):
+        text = "EXPERIENCE:\n" + " ".join(f"task{i}" for i in range(50))
+        fitted = self.fit(text, 8)
+        self.assertTrue(fitted.startswith("EXPERIENCE:\ntask0 task1"))
+        self.assertLessEqual(WordCounter().count(fitted), 8)
+
+    def test_06_never_empty_for_non_empty_input(self):
+        self.assertEqual(self.fit("SKILLS:\n" + "Python " * 20, 1), "SKILLS:")
+        self.assertTrue(self.fit("x" * 400, 1))
+        self.assertEqual(self.fit("", 5), "")
+
+    def test_07_duplicate_lines_are_dropped(self):
+        text = "Python developer\nPython developer\nKafka\n" + "filler " * 20
+        fitted = self.fit(text, 10)
+        self.assertEqual(fitted.count("Python developer"), 1)
+
+    def test_08_truncate_to_tokens(self):
+        counter = WordCounter()
+        self.assertEqual(truncate_to_tokens("a b c d", 2, counter), "a b")
+        self.assertEqual(truncate_to_tokens("a b", 5, counter), "a b")
+        self.assertEqual(truncate_to_tokens("a b", 0, counter), "")
+
+if __name__ == '__main__':
+    unittest.main()
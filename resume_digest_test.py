@@ -0,0 +1,84 @@
+import os
+import sys
+import unittest
+
+# The digest builder is a plain module in the backend package directory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+from prompt_budget import RESUME_SECTION_PRIORITY, split_sections
+from resume_digest import MAX_BULLET_WORDS, SECTION_LIMITS, build_resume_digest, condense_line, digest_is_current
+
+RESUME = """Jane Doe
+jane.doe@example.com | +48 600 100 200
+https://linkedin.com/in/janedoe
+Backend Engineer
+
+PROFESSIONAL SUMMARY:
+Backend engineer with eight years of Python.
+
+WORK EXPERIENCE:
+• Built payment APIs at Acme
+- Built payment APIs at Acme
+* Maintained data pipelines at Globex
+
+TECHNICAL SKILLS:
+Python, Django
+
+HOBBIES:
+Chess
+
+EDUCATION:
+BSc Computer Science
+"""
+
+class TestResumeDigest(unittest.TestCase):
+    """Unit tests for the compact resume view reused across prompts"""
+
+    def test_01_sections_and_header(self):
+        digest = build_resume_digest(RESUME, ['Python', ' django ', 'Python', ''])
+        # Contact details never reach prompts
+        self.assertEqual(digest['header'], ['Jane Doe', 'Backend Engineer'])
+        self.assertEqual(digest['summary'], ['Backend engineer with eight years of Python.'])
+        # Bullet markers are stripped and repeated bullets kept once
+        self.assertEqual(digest['experience'], ['Built payment APIs at Acme', 'Maintained data pipelines at Globex'])
+        self.assertEqual(digest['education'], ['BSc Computer Science'])
+        self.assertEqual(digest['projects'], [])
+        # Skills come from the parsed list, not the skills section, and unknown sections are dropped
+        self.assertEqual(digest['skills'], ['django', 'python'])
+        self.assertNotIn('Chess', digest['text'])
+
+    def test_02_rendered_text_uses_budget_headings(self):
+        digest = build_resume_digest(RESUME, ['Python'])
+        headings = [heading for heading, _ in split_sections(digest['text']) if heading]
+        self.assertEqual(headings, ['summary', 'skills', 'experience', 'education'])
+        self.assertTrue(all(heading in RESUME_SECTION_PRIORITY for heading in headings))
+        self.assertIn('- Built payment APIs at Acme', digest['text'])
+
+    def test_03_long_bullets_and_section_limits(self):
+        self.assertEqual(condense_line('  –  Shipped it'), 'Shipped it')
+        long_line = " ".join(f"w{i}" for i in range(MAX_BULLET_WORDS + 10))
+        self.assertEqual(condense_line(long_line).split()[-1], '...')
+        self.assertEqual(len(condense_line(long_line).split()), MAX_BULLET_WORDS + 1)
+
+        bullets = "\n".join(f"- Delivered project number {i}" for i in range(40))
+        digest = build_resume_digest(f"Jane Doe\n\nEXPERIENCE:\n{bullets}", [])
+        self.assertEqual(len(digest['experience']), SECTION_LIMITS['experience'])
+        self.assertEqual(digest['experience'][0], 'Delivered project number 0')
+
+    def test_04_text_without_headings(self):
+        text = "Jane Doe\nBackend Engineer\nBuilt payment APIs at Acme\nMaintained pipelines at Globex"
+        digest = build_resume_digest(text, [])
+        self.assertEqual(digest['header'], ['Jane Doe', 'Backend Engineer'])
+        self.assertEqual(digest['experience'], ['Built payment APIs at Acme', 'Maintained pipelines at Globex'])
+
+    def test_05_digest_is_current(self):
+        digest = build_resume_digest(RESUME, [])
+        self.assertTrue(digest_is_current(digest, RESUME))
+        self.assertFalse(digest_is_current(digest, RESUME + "\nNew job"))
+        self.assertFalse(digest_is_current(dict(digest, version=0), RESUME))
+        self.assertFalse(digest_is_current(None, RESUME))
+        # The same resume always yields the same digest
+        self.assertEqual(build_resume_digest(RESUME, ['b', 'a']), build_resume_digest(RESUME, ['a', 'b']))
+
+if __name__ == '__main__':
+    unittest.main()
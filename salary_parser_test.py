@@ -0,0 +1,66 @@
+import os
+import sys
+import unittest
+
+# The parser is a plain module in the backend package directory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+from salary_parser import parse_salary, salary_fields, salary_range_query
+
+class TestSalaryParser(unittest.TestCase):
+    """Unit tests for free-form salary parsing and annualization"""
+
+    def assertSalary(self, text, low, high, currency, period):
+        salary = parse_salary(text)
+        self.assertIsNotNone(salary, text)
+        self.assertEqual((salary['min'], salary['max']), (low, high), text)
+        self.assertEqual(salary['currency'], currency, text)
+        self.assertEqual(salary['period'], period, text)
+
+    def test_01_grouped_thousands(self):
+        self.assertSalary("$120,000 - $160,000", 120000, 160000, 'USD', 'year')
+        self.assertSalary("15 000 - 20 000 PLN", 15000, 20000, 'PLN', 'month')
+        self.assertSalary("€50.000 - 60.000", 50000, 60000, 'EUR', 'year')
+        self.assertSalary("CHF 120'000 - 140'000", 120000, 140000, 'CHF', 'year')
+
+    def test_02_trailing_k_applies_to_the_whole_range(self):
+        self.assertSalary("$80-120k", 80000, 120000, 'USD', 'year')
+        self.assertSalary("$80 - $120k", 80000, 120000, 'USD', 'year')
+        self.assertSalary("80 to 120K EUR", 80000, 120000, 'EUR', 'year')
+        self.assertSalary("20-25k PLN", 20000, 25000, 'PLN', 'month')
+        self.assertSalary("12-18k PLN/month", 12000, 18000, 'PLN', 'month')
+
+    def test_03_k_on_both_bounds_or_full_lower_bound(self):
+        self.assertSalary("80k-120k", 80000, 120000, 'USD', 'year')
+        self.assertSalary("$80,000 - 120k", 80000, 120000, 'USD', 'year')
+
+    def test_04_periods(self):
+        self.assertSalary("25-35 USD/h", 25, 35, 'USD', 'hour')
+        self.assertSalary("B2B 140-180 PLN/h", 140, 180, 'PLN', 'hour')
+        self.assertSalary("€60,000 p.a.", 60000, 60000, 'EUR', 'year')
+        self.assertSalary("5000 - 7000 EUR per month", 5000, 7000, 'EUR', 'month')
+
+    def test_05_no_amount(self):
+        self.assertIsNone(parse_salary(None))
+        self.assertIsNone(parse_salary("Competitive"))
+        self.assertEqual(salary_fields("Competitive"), {'salary': None, 'salary_min': None, 'salary_max': None})
+
+    def test_06_annualized_bounds(self):
+        fields = salary_fields("$80-120k")
+        self.assertEqual((fields['salary_min'], fields['salary_max']), (80000, 120000))
+        fields = salary_fields("$50/h")
+        self.assertEqual(fields['salary_min'], 50 * 2080)
+        # A monthly range is annualized from both bounds, not just the upper one
+        fields = salary_fields("12-18k PLN/month")
+        self.assertGreater(fields['salary_min'], 12000)
+        self.assertEqual(fields['salary_max'] / fields['salary_min'], 1.5)
+
+    def test_07_range_query(self):
+        self.assertEqual(salary_range_query(None, None), {})
+        query = salary_range_query(100000, 150000)
+        self.assertEqual(len(query["$and"]), 2)
+        self.assertIn({"salary_max": {"$gte": 100000}}, query["$and"][0]["$or"])
+        self.assertIn({"salary_min": {"$lte": 150000}}, query["$and"][1]["$or"])
+
+if __name__ == "__main__":
+    unittest.main()
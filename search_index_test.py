@@ -0,0 +1,104 @@
+import os
+import sys
+import unittest
+
+# The index is a plain module in the backend package directory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+from search_index import JobSearchIndex, tokenize
+
+def job(job_id, title, description="", **fields):
+    return dict(job_id=job_id, title=title, description=description, **fields)
+
+class TestJobSearchIndex(unittest.TestCase):
+    """Unit tests for BM25 search, boolean filters and tombstone compaction"""
+
+    def setUp(self):
+        self.index = JobSearchIndex()
+        self.index.build([
+            job('title', 'Python Developer', 'Build services', company='Acme', location='Berlin', job_type='full-time'),
+            job('body', 'Backend Engineer', 'We use python daily', company='Globex', location='Remote', job_type='contract'),
+            job('other', 'Chef', 'Cook pasta', company='Trattoria', location='Berlin', job_type='full-time'),
+            job('twice', 'Data Engineer', 'Python, more python and python', company='Initech', location='Warsaw')
+        ])
+
+    def ids(self, results):
+        return [job_id for job_id, _ in results]
+
+    def test_01_tokenize(self):
+        self.assertEqual(tokenize("Node.js and C++ in Kraków"), ['node.js', 'c++', 'kraków'])
+        self.assertEqual(tokenize("the C# developer"), ['c#', 'developer'])
+        self.assertEqual(tokenize(""), [])
+
+    def test_02_bm25_ordering(self):
+        results = self.index.search("python")
+        # A title match outweighs repeats in the description, which outweigh a single mention
+        self.assertEqual(self.ids(results), ['title', 'twice', 'body'])
+        scores = [score for _, score in results]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertEqual(self.index.search("sushi"), [])
+        self.assertEqual(self.index.search("the and"), [])
+
+    def test_03_limit_keeps_the_best(self):
+        self.assertEqual(self.ids(self.index.search("python", limit=1)), ['title'])
+
+    def test_04_facet_filters(self):
+        self.assertEqual(self.ids(self.index.search("python", location="berlin")), ['title'])
+        self.assertEqual(self.ids(self.index.search("python", job_type="contract")), ['body'])
+        self.assertEqual(self.ids(self.index.search("python", company="Acme")), ['title'])
+        self.assertNotIn('title', self.ids(self.index.search("python", excluded_companies=["ACME"])))
+
+    def test_05_match_all(self):
+        self.assertEqual(self.index.match_all([('location', ['berlin'])]), ['title', 'other'])
+        self.assertEqual(self.index.match_all([('location', ['berlin']), ('title', ['chef'])]), ['other'])
+        # A phrase is an AND of its tokens, phrases are OR'd
+        self.assertEqual(self.index.match_all([('title', ['data engineer', 'chef'])]), ['other', 'twice'])
+        self.assertEqual(self.index.match_all([('title', ['python chef'])]), [])
+        with self.assertRaises(ValueError):
+            self.index.match_all([('salary', ['100'])])
+
+    def test_06_reindexing_tombstones_the_old_version(self):
+        self.index.add_job(job('title', 'Sous Chef', 'Cook risotto', company='Acme'))
+        self.assertNotIn('title', self.ids(self.index.search("python")))
+        self.assertIn('title', self.ids(self.index.search("risotto")))
+        self.assertEqual(self.index.match_all([('title', ['chef'])]), ['other', 'title'])
+        self.assertEqual(len(self.index), 4)
+
+    def test_07_remove_job(self):
+        self.index.remove_job('twice')
+        self.index.remove_job('missing')
+        self.assertEqual(self.ids(self.index.search("python")), ['title', 'body'])
+        self.assertNotIn('twice', self.index)
+        self.assertEqual(len(self.index), 3)
+
+    def test_08_compaction_drops_tombstones(self):
+        index = JobSearchIndex(compact_ratio=0.5)
+        index.build([job(f'job_{i}', f'Engineer {i}', 'python') for i in range(8)])
+        for i in range(4):
+            index.remove_job(f'job_{i}')
+        # The fifth removal crosses the ratio and renumbers the survivors
+        index.remove_job('job_4')
+        self.assertEqual(index._dead, 0)
+        self.assertEqual(len(index._job_ids), 3)
+        self.assertEqual(sorted(self.ids(index.search("python"))), ['job_5', 'job_6', 'job_7'])
+        self.assertEqual(index.match_all([('title', ['engineer'])]), ['job_5', 'job_6', 'job_7'])
+        index.add_job(job('job_8', 'Engineer 8', 'python'))
+        self.assertEqual(len(index.search("python")), 4)
+
+    def test_09_build_replays_concurrent_changes(self):
+        index = JobSearchIndex()
+        index.build([job('old', 'Python Developer')])
+
+        def catalog():
+            yield job('a', 'Python Developer')
+            # Ingestion landing while the new index is assembled
+            index.add_job(job('b', 'Python Engineer'))
+            index.remove_job('a')
+            yield job('c', 'Python Analyst')
+
+        self.assertEqual(index.build(catalog()), 2)
+        self.assertEqual(sorted(self.ids(index.search("python"))), ['b', 'c'])
+        self.assertIsNone(index._replay)
+
+if __name__ == '__main__':
+    unittest.main()
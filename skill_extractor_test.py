@@ -0,0 +1,70 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+# The extractor is a plain module in the backend package directory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+from skill_extractor import SkillExtractor, default_extractor
+
+SKILLS = {
+    'java': ['j2ee'],
+    'javascript': ['js', 'es6'],
+    'react': ['reactjs'],
+    'react native': [],
+    'c++': ['cpp'],
+    'go': ['golang'],
+    'machine learning': ['ml'],
+}
+
+class TestSkillExtractor(unittest.TestCase):
+    """Unit tests for taxonomy skill matching: word boundaries, overlaps, synonyms and ambiguity"""
+
+    def setUp(self):
+        self.extractor = SkillExtractor(SKILLS, ambiguous=['go'])
+
+    def test_01_java_is_not_found_inside_javascript(self):
+        self.assertEqual(self.extractor.extract('Senior JavaScript engineer'), ['javascript'])
+        self.assertEqual(self.extractor.extract('Java, JavaScript and Java EE'), ['java', 'javascript'])
+        self.assertEqual(self.extractor.extract('Javanese cooking'), [])
+
+    def test_02_longest_match_wins(self):
+        self.assertEqual(self.extractor.extract('React Native apps, then React on the web'), ['react native', 'react'])
+        matches = self.extractor.matches('react native')
+        self.assertEqual(matches, [(0, 12, 'react native')])
+
+    def test_03_synonyms_map_to_canonical_names(self):
+        self.assertEqual(self.extractor.extract('ES6, ReactJS, CPP, J2EE and ML'), [
+            'javascript', 'react', 'c++', 'java', 'machine learning'
+        ])
+
+    def test_04_ambiguous_names_only_match_synonyms(self):
+        self.assertEqual(self.extractor.extract('Ready to go live with Golang'), ['go'])
+        self.assertEqual(self.extractor.extract('Ready to go'), [])
+
+    def test_05_symbols_case_and_line_breaks(self):
+        self.assertEqual(self.extractor.extract('C++/cpp'), ['c++'])
+        self.assertEqual(self.extractor.extract('MACHINE\n  LEARNING'), ['machine learning'])
+        # Order of first mention, each skill once
+        self.assertEqual(self.extractor.extract('js java JS react'), ['javascript', 'java', 'react'])
+        self.assertEqual(self.extractor.extract(''), [])
+
+    def test_06_taxonomy_file(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False, encoding='utf-8') as handle:
+            json.dump({'version': 1, 'skills': {'rust': ['rustlang'], 'r': ['r language']}, 'ambiguous': ['r']}, handle)
+        self.addCleanup(os.remove, handle.name)
+        extractor = SkillExtractor.from_file(handle.name)
+        self.assertEqual(extractor.extract('Rustlang and R language, R&D'), ['rust', 'r'])
+
+    def test_07_bundled_taxonomy(self):
+        extractor = default_extractor()
+        self.assertEqual(extractor.extract('Java and JavaScript'), ['java', 'javascript'])
+        self.assertEqual(extractor.extract('Node.js, React Native, React'), ['node.js', 'react native', 'react'])
+        self.assertEqual(extractor.extract('C++ and C#, golang'), ['c++', 'c#', 'go'])
+        self.assertEqual(extractor.extract('Python3 on k8s'), ['python', 'kubernetes'])
+        self.assertEqual(extractor.extract('Must speak Polish and cook like a chef'), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import json
+import os
+import sys
+import unittest
+
+# The parser is a plain module in the backend package directory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+from structured_output import JOB_MATCH_SCHEMA, JobMatchAnalysis, JsonObjectScanner, parse_job_match, repair_json
+
+class TestStructuredOutput(unittest.TestCase):
+    """Unit tests for finding, repairing and validating JSON in model completions"""
+
+    def test_01_scanner_finds_the_first_object(self):
+        scanner = JsonObjectScanner()
+        self.assertFalse(scanner.feed('Here you go: {"a": "}{", "b": [1, {"c": 2}]'))
+        self.assertTrue(scanner.feed('} and {"second": 1}'))
+        self.assertTrue(scanner.complete)
+        self.assertEqual(json.loads(scanner.object_text()), {'a': '}{', 'b': [1, {'c': 2}]})
+        # Escaped quotes don't end the string
+        scanner = JsonObjectScanner()
+        scanner.feed(r'{"quote": "she said \"}\""}')
+        self.assertEqual(json.loads(scanner.object_text()), {'quote': 'she said "}"'})
+
+    def test_02_truncated_objects_are_closed(self):
+        # A string cut off after a comma may be a half-written key, so it is dropped
+        cases = {
+            '{"match_score": 70, "strengths": ["Python", "Dja': {'match_score': 70, 'strengths': ['Python']},
+            '{"match_score": 70, "summary": "Strong fi': {'match_score': 70, 'summary': 'Strong fi'},
+            '{"match_score": 70, "gaps": ': {'match_score': 70},
+            '{"match_score": 70, "ga': {'match_score': 70},
+            '{"match_score": 70,': {'match_score': 70},
+        }
+        for text, expected in cases.items():
+            scanner = JsonObjectScanner()
+            self.assertFalse(scanner.feed(text))
+            self.assertEqual(json.loads(scanner.object_text()), expected, text)
+        self.assertIsNone(JsonObjectScanner().object_text())
+
+    def test_03_repair_json(self):
+        self.assertEqual(json.loads(repair_json('{“a”: [1, 2,], }')), {'a': [1, 2]})
+
+    def test_04_parse_job_match(self):
+        analysis = parse_job_match('Sure!\n```json\n{"match_score": "85%", "strengths": "Python", "gaps": null,}\n```')
+        self.assertEqual(analysis['match_score'], 85)
+        self.assertEqual(analysis['strengths'], ['Python'])
+        self.assertEqual(analysis['gaps'], [])
+        self.assertEqual(analysis['summary'], '')
+        # Cut off mid-list, still recoverable
+        self.assertEqual(parse_job_match('{"match_score": 40.6, "gaps": ["AWS"')['match_score'], 41)
+
+    def test_05_invalid_completions_are_rejected(self):
+        for text in (
+            'I cannot help with that.',
+            '{"strengths": ["Python"]}',
+            '{"match_score": "high"}',
+            '{"match_score": null}',
+            '{"match_score": [85]}',
+            '{"match_score": true}',
+            '{"match_score": NaN}',
+            '{"match_score": 1e999}',
+            '{"match_score": 70 "gaps": []}',
+        ):
+            self.assertIsNone(parse_job_match(text), text)
+
+    def test_06_scores_are_clamped(self):
+        self.assertEqual(JobMatchAnalysis.model_validate({'match_score': 140}).match_score, 100)
+        self.assertEqual(JobMatchAnalysis.model_validate({'match_score': -5}).match_score, 0)
+        self.assertIn('match_score', JOB_MATCH_SCHEMA['required'])
+
+if __name__ == '__main__':
+    unittest.main()